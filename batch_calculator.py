@@ -0,0 +1,154 @@
+import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from utils import get_holiday_index
+
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+DAY_INDEX = {day: i for i, day in enumerate(DAYS)}
+WEEKMASKS = ['0' * i + '1' + '0' * (6 - i) for i in range(7)]
+
+
+class BatchResult:
+    """Vectorized calculation results; every array has the shape of the conducted input"""
+    __slots__ = ('required', 'conducted', 'remaining_regular', 'missed_in_holidays', 'extra_needed')
+
+    def __init__(self, required, conducted, remaining_regular, missed_in_holidays, extra_needed):
+        self.required = required
+        self.conducted = conducted
+        self.remaining_regular = remaining_regular
+        self.missed_in_holidays = missed_in_holidays
+        self.extra_needed = extra_needed
+
+    def __len__(self):
+        return len(self.required)
+
+    def __getitem__(self, index):
+        return BatchResult(
+            self.required[index],
+            self.conducted[index],
+            self.remaining_regular[index],
+            self.missed_in_holidays[index],
+            self.extra_needed[index]
+        )
+
+    def totals(self):
+        """Return (total_required, total_conducted, total_extra_needed)"""
+        return (
+            int(self.required.sum()),
+            int(self.conducted.sum()),
+            int(self.extra_needed.sum())
+        )
+
+
+@lru_cache(maxsize=32)
+def _weekday_day_counts(start, end, holidays):
+    begin = np.datetime64(start + datetime.timedelta(days=1), 'D')  # Start from tomorrow
+    stop = np.datetime64(end + datetime.timedelta(days=1), 'D')
+    if stop <= begin:
+        zeros = np.zeros(7, dtype=np.int64)
+        return zeros, zeros
+
+    holiday_mask = np.array(holidays, dtype='datetime64[D]')
+    remaining = np.array([
+        np.busday_count(begin, stop, weekmask=mask, holidays=holiday_mask)
+        for mask in WEEKMASKS
+    ], dtype=np.int64)
+    possible = np.array([
+        np.busday_count(begin, stop, weekmask=mask)
+        for mask in WEEKMASKS
+    ], dtype=np.int64)
+
+    remaining.setflags(write=False)
+    possible.setflags(write=False)
+    return remaining, possible
+
+
+def weekday_day_counts(start, end, holidays):
+    """Return (remaining, possible) day counts per weekday in (start, end] as length-7 arrays"""
+    holiday_dates = tuple(get_holiday_index(holidays).dates)
+    return _weekday_day_counts(start, end, holiday_dates)
+
+
+def parse_days_schedule(days_schedule):
+    """Parse a "Mon-2,Tue-1,Thu-2" schedule into a length-7 list of counts"""
+    row = [0] * 7
+    for part in days_schedule.split(','):
+        day, count = part.strip().split('-')
+        row[DAY_INDEX[day]] = int(count)
+    return row
+
+
+def build_schedule_matrix(subjects_data):
+    """Convert a subjects_data dict into (names, schedule, conducted, weekly) arrays"""
+    names = list(subjects_data)
+    schedule = np.zeros((len(names), 7), dtype=np.int64)
+    conducted = np.zeros(len(names), dtype=np.int64)
+    weekly = np.zeros(len(names), dtype=np.int64)
+
+    for i, data in enumerate(subjects_data.values()):
+        schedule[i] = parse_days_schedule(data['days_schedule'])
+        conducted[i] = data['conducted']
+        weekly[i] = data['weekly_slots']
+
+    return names, schedule, conducted, weekly
+
+
+def calculate_batch(schedule, conducted, weekly, last_date, holidays, semester_weeks=15, today=None):
+    """Calculate required, remaining, holiday-missed and extra classes for many subjects at once
+
+    ``schedule`` has shape (..., 7) with classes per weekday (Mon..Sun);
+    ``conducted`` and ``weekly`` have the matching leading shape, so a
+    whole college can be passed as (sections, subjects, 7).
+    """
+    if today is None:
+        today = datetime.date.today()
+
+    if last_date <= today:
+        raise ValueError("Last date must be in the future")
+
+    schedule = np.asarray(schedule, dtype=np.int64)
+    conducted = np.asarray(conducted, dtype=np.int64)
+    weekly = np.asarray(weekly, dtype=np.int64)
+
+    remaining_days, possible_days = weekday_day_counts(today, last_date, holidays)
+
+    required = weekly * semester_weeks
+    remaining_regular = schedule @ remaining_days
+    missed_in_holidays = schedule @ (possible_days - remaining_days)
+    extra_needed = np.maximum(0, required - conducted - remaining_regular)
+
+    return BatchResult(required, conducted, remaining_regular, missed_in_holidays, extra_needed)
+
+
+def calculate_sections(sections_data, last_date, holidays, semester_weeks=15, today=None):
+    """Calculate every section's subjects in one vectorized call
+
+    ``sections_data`` maps a section (timetable BATCH) to a subjects_data
+    dict; returns a dict mapping each section to (names, BatchResult).
+    """
+    names_by_section = {}
+    schedules, conducted, weekly = [], [], []
+
+    for section, subjects_data in sections_data.items():
+        names, section_schedule, section_conducted, section_weekly = build_schedule_matrix(subjects_data)
+        names_by_section[section] = names
+        schedules.append(section_schedule)
+        conducted.append(section_conducted)
+        weekly.append(section_weekly)
+
+    if not schedules:
+        return {}
+
+    result = calculate_batch(
+        np.concatenate(schedules), np.concatenate(conducted), np.concatenate(weekly),
+        last_date, holidays, semester_weeks=semester_weeks, today=today
+    )
+
+    results = {}
+    offset = 0
+    for section, names in names_by_section.items():
+        results[section] = (names, result[offset:offset + len(names)])
+        offset += len(names)
+    return results
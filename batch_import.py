@@ -0,0 +1,215 @@
+"""Headless batch import: parse many timetables in parallel and calculate extra classes.
+
+Usage:
+    python batch_import.py timetables/ --end-date 2025-11-30 --holidays holidays.json -o results.json
+    python batch_import.py "exports/*.xlsx" --end-date 2025-11-30 -o results.csv
+"""
+import argparse
+import csv
+import datetime
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+TIMETABLE_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+CSV_COLUMNS = [
+    'File', 'Sheet', 'Section', 'Subject', 'Weekly Slots', 'Days Schedule', 'Required', 'Conducted',
+    'Will Be Conducted', 'Missed Due To Holidays', 'Extra Needed'
+]
+
+
+def collect_files(inputs):
+    """Expand directories and glob patterns into a sorted list of timetable files"""
+    files = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for name in os.listdir(pattern):
+                path = os.path.join(pattern, name)
+                if os.path.isfile(path) and name.lower().endswith(TIMETABLE_EXTENSIONS):
+                    files.add(path)
+        else:
+            for path in glob.glob(pattern, recursive=True):
+                if os.path.isfile(path) and path.lower().endswith(TIMETABLE_EXTENSIONS):
+                    files.add(path)
+    return sorted(files)
+
+
+def load_holidays(path):
+    """Load holidays from a JSON list or a text file with one YYYY-MM-DD date per line"""
+    if not path:
+        return []
+
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    if path.lower().endswith('.json'):
+        return [str(holiday) for holiday in json.loads(content)]
+
+    return [line.strip() for line in content.splitlines() if line.strip() and not line.startswith('#')]
+
+
+def process_file(file, last_date, holidays, semester_weeks):
+    """Parse every sheet of one timetable and calculate its subjects (runs in a worker process)"""
+    from timetable_parser import iter_timetable_sheets
+    from batch_calculator import DAYS, calculate_batch
+
+    started = time.perf_counter()
+    try:
+        # Sheets are streamed one at a time; only their small count matrices are kept
+        sheet_names, sections, names, schedule = [], [], [], []
+        for sheet in iter_timetable_sheets(file):
+            sheet_names.extend([sheet.name] * len(sheet.subjects))
+            sections.extend(sheet.row_sections())
+            names.extend(sheet.subjects)
+            schedule.extend(sheet.matrix.tolist())
+        parsed = time.perf_counter()
+
+        weekly = [sum(row) for row in schedule]
+
+        subjects = []
+        if names:
+            result = calculate_batch(schedule, [0] * len(names), weekly, last_date, holidays,
+                                     semester_weeks=semester_weeks)
+            for i, subject in enumerate(names):
+                subjects.append({
+                    "sheet": sheet_names[i],
+                    "section": sections[i],
+                    "subject": subject,
+                    "weekly_slots": weekly[i],
+                    "days_schedule": ','.join(f"{day}-{count}" for day, count in zip(DAYS, schedule[i]) if count),
+                    "required": int(result.required[i]),
+                    "conducted": int(result.conducted[i]),
+                    "remaining_regular": int(result.remaining_regular[i]),
+                    "missed_in_holidays": int(result.missed_in_holidays[i]),
+                    "extra_needed": int(result.extra_needed[i])
+                })
+
+        finished = time.perf_counter()
+        return {
+            "file": file,
+            "status": "ok",
+            "parse_seconds": round(parsed - started, 4),
+            "total_seconds": round(finished - started, 4),
+            "subjects": subjects
+        }
+    except Exception as e:
+        return {
+            "file": file,
+            "status": "error",
+            "error": str(e),
+            "total_seconds": round(time.perf_counter() - started, 4),
+            "subjects": []
+        }
+
+
+def write_json(path, results, last_date, holidays):
+    """Write consolidated results as a single JSON document"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "generated": datetime.datetime.now().isoformat(),
+            "semester_end": last_date.isoformat(),
+            "holidays": holidays,
+            "files": results
+        }, f, indent=2, ensure_ascii=False)
+
+
+def write_csv(path, results):
+    """Write consolidated results as one CSV row per (file, subject)"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for file_result in results:
+            for subject in file_result['subjects']:
+                writer.writerow([
+                    file_result['file'],
+                    subject.get('sheet', ''),
+                    subject.get('section', ''),
+                    subject['subject'],
+                    subject['weekly_slots'],
+                    subject['days_schedule'],
+                    subject['required'],
+                    subject['conducted'],
+                    subject['remaining_regular'],
+                    subject['missed_in_holidays'],
+                    subject['extra_needed']
+                ])
+
+
+def run_batch(files, last_date, holidays, semester_weeks=15, workers=None, report=print):
+    """Process files in a process pool, reporting each file as it completes"""
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process_file, file, last_date, holidays, semester_weeks)
+            for file in files
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if result['status'] == 'ok':
+                report(f"OK    {result['total_seconds']:8.3f}s  {len(result['subjects']):4d} subjects  {result['file']}")
+            else:
+                report(f"FAIL  {result['total_seconds']:8.3f}s  {result['file']}: {result['error']}")
+            results.append(result)
+
+    # Keep output order stable regardless of completion order
+    results.sort(key=lambda r: r['file'])
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Batch-import timetables and calculate extra classes needed without the GUI."
+    )
+    parser.add_argument('inputs', nargs='+', help="Directories or glob patterns of .xlsx/.xls/.csv timetables")
+    parser.add_argument('--end-date', required=True, type=datetime.date.fromisoformat,
+                        help="Last day of semester (YYYY-MM-DD)")
+    parser.add_argument('--holidays', help="Holiday file: JSON list or one YYYY-MM-DD per line")
+    parser.add_argument('-o', '--output', required=True, help="Output file (.json or .csv)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument('--weeks', type=int, default=None,
+                        help="Semester weeks (default: app.semester_weeks from config)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    files = collect_files(args.inputs)
+    if not files:
+        print("No timetable files found.", file=sys.stderr)
+        return 2
+
+    if args.end_date <= datetime.date.today():
+        print("Semester end date must be in the future.", file=sys.stderr)
+        return 2
+
+    semester_weeks = args.weeks
+    if semester_weeks is None:
+        # Read only: a batch run must not leave a config.json next to the timetables
+        from config import Config
+        semester_weeks = Config(read_only=True).semester_weeks
+
+    holidays = load_holidays(args.holidays)
+
+    print(f"Processing {len(files)} timetable(s)...")
+    started = time.perf_counter()
+    results = run_batch(files, args.end_date, holidays, semester_weeks, args.workers)
+    elapsed = time.perf_counter() - started
+
+    if args.output.lower().endswith('.csv'):
+        write_csv(args.output, results)
+    else:
+        write_json(args.output, results, args.end_date, holidays)
+
+    failed = [r for r in results if r['status'] != 'ok']
+    print(f"Done: {len(results) - len(failed)} succeeded, {len(failed)} failed in {elapsed:.2f}s -> {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
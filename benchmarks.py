@@ -0,0 +1,353 @@
+"""Benchmarks for the hot paths, on synthetic timetables and histories.
+
+Usage:
+    python benchmarks.py                                  # run and compare with benchmarks_baseline.json
+    python benchmarks.py --save-baseline                  # record a new baseline on this machine
+    python benchmarks.py --sections 20 --subjects 12 --history 500 --threshold 0.75
+    python benchmarks.py --only calculate_summary parse_timetable
+
+Each benchmark reports its median time over --repeat runs, its throughput and its
+peak traced memory. Every run is paired with a pure-Python calibration loop and
+the gate compares the median of run time / calibration time, so a busy or slower
+machine does not look like a regression. Any benchmark whose calibrated time is
+more than --threshold above the baseline's is a regression and the command exits
+with status 1. When no comparison can be made (no baseline, or one recorded at
+other sizes) it exits with status 2 unless --allow-missing-baseline is given.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DAY_NAMES = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT']
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+SLOTS = ['9:15-10:10', '10:15-11:10', '11:15-12:10', '12:15-1:10', '2:00-2:55', '3:00-3:55', '4:00-4:55']
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks_baseline.json')
+
+
+# Synthetic data
+
+def subject_codes(count):
+    """Return ``count`` distinct subject codes (ADA0, BS0, ...)"""
+    stems = ['ADA', 'BS', 'EN', 'SKE', 'DBMS', 'EIOT', 'OS', 'CN', 'TOC', 'AI']
+    return [f"{stems[i % len(stems)]}{i // len(stems)}" for i in range(count)]
+
+
+def generate_timetable(path, sections, subjects, rng):
+    """Write a CSV timetable: one block of weekday rows per section (BATCH)"""
+    codes = subject_codes(subjects)
+    cells = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(','.join(['DAY', 'BATCH'] + SLOTS) + '\n')
+        for section in range(sections):
+            for day in DAY_NAMES:
+                row = [day, f"S{section}"]
+                for _ in SLOTS:
+                    choice = rng.random()
+                    if choice < 0.15:
+                        row.append('')
+                    elif choice < 0.2:
+                        row.append('LUNCH')
+                    else:
+                        code = rng.choice(codes)
+                        row.append(f"{code}-L" if choice > 0.9 else code)
+                    cells += 1
+                f.write(','.join(row) + '\n')
+    return cells
+
+
+def generate_subjects_data(count, rng):
+    """Return a calculator subjects_data dict with random day schedules"""
+    subjects_data = {}
+    for name in subject_codes(count):
+        counts = {day: rng.randint(0, 2) for day in DAYS[:6]}
+        if not any(counts.values()):
+            counts['Mon'] = 1
+        subjects_data[name] = {
+            'conducted': rng.randint(0, 40),
+            'weekly_slots': sum(counts.values()),
+            'days_schedule': ','.join(f"{day}-{n}" for day, n in counts.items() if n)
+        }
+    return subjects_data
+
+
+def generate_holidays(today, horizon_days, rng, count=10):
+    return sorted({
+        (today + datetime.timedelta(days=rng.randint(1, horizon_days))).isoformat()
+        for _ in range(count)
+    })
+
+
+# Benchmarks: each returns (function, units, unit_name) to be timed
+
+def bench_count_specific_days(ctx):
+    from utils import count_specific_days
+
+    today, last_date, holidays = ctx['today'], ctx['last_date'], ctx['holidays']
+    ranges = [
+        (today + datetime.timedelta(days=i), last_date + datetime.timedelta(days=i))
+        for i in range(200)
+    ]
+
+    def run():
+        for start, end in ranges:
+            for day in DAYS:
+                count_specific_days(start, end, day, holidays)
+
+    return run, len(ranges) * len(DAYS), 'calls'
+
+
+def bench_calculate_summary(ctx):
+    from calculator import calculate_summary
+
+    subjects_data, last_date, holidays = ctx['subjects_data'], ctx['last_date'], ctx['holidays']
+    rounds = 25  # a single run is too short to time reliably
+
+    def run():
+        for _ in range(rounds):
+            calculate_summary(subjects_data, last_date, holidays).render()
+
+    return run, rounds * len(subjects_data), 'subjects'
+
+
+def bench_parse_timetable(ctx):
+    from timetable_parser import iter_timetable_sheets
+
+    path = ctx['timetable']
+
+    def run():
+        for _ in iter_timetable_sheets(path):
+            pass
+
+    return run, ctx['timetable_cells'], 'cells'
+
+
+def bench_save_calculation(ctx):
+    from calculator import calculate_summary
+
+    data_manager = ctx['data_manager']
+    subjects_data, last_date, holidays = ctx['subjects_data'], ctx['last_date'], ctx['holidays']
+    result = calculate_summary(subjects_data, last_date, holidays)
+    subjects = {name: data['weekly_slots'] for name, data in subjects_data.items()}
+    conducted = {name: data['conducted'] for name, data in subjects_data.items()}
+    history = ctx['history']
+
+    def run():
+        for _ in range(history):
+            data_manager.save_calculation(subjects, conducted, last_date, holidays, result)
+        data_manager.flush()
+
+    return run, history, 'saves'
+
+
+def bench_get_subject_statistics(ctx):
+    data_manager = ctx['data_manager']
+    calls = 200
+
+    def run():
+        for _ in range(calls):
+            data_manager.get_subject_statistics()
+
+    return run, calls, 'calls'
+
+
+BENCHMARKS = {
+    'count_specific_days': bench_count_specific_days,
+    'calculate_summary': bench_calculate_summary,
+    'parse_timetable': bench_parse_timetable,
+    'save_calculation': bench_save_calculation,
+    'get_subject_statistics': bench_get_subject_statistics,
+}
+
+
+def timed(run):
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+
+def calibration_loop():
+    """Fixed interpreter-bound work that benchmark timings are scaled by"""
+    table = {}
+    for i in range(20000):
+        table[i % 97] = table.get(i % 97, 0) + i * 3
+
+
+def measure(setup, ctx, repeat):
+    """Return (median seconds, median calibrated time, units, unit name, peak KiB) for one benchmark
+
+    Every timed run is paired with a calibration loop run right before it,
+    so a slowdown of the whole machine during the run scales both alike.
+    """
+    run, units, unit_name = setup(ctx)
+
+    run()  # warm-up: imports, caches, first-time setup
+    calibration_loop()
+    timings, relative = [], []
+    for _ in range(repeat):
+        calibration = timed(calibration_loop)
+        elapsed = timed(run)
+        timings.append(elapsed)
+        relative.append(elapsed / calibration)
+
+    # Memory is traced in a separate run so tracing does not skew the timings
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return statistics.median(timings), statistics.median(relative), units, unit_name, peak / 1024
+
+
+def build_context(args, workdir):
+    from config import Config
+    from data_manager import DataManager
+
+    rng = random.Random(args.seed)
+    today = datetime.date.today()
+    last_date = today + datetime.timedelta(days=args.horizon_days)
+
+    timetable = os.path.join(workdir, 'timetable.csv')
+    cells = generate_timetable(timetable, args.sections, args.subjects, rng)
+
+    # Keep the database and data files inside the scratch directory
+    config = Config(os.path.join(workdir, 'config.json'))
+    config.set('paths.data_dir', os.path.join(workdir, 'data'), save=False)
+    config.set('paths.database', os.path.join(workdir, 'data', 'benchmark.db'), save=False)
+    config.set('history.max_entries', 0, save=False)
+
+    return {
+        'today': today,
+        'last_date': last_date,
+        'holidays': generate_holidays(today, args.horizon_days, rng),
+        'subjects_data': generate_subjects_data(args.sections * args.subjects, rng),
+        'timetable': timetable,
+        'timetable_cells': cells,
+        'history': args.history,
+        'data_manager': DataManager(config),
+    }
+
+
+def change(result, reference):
+    """Return the fractional slowdown of result over reference, using calibrated times when both have them"""
+    key = 'relative' if 'relative' in result and 'relative' in reference else 'seconds'
+    return result[key] / reference[key] - 1 if reference[key] else 0
+
+
+def compare(results, baseline, threshold):
+    """Return the names of benchmarks slower than the baseline by more than threshold"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference and change(result, reference) > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the calculation, parsing and persistence hot paths.")
+    parser.add_argument('--sections', type=int, default=10, help="Timetable sections (BATCH values)")
+    parser.add_argument('--subjects', type=int, default=10, help="Subjects per section")
+    parser.add_argument('--horizon-days', type=int, default=120, help="Days until the semester end date")
+    parser.add_argument('--history', type=int, default=200, help="Calculations saved to history")
+    parser.add_argument('--repeat', type=int, default=15, help="Timed runs per benchmark (the median is kept)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for the synthetic data")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help="Exit with status 0 when there is no comparable baseline")
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help="Allowed slowdown over the baseline before failing (0.5 = 50%%)")
+    parser.add_argument('-o', '--output', help="Also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = args.only or list(BENCHMARKS)
+    sizes = {
+        'sections': args.sections,
+        'subjects': args.subjects,
+        'horizon_days': args.horizon_days,
+        'history': args.history,
+        'seed': args.seed,
+    }
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='ecc-bench-') as workdir:
+        # Keep anything written to relative paths inside the scratch directory
+        os.chdir(workdir)
+        try:
+            ctx = build_context(args, workdir)
+            print(f"{'benchmark':<24} {'median':>10} {'throughput':>22} {'peak':>10}")
+            for name in names:
+                seconds, relative, units, unit_name, peak_kb = measure(BENCHMARKS[name], ctx, args.repeat)
+                results[name] = {
+                    'seconds': round(seconds, 6),
+                    'relative': round(relative, 4),
+                    'throughput': round(units / seconds, 1) if seconds else None,
+                    'unit': unit_name,
+                    'peak_kb': round(peak_kb, 1),
+                }
+                throughput = f"{units / seconds:,.0f} {unit_name}/s" if seconds else "-"
+                print(f"{name:<24} {seconds * 1000:8.2f}ms {throughput:>22} {peak_kb:8.0f}KB")
+            ctx['data_manager'].store.close()
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        'generated': datetime.datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'sizes': sizes,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    # Without a comparable baseline the gate cannot pass, only be explicitly skipped
+    not_compared = 0 if args.allow_missing_baseline else 2
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return not_compared
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('sizes') != sizes:
+        print(f"Baseline was recorded with different sizes {baseline.get('sizes')}; not comparing.")
+        return not_compared
+
+    regressions = compare(results, baseline, args.threshold)
+    for name in names:
+        reference = baseline['results'].get(name)
+        if reference:
+            flag = "REGRESSION" if name in regressions else "ok"
+            print(f"{name:<24} {change(results[name], reference):+8.1%} vs baseline  {flag}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed past {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,80 +1,346 @@
 import datetime
-from utils import count_specific_days
+from batch_calculator import build_schedule_matrix, calculate_batch, calculate_sections, weekday_day_counts
+from utils import qualified_name
 
-def calculate_summary(subjects_data, last_date, holidays):
-    """Calculate class summary with day-specific scheduling"""
-    try:
-        today = datetime.date.today()
-        
-        if last_date <= today:
-            raise ValueError("Last date must be in the future")
-        
-        summary_lines = []
-        total_required = 0
-        total_conducted = 0
-        total_extra_needed = 0
-        
-        for subject, data in subjects_data.items():
-            conducted = data['conducted']
-            weekly_slots = data['weekly_slots']
-            days_schedule = data['days_schedule']
-            
-            # Parse days schedule: "Mon-2,Tue-1,Thu-2"
-            schedule_dict = {}
-            for part in days_schedule.split(','):
-                day, count = part.strip().split('-')
-                schedule_dict[day] = int(count)
-            
-            # Calculate total required (15 weeks)
-            required = weekly_slots * 15
-            
-            # Calculate remaining classes based on specific days
-            remaining_regular = 0
-            missed_in_holidays = 0
-            
-            for day, classes_per_day in schedule_dict.items():
-                # Count remaining days of this type
-                remaining_days = count_specific_days(today, last_date, day, holidays)
-                total_days_possible = count_specific_days(today, last_date, day, [])
-                
-                remaining_regular += remaining_days * classes_per_day
-                missed_in_holidays += (total_days_possible - remaining_days) * classes_per_day
-            
-            # Calculate extra needed
-            extra_needed = max(0, required - conducted - remaining_regular)
-            
-            total_required += required
-            total_conducted += conducted
-            total_extra_needed += extra_needed
-            
-            status = "✅" if extra_needed == 0 else "⚠️" if extra_needed <= 2 else "❌"
-            
-            summary_lines.append(
-                f"{status} {subject}:\n"
-                f"  Total Required: {required}\n"
-                f"  Conducted Till Now: {conducted}\n"
-                f"  Remaining: {required - conducted}\n"
-                f"  Will be conducted regularly: {remaining_regular}\n"
-                f"  Missed due to holidays: {missed_in_holidays}\n"
-                f"  Extra classes needed: {extra_needed}\n"
-            )
-        
-        header = [
+class SubjectResult:
+    """Calculated figures for a single subject"""
+    __slots__ = ('subject', 'required', 'conducted', 'remaining_regular', 'missed_in_holidays', 'extra_needed',
+                 'section')
+
+    def __init__(self, subject, required, conducted, remaining_regular, missed_in_holidays, extra_needed,
+                 section=None):
+        self.subject = subject
+        self.section = section
+        self.required = required
+        self.conducted = conducted
+        self.remaining_regular = remaining_regular
+        self.missed_in_holidays = missed_in_holidays
+        self.extra_needed = extra_needed
+
+    @property
+    def key(self):
+        """Subject name qualified by its section, unique within a calculation"""
+        return qualified_name(self.section, self.subject)
+
+    @property
+    def remaining(self):
+        return self.required - self.conducted
+
+    @property
+    def status(self):
+        return "✅" if self.extra_needed == 0 else "⚠️" if self.extra_needed <= 2 else "❌"
+
+    def render(self):
+        """Render this subject's block of the text summary"""
+        return (
+            f"{self.status} {self.subject}:\n"
+            f"  Total Required: {self.required}\n"
+            f"  Conducted Till Now: {self.conducted}\n"
+            f"  Remaining: {self.remaining}\n"
+            f"  Will be conducted regularly: {self.remaining_regular}\n"
+            f"  Missed due to holidays: {self.missed_in_holidays}\n"
+            f"  Extra classes needed: {self.extra_needed}\n"
+        )
+
+    def to_dict(self):
+        return {
+            "subject": self.key,
+            **({"section": self.section} if self.section else {}),
+            "required": self.required,
+            "conducted": self.conducted,
+            "remaining_regular": self.remaining_regular,
+            "missed_in_holidays": self.missed_in_holidays,
+            "extra_needed": self.extra_needed
+        }
+
+
+class CalculationResult:
+    """Per-subject results plus totals; the text summary is rendered on demand"""
+    __slots__ = ('subjects', 'last_date', 'holiday_count', 'generated',
+                 'total_required', 'total_conducted', 'total_extra_needed')
+
+    def __init__(self, subjects, last_date, holiday_count, generated=None):
+        self.subjects = subjects
+        self.last_date = last_date
+        self.holiday_count = holiday_count
+        self.generated = generated or datetime.datetime.now()
+        self.total_required = sum(s.required for s in subjects)
+        self.total_conducted = sum(s.conducted for s in subjects)
+        self.total_extra_needed = sum(s.extra_needed for s in subjects)
+
+    def __iter__(self):
+        return iter(self.subjects)
+
+    def __len__(self):
+        return len(self.subjects)
+
+    def __str__(self):
+        return self.render()
+
+    def header_lines(self):
+        return [
             "📊 CLASS SUMMARY (Day-wise Calculation)",
-            f"Generated: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M')}",
-            f"Semester End: {last_date.strftime('%d/%m/%Y')}",
-            f"Holidays: {len(holidays)}",
+            f"Generated: {self.generated.strftime('%d/%m/%Y %H:%M')}",
+            f"Semester End: {self.last_date.strftime('%d/%m/%Y')}",
+            f"Holidays: {self.holiday_count}",
             ""
         ]
-        
-        footer = [
+
+    def footer_lines(self):
+        return [
             "📈 TOTALS:",
-            f"Total Required: {total_required}",
-            f"Total Conducted: {total_conducted}",
-            f"Total Extra Needed: {total_extra_needed}"
+            f"Total Required: {self.total_required}",
+            f"Total Conducted: {self.total_conducted}",
+            f"Total Extra Needed: {self.total_extra_needed}"
         ]
-        
-        return "\n".join(header + summary_lines + footer)
-        
-    except Exception as e:
-        return f"Error: {str(e)}"
\ No newline at end of file
+
+    def render(self, blocks=None):
+        """Render the human-readable summary (``blocks`` are pre-rendered subject blocks)"""
+        if blocks is None:
+            blocks = [s.render() for s in self.subjects]
+        return "\n".join(self.header_lines() + blocks + self.footer_lines())
+
+    def replace_subject(self, index, subject_result):
+        """Swap one subject's figures and adjust the totals by the difference"""
+        old = self.subjects[index]
+        self.subjects[index] = subject_result
+        self.total_required += subject_result.required - old.required
+        self.total_conducted += subject_result.conducted - old.conducted
+        self.total_extra_needed += subject_result.extra_needed - old.extra_needed
+
+    def totals(self):
+        return {
+            "total_required": self.total_required,
+            "total_conducted": self.total_conducted,
+            "total_extra_needed": self.total_extra_needed
+        }
+
+    def to_dict(self):
+        return {
+            "generated": self.generated.isoformat(),
+            "last_date": self.last_date.isoformat(),
+            "holidays": self.holiday_count,
+            "subjects": [s.to_dict() for s in self.subjects],
+            "totals": self.totals()
+        }
+
+
+def calculate_summary(subjects_data, last_date, holidays, semester_weeks=15):
+    """Calculate class summary with day-specific scheduling
+
+    Returns a CalculationResult; raises ValueError for invalid input.
+    """
+    today = datetime.date.today()
+
+    if last_date <= today:
+        raise ValueError("Last date must be in the future")
+
+    # Parse days schedules ("Mon-2,Tue-1,Thu-2") into a subjects x weekday matrix
+    names, schedule, conducted, weekly = build_schedule_matrix(subjects_data)
+
+    # Calculate total required, remaining and extra classes in one pass
+    result = calculate_batch(schedule, conducted, weekly, last_date, holidays, semester_weeks, today=today)
+
+    return CalculationResult(subject_results(names, result), last_date, len(holidays))
+
+
+def subject_results(names, result, section=None):
+    """Build SubjectResults from subject names and their BatchResult rows"""
+    return [
+        SubjectResult(subject, required, conducted_count, remaining_regular, missed, extra_needed, section)
+        for subject, required, conducted_count, remaining_regular, missed, extra_needed in zip(
+            names,
+            result.required.tolist(),
+            result.conducted.tolist(),
+            result.remaining_regular.tolist(),
+            result.missed_in_holidays.tolist(),
+            result.extra_needed.tolist()
+        )
+    ]
+
+
+class SectionedResult:
+    """Results for a multi-section timetable: one CalculationResult per section plus a roll-up
+
+    Iterating yields every section's SubjectResults, so it can be saved and
+    exported like a CalculationResult.
+    """
+
+    def __init__(self, sections, last_date, holiday_count, generated=None):
+        self.sections = sections    # [(section, CalculationResult)]
+        self.last_date = last_date
+        self.holiday_count = holiday_count
+        self.generated = generated or datetime.datetime.now()
+        self.total_required = sum(result.total_required for _, result in sections)
+        self.total_conducted = sum(result.total_conducted for _, result in sections)
+        self.total_extra_needed = sum(result.total_extra_needed for _, result in sections)
+
+    def __iter__(self):
+        for _, result in self.sections:
+            yield from result
+
+    def __len__(self):
+        return sum(len(result) for _, result in self.sections)
+
+    def __str__(self):
+        return self.render()
+
+    @property
+    def subjects(self):
+        return list(self)
+
+    def rollup_lines(self):
+        """One line of totals per section"""
+        width = max(len(section) for section, _ in self.sections)
+        return [
+            f"{section:<{width}}  required {result.total_required}, conducted {result.total_conducted}, "
+            f"extra needed {result.total_extra_needed} ({len(result)} subjects)"
+            for section, result in self.sections
+        ]
+
+    def render(self):
+        """Render every section's subjects, then the per-section roll-up and overall totals"""
+        lines = [
+            "📊 CLASS SUMMARY (Day-wise Calculation)",
+            f"Generated: {self.generated.strftime('%d/%m/%Y %H:%M')}",
+            f"Semester End: {self.last_date.strftime('%d/%m/%Y')}",
+            f"Holidays: {self.holiday_count}",
+            f"Sections: {len(self.sections)}",
+            ""
+        ]
+        for section, result in self.sections:
+            lines.append(f"🏫 SECTION {section}")
+            lines.extend(subject.render() for subject in result)
+            lines.append(f"Section extra needed: {result.total_extra_needed}")
+            lines.append("")
+        lines.append("📚 SECTION ROLL-UP:")
+        lines.extend(self.rollup_lines())
+        lines.append("")
+        lines += [
+            "📈 TOTALS:",
+            f"Total Required: {self.total_required}",
+            f"Total Conducted: {self.total_conducted}",
+            f"Total Extra Needed: {self.total_extra_needed}"
+        ]
+        return "\n".join(lines)
+
+    def totals(self):
+        return {
+            "total_required": self.total_required,
+            "total_conducted": self.total_conducted,
+            "total_extra_needed": self.total_extra_needed
+        }
+
+    def to_dict(self):
+        return {
+            "generated": self.generated.isoformat(),
+            "last_date": self.last_date.isoformat(),
+            "holidays": self.holiday_count,
+            "sections": [
+                {"section": section, "subjects": [s.to_dict() for s in result], "totals": result.totals()}
+                for section, result in self.sections
+            ],
+            "totals": self.totals()
+        }
+
+
+def calculate_sections_summary(sections_data, last_date, holidays, semester_weeks=15):
+    """Calculate a timetable's sections ({section: subjects_data})
+
+    All sections are calculated together in one vectorized pass. Returns a
+    CalculationResult when there is only the unnamed section "", else a
+    SectionedResult; raises ValueError for invalid input.
+    """
+    if set(sections_data) <= {''}:
+        return calculate_summary(sections_data.get('', {}), last_date, holidays, semester_weeks)
+
+    today = datetime.date.today()
+    if last_date <= today:
+        raise ValueError("Last date must be in the future")
+
+    generated = datetime.datetime.now()
+    results = calculate_sections(sections_data, last_date, holidays, semester_weeks, today=today)
+    sections = [
+        (section or "(none)",
+         CalculationResult(subject_results(names, result, section), last_date, len(holidays), generated))
+        for section, (names, result) in results.items()
+    ]
+    return SectionedResult(sections, last_date, len(holidays), generated)
+
+
+class LiveCalculation:
+    """Incrementally maintained results for the subjects table
+
+    Weekday counts for the semester are computed once; ``update_row`` then
+    recalculates a single subject from its 7 day counts and adjusts the
+    totals by the difference. Rendered subject blocks are cached so a
+    refresh only re-renders the rows that changed.
+    """
+
+    def __init__(self, last_date, holidays, semester_weeks=15, today=None):
+        today = today or datetime.date.today()
+        if last_date <= today:
+            raise ValueError("Last date must be in the future")
+
+        self.last_date = last_date
+        self.holidays = list(holidays)
+        self.semester_weeks = semester_weeks
+        remaining_days, possible_days = weekday_day_counts(today, last_date, self.holidays)
+        self.remaining_days = remaining_days.tolist()
+        self.missed_days = (possible_days - remaining_days).tolist()
+
+        self.result = CalculationResult([], last_date, len(self.holidays))
+        self._blocks = []
+        self._changed = set()
+
+    def subject_result(self, name, day_counts, conducted, weekly):
+        """Calculate one subject from its Mon..Sun class counts"""
+        required = weekly * self.semester_weeks
+        remaining_regular = sum(c * d for c, d in zip(day_counts, self.remaining_days))
+        missed = sum(c * d for c, d in zip(day_counts, self.missed_days))
+        extra_needed = max(0, required - conducted - remaining_regular)
+        return SubjectResult(name, required, conducted, remaining_regular, missed, extra_needed)
+
+    def rebuild(self, rows):
+        """Recalculate every subject from (name, day_counts, conducted, weekly) rows"""
+        subjects = [self.subject_result(*row) for row in rows]
+        self.result = CalculationResult(subjects, self.last_date, len(self.holidays))
+        self._blocks = [None] * len(subjects)
+        self._changed = set()
+
+    def update_row(self, index, name, day_counts, conducted, weekly):
+        """Recalculate a single subject and update the totals by delta"""
+        self.result.replace_subject(index, self.subject_result(name, day_counts, conducted, weekly))
+        self._blocks[index] = None
+        self._changed.add(index)
+
+    def render(self):
+        """Render the summary, re-rendering only subjects changed since the last call"""
+        for i, block in enumerate(self._blocks):
+            if block is None:
+                self._blocks[i] = self.result.subjects[i].render()
+        self._changed.clear()
+        return self.result.render(self._blocks)
+
+    def line_patches(self):
+        """Return (first_line, text) replacements for what changed since the last render
+
+        Each subject block occupies a fixed number of lines in the rendered
+        summary, so a view holding the previous render can patch just the
+        changed subjects and the totals instead of replacing all the text.
+        """
+        header = len(self.result.header_lines())
+        patches = []
+        block_lines = 0
+        for i in sorted(self._changed):
+            block = self.result.subjects[i].render()
+            self._blocks[i] = block
+            # A block ends with a newline and is joined to the next with another one
+            block_lines = block.count("\n") + 1
+            patches.append((header + i * block_lines, block.rstrip("\n")))
+        self._changed.clear()
+
+        if patches:
+            footer = self.result.footer_lines()
+            patches.append((header + len(self._blocks) * block_lines + 1, "\n".join(footer[1:])))
+        return patches
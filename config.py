@@ -1,10 +1,27 @@
+import atexit
 import json
+import threading
 from pathlib import Path
 from datetime import date
 
+from persistence import atomic_write_text
+
+_MISSING = object()
+
 class Config:
-    def __init__(self):
-        self.config_path = Path("config.json")
+    """Configuration loaded once from config.json
+
+    Dotted-key lookups are cached; ``set`` updates memory, notifies
+    subscribers and schedules one debounced atomic save, so bursts of
+    changes reach the disk as a single write. Use ``get_config()`` for the
+    process-wide instance. A ``read_only`` Config never writes the file,
+    not even the default one when it is missing.
+    """
+    
+    def __init__(self, config_path="config.json", save_delay=0.5, read_only=False):
+        self.config_path = Path(config_path)
+        self.save_delay = save_delay
+        self.read_only = read_only
         self.default_config = {
             "app": {
                 "name": "Extra Class Counter",
@@ -15,7 +32,8 @@ class Config:
             "paths": {
                 "model_path": "models/timetable_reader.pt",
                 "export_dir": "exports",
-                "data_dir": "data"
+                "data_dir": "data",
+                "database": "~/.extraclasscounter/data.db"
             },
             "defaults": {
                 "holidays": [
@@ -25,6 +43,18 @@ class Config:
                 "working_days": [0, 1, 2, 3, 4],  # Monday to Friday
                 "weekly_hours": 40
             },
+            "cache": {
+                "max_mb": 64           # parsed timetable cache size in the data directory
+            },
+            "subjects": {
+                "similarity_threshold": 0.8,   # n-gram similarity needed to map a name to a known subject
+                "min_count": 2                 # uses before a subject becomes a canonical name
+            },
+            "history": {
+                "max_entries": 100,    # 0 keeps every calculation
+                "max_age_days": 0,     # 0 disables age-based pruning
+                "write_delay": 0.2     # seconds queued saves may wait to be written together
+            },
             "ocr": {
                 "confidence_threshold": 0.7,
                 "lab_width_threshold": 150,
@@ -32,7 +62,15 @@ class Config:
             }
         }
         self.data = self.default_config.copy()
+        
+        self._lock = threading.RLock()
+        self._cache = {}          # dotted key -> resolved value
+        self._subscribers = []
+        self._save_timer = None
+        self._dirty = False
+        
         self.load()
+        atexit.register(self.flush)
     
     def load(self):
         """Load configuration from file"""
@@ -41,21 +79,51 @@ class Config:
                 with open(self.config_path, 'r', encoding='utf-8') as f:
                     saved_config = json.load(f)
                     self._deep_update(self.data, saved_config)
-            else:
+                    self._cache.clear()
+            elif not self.read_only:
                 self.save()  # Create default config file
         except Exception as e:
             print(f"Error loading config: {e}, using defaults")
     
     def save(self):
-        """Save configuration to file"""
-        try:
-            # Create directory if it doesn't exist
-            self.config_path.parent.mkdir(exist_ok=True)
-            
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error saving config: {e}")
+        """Save configuration to file atomically (fsynced temp file, then rename)"""
+        if self.read_only:
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._dirty = False
+            try:
+                # Create directory if it doesn't exist
+                self.config_path.parent.mkdir(exist_ok=True)
+                
+                atomic_write_text(self.config_path, json.dumps(self.data, indent=2, ensure_ascii=False))
+            except Exception as e:
+                print(f"Error saving config: {e}")
+    
+    def schedule_save(self):
+        """Save once after save_delay seconds; further changes in the meantime share that write"""
+        with self._lock:
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+    
+    def flush(self):
+        """Write pending changes now (also runs at interpreter exit)"""
+        with self._lock:
+            if self._dirty:
+                self.save()
+    
+    def subscribe(self, callback):
+        """Call ``callback(key_path, value)`` after every set()"""
+        self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
     
     def _deep_update(self, original, update):
         """Recursively update nested dictionaries"""
@@ -67,28 +135,43 @@ class Config:
     
     def get(self, key_path, default=None):
         """Get configuration value by dot-separated path"""
-        keys = key_path.split('.')
+        try:
+            value = self._cache[key_path]
+        except KeyError:
+            value = self._cache[key_path] = self._resolve(key_path)
+        return default if value is _MISSING else value
+    
+    def _resolve(self, key_path):
         value = self.data
-        
         try:
-            for key in keys:
+            for key in key_path.split('.'):
                 value = value[key]
-            return value
         except (KeyError, TypeError):
-            return default
+            return _MISSING
+        return value
     
-    def set(self, key_path, value):
-        """Set configuration value by dot-separated path"""
-        keys = key_path.split('.')
-        current = self.data
+    def set(self, key_path, value, save=True):
+        """Set configuration value by dot-separated path; the file is written after a short delay"""
+        with self._lock:
+            keys = key_path.split('.')
+            current = self.data
+            
+            for key in keys[:-1]:
+                if key not in current:
+                    current[key] = {}
+                current = current[key]
+            
+            current[keys[-1]] = value
+            self._cache.clear()
         
-        for key in keys[:-1]:
-            if key not in current:
-                current[key] = {}
-            current = current[key]
+        for callback in list(self._subscribers):
+            try:
+                callback(key_path, value)
+            except Exception as e:
+                print(f"Error notifying config subscriber: {e}")
         
-        current[keys[-1]] = value
-        self.save()
+        if save:
+            self.schedule_save()
     
     @property
     def semester_weeks(self):
@@ -104,7 +187,24 @@ class Config:
     
     def add_default_holiday(self, date_str):
         """Add a holiday to default list"""
-        holidays = self.default_holidays
-        if date_str not in holidays:
-            holidays.append(date_str)
-            self.set("defaults.holidays", holidays)
+        self.add_default_holidays([date_str])
+    
+    def add_default_holidays(self, date_strs):
+        """Add many holidays to the default list with a single change"""
+        holidays = list(self.default_holidays)
+        added = [d for d in dict.fromkeys(date_strs) if d not in holidays]
+        if added:
+            self.set("defaults.holidays", holidays + added)
+
+
+_shared_config = None
+_shared_lock = threading.Lock()
+
+def get_config():
+    """Return the process-wide Config, loading config.json on first use"""
+    global _shared_config
+    if _shared_config is None:
+        with _shared_lock:
+            if _shared_config is None:
+                _shared_config = Config()
+    return _shared_config
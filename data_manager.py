@@ -1,106 +1,259 @@
+import atexit
 import json
-import csv
-from datetime import datetime, date
+import os
+import threading
+from datetime import datetime, date, timedelta
 from pathlib import Path
-from config import Config
+from config import get_config
+from instrumentation import span, timed
+from persistence import WriteBehindQueue
 
 class DataManager:
-    def __init__(self):
-        self.config = Config()
+    """History, statistics and project persistence
+
+    The SQLite store, parse cache and subject resolver are created on first
+    use so constructing a DataManager (and the main window) stays cheap.
+    History and statistics writes go through a write-behind queue; reads
+    flush it first so they always see earlier saves.
+    """
+    
+    def __init__(self, config=None):
+        self.config = config or get_config()
         self.data_dir = Path(self.config.get("paths.data_dir", "data"))
         self.data_dir.mkdir(exist_ok=True)
         
+        # Legacy JSON files, read once for migration into SQLite
         self.history_file = self.data_dir / "calculations_history.json"
+        self.history_log_file = self.data_dir / "calculations_history.jsonl"
         self.subjects_file = self.data_dir / "subjects_database.json"
         
-        self.initialize_files()
+        self.subject_min_count = self.config.get("subjects.min_count", 2)
+        
+        # Lazily created layers; the lock keeps worker threads from creating them twice
+        self._init_lock = threading.RLock()
+        self._store = None
+        self._parse_cache = None
+        self._subject_resolver = None
+        
+        # Saves are batched on a background thread; pending ones are written at exit
+        self.write_queue = WriteBehindQueue(self.write_calculations, delay=self.config.get("history.write_delay", 0.2),
+                                            name="history")
+        atexit.register(self.flush)
+        
+        self.config.subscribe(self.on_config_changed)
+    
+    def on_config_changed(self, key_path, value):
+        """Apply retention and resolver settings to layers that already exist"""
+        if self._store is not None and key_path in ("history.max_entries", "history.max_age_days"):
+            setattr(self._store, key_path.split('.')[1], value)
+        elif self._subject_resolver is not None and key_path == "subjects.similarity_threshold":
+            self._subject_resolver.set_threshold(value)
+    
+    @property
+    def store(self):
+        if self._store is None:
+            with self._init_lock:
+                if self._store is None:
+                    from storage import SQLiteStore
+                    
+                    db_path = os.path.expanduser(self.config.get("paths.database", "~/.extraclasscounter/data.db"))
+                    with span("data_manager.open_store"):
+                        self._store = SQLiteStore(
+                            Path(db_path),
+                            max_entries=self.config.get("history.max_entries", 100),
+                            max_age_days=self.config.get("history.max_age_days", 0)
+                        )
+                    self.initialize_files()
+        return self._store
     
+    @property
+    def parse_cache(self):
+        if self._parse_cache is None:
+            with self._init_lock:
+                if self._parse_cache is None:
+                    from parse_cache import ParseCache
+                    
+                    self._parse_cache = ParseCache(
+                        self.data_dir / "parse_cache",
+                        max_bytes=int(self.config.get("cache.max_mb", 64) * 1024 * 1024)
+                    )
+        return self._parse_cache
+    
+    @property
+    def subject_resolver(self):
+        """Canonical subject names for folding OCR variants into known subjects"""
+        if self._subject_resolver is None:
+            with self._init_lock:
+                if self._subject_resolver is None:
+                    from subject_resolver import DEFAULT_THRESHOLD, SubjectResolver
+                    
+                    resolver = SubjectResolver(
+                        self.store.known_subjects(self.subject_min_count),
+                        threshold=self.config.get("subjects.similarity_threshold", DEFAULT_THRESHOLD)
+                    )
+                    self._subject_resolver = resolver
+                    self.canonicalize_subjects_database()
+        return self._subject_resolver
+    
+    @timed("data_manager.migrate_json")
     def initialize_files(self):
-        """Initialize data files with empty structures if they don't exist"""
-        if not self.history_file.exists():
-            with open(self.history_file, 'w') as f:
-                json.dump([], f, indent=2)
+        """Migrate existing JSON data files into the database on first run"""
+        if self.store.is_migrated("json_migrated"):
+            return
+        
+        history = []
+        try:
+            if self.history_log_file.exists():
+                with open(self.history_log_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            try:
+                                history.append(json.loads(line))
+                            except ValueError:
+                                continue
+            elif self.history_file.exists():
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    history = json.load(f)
+        except Exception as e:
+            print(f"Error reading history for migration: {e}")
+        
+        subjects_db = {}
+        try:
+            if self.subjects_file.exists():
+                with open(self.subjects_file, 'r', encoding='utf-8') as f:
+                    subjects_db = json.load(f)
+        except Exception as e:
+            print(f"Error reading subjects database for migration: {e}")
         
-        if not self.subjects_file.exists():
-            with open(self.subjects_file, 'w') as f:
-                json.dump({}, f, indent=2)
+        try:
+            self.store.migrate_json(history, subjects_db)
+        except Exception as e:
+            print(f"Error migrating data files: {e}")
     
-    def save_calculation(self, subjects, conducted, last_date, holidays, summary):
-        """Save a calculation to history"""
+    def canonicalize_subjects_database(self):
+        """One-time cleanup: fold near-duplicate subjects into known ones and drop OCR noise"""
+        if self.store.is_migrated("subjects_canonicalized"):
+            return
+        from subject_resolver import is_plausible_subject
+        
+        try:
+            merges, drops = {}, []
+            for row in self.store.all_subjects():
+                name = row["name"]
+                if row["count"] >= self.subject_min_count:
+                    continue
+                canonical = self.subject_resolver.match(name)
+                if canonical is not None and canonical != name:
+                    merges[name] = canonical
+                elif canonical is None and not is_plausible_subject(name):
+                    drops.append(name)
+            self.store.clean_subjects(merges, drops)
+        except Exception as e:
+            print(f"Error cleaning subjects database: {e}")
+    
+    def subject_usage(self, subjects):
+        """Map {subject: weekly_slots} onto canonical names, leaving out OCR noise"""
+        from subject_resolver import is_plausible_subject
+        
+        usage = {}
+        for subject, weekly_slots in subjects.items():
+            canonical = self.subject_resolver.match(subject)
+            if canonical is None:
+                if not is_plausible_subject(subject):
+                    continue
+                canonical = subject
+            usage.setdefault(canonical, weekly_slots)
+        return usage
+    
+    def refresh_subject_resolver(self, names=None):
+        """Make subjects that reached the minimum use count available as canonical names
+
+        ``names`` limits the check to subjects whose counts just changed.
+        """
+        for name in self.store.known_subjects(self.subject_min_count, names):
+            self.subject_resolver.add(name)
+    
+    def flush(self, timeout=None):
+        """Write any queued history saves now; returns False on timeout"""
+        return self.write_queue.flush(timeout)
+    
+    @timed("data_manager.save_calculation")
+    def save_calculation(self, subjects, conducted, last_date, holidays, result, on_saved=None):
+        """Queue a calculation (a calculator.CalculationResult or SectionedResult) for history
+
+        ``subjects`` and ``conducted`` are keyed by section-qualified names
+        (SubjectResult.key); the subjects database counts the plain names.
+        ``on_saved`` is called on the writer thread once the entry is written.
+        """
         try:
-            with open(self.history_file, 'r') as f:
-                history = json.load(f)
-            
             calculation = {
                 "timestamp": datetime.now().isoformat(),
                 "subjects": subjects,
                 "conducted": conducted,
                 "last_date": last_date.isoformat(),
                 "holidays": holidays,
-                "summary": summary,
+                "results": [subject_result.to_dict() for subject_result in result],
                 "metadata": {
                     "total_subjects": len(subjects),
                     "total_conducted": sum(conducted.values()),
-                    "total_required": sum(subjects.values()) * self.config.semester_weeks
+                    "total_required": result.total_required,
+                    "total_extra_needed": result.total_extra_needed
                 }
             }
             
-            history.append(calculation)
-            
-            # Keep only last 100 calculations
-            if len(history) > 100:
-                history = history[-100:]
-            
-            with open(self.history_file, 'w') as f:
-                json.dump(history, f, indent=2)
-            
-            # Update subjects database
-            self.update_subjects_database(subjects)
+            usage = {subject_result.subject: subjects.get(subject_result.key, 0) for subject_result in result}
+            self.write_queue.put((calculation, usage), on_saved)
             
         except Exception as e:
             print(f"Error saving calculation: {e}")
     
-    def update_subjects_database(self, subjects):
-        """Update the subjects database with new subjects"""
-        try:
-            with open(self.subjects_file, 'r') as f:
-                subjects_db = json.load(f)
-            
-            for subject, weekly_slots in subjects.items():
-                if subject in subjects_db:
-                    subjects_db[subject]["count"] += 1
-                    subjects_db[subject]["last_seen"] = date.today().isoformat()
-                    # Update weekly slots average
-                    current_avg = subjects_db[subject].get("avg_weekly_slots", 0)
-                    new_avg = (current_avg * (subjects_db[subject]["count"] - 1) + weekly_slots) / subjects_db[subject]["count"]
-                    subjects_db[subject]["avg_weekly_slots"] = round(new_avg, 1)
-                else:
-                    subjects_db[subject] = {
-                        "count": 1,
-                        "first_seen": date.today().isoformat(),
-                        "last_seen": date.today().isoformat(),
-                        "avg_weekly_slots": weekly_slots
-                    }
-            
-            with open(self.subjects_file, 'w') as f:
-                json.dump(subjects_db, f, indent=2)
-                
-        except Exception as e:
-            print(f"Error updating subjects database: {e}")
+    def write_calculations(self, batch):
+        """Write queued (calculation, {subject: weekly_slots}) entries in one transaction"""
+        with span("data_manager.write_calculations", entries=len(batch)):
+            try:
+                entries = [(calculation, self.subject_usage(usage)) for calculation, usage in batch]
+                self.store.add_calculations(entries, today=date.today().isoformat())
+                self.refresh_subject_resolver({name for _, usage in entries for name in usage})
+            except Exception as e:
+                print(f"Error saving calculations: {e}")
     
+    @timed("data_manager.history")
     def get_calculation_history(self, limit=10):
         """Get recent calculation history"""
+        self.flush()
         try:
-            with open(self.history_file, 'r') as f:
-                history = json.load(f)
-            
-            return history[-limit:]
+            return self.store.recent_calculations(limit)
         except Exception as e:
             print(f"Error reading history: {e}")
             return []
     
+    @timed("data_manager.history_query")
+    def query_history(self, start_date=None, end_date=None, subject=None, last_date=None, cursor=None, limit=50):
+        """Get one page of history, newest first, filtered by day range, subject and semester end
+
+        Returns (entries, next_cursor); pass next_cursor back to get the
+        following page. It is None when there are no more entries.
+        """
+        self.flush()
+        try:
+            return self.store.query_calculations(
+                since=start_date.isoformat() if start_date else None,
+                until=(end_date + timedelta(days=1)).isoformat() if end_date else None,
+                subject=subject or None,
+                last_date=last_date.isoformat() if last_date else None,
+                cursor=cursor,
+                limit=limit
+            )
+        except Exception as e:
+            print(f"Error querying history: {e}")
+            return [], None
+    
+    @timed("data_manager.export_csv")
     def export_to_csv(self, filepath, calculations=None):
         """Export calculations to CSV format"""
+        import csv
+        
         try:
             if calculations is None:
                 calculations = self.get_calculation_history(limit=100)
@@ -116,7 +269,14 @@ class DataManager:
                 
                 # Write data
                 for calc in calculations:
+                    results = {r['subject']: r for r in calc.get('results', [])}
+                    # Entries saved before per-subject results carry one summary for the whole calculation
+                    legacy_summary = calc.get('summary', '').replace('\n', '; ')
                     for subject, weekly in calc['subjects'].items():
+                        if subject in results:
+                            summary = self.format_subject_result(results[subject])
+                        else:
+                            summary, legacy_summary = legacy_summary, ''
                         writer.writerow([
                             calc['timestamp'],
                             subject,
@@ -124,7 +284,7 @@ class DataManager:
                             calc['conducted'].get(subject, 0),
                             calc['last_date'],
                             ', '.join(calc['holidays']),
-                            calc['summary'].replace('\n', '; ')
+                            summary
                         ])
             
             return True
@@ -132,27 +292,63 @@ class DataManager:
             print(f"Error exporting to CSV: {e}")
             return False
     
+    @timed("data_manager.export_history")
+    def export_history(self, filepath, fmt=None, columns=None, start_date=None, end_date=None,
+                       subject=None, last_date=None):
+        """Stream the saved history to CSV, JSON Lines or Parquet, one row per subject
+        
+        The format follows the file extension unless ``fmt`` is given;
+        ``columns`` selects a subset of history_export.EXPORT_COLUMNS and the
+        other arguments filter like query_history(). Returns (path written,
+        row count), or None on error.
+        """
+        from history_export import export_rows
+        
+        self.flush()
+        try:
+            chunks = self.store.iter_result_rows(
+                since=start_date.isoformat() if start_date else None,
+                until=(end_date + timedelta(days=1)).isoformat() if end_date else None,
+                subject=subject or None,
+                last_date=last_date.isoformat() if last_date else None
+            )
+            return export_rows(chunks, filepath, fmt=fmt, columns=columns)
+        except Exception as e:
+            print(f"Error exporting history: {e}")
+            return None
+    
+    def format_subject_result(self, result):
+        """Format a stored per-subject result as a single CSV cell"""
+        return (
+            f"Required: {result['required']}; Conducted: {result['conducted']}; "
+            f"Will be conducted regularly: {result['remaining_regular']}; "
+            f"Missed due to holidays: {result['missed_in_holidays']}; "
+            f"Extra needed: {result['extra_needed']}"
+        )
+    
+    @timed("data_manager.subject_statistics")
     def get_subject_statistics(self):
         """Get statistics about detected subjects"""
+        self.flush()
         try:
-            with open(self.subjects_file, 'r') as f:
-                subjects_db = json.load(f)
-            
-            return {
-                "total_subjects": len(subjects_db),
-                "most_common": sorted(
-                    [(sub, data["count"]) for sub, data in subjects_db.items()],
-                    key=lambda x: x[1],
-                    reverse=True
-                )[:10],
-                "recently_added": [
-                    sub for sub, data in sorted(
-                        subjects_db.items(),
-                        key=lambda x: x[1]["last_seen"],
-                        reverse=True
-                    )[:5]
-                ]
-            }
+            return self.store.subject_statistics()
         except Exception as e:
             print(f"Error getting subject statistics: {e}")
             return {}
+    
+    @timed("data_manager.save_project")
+    def save_project(self, name, project_data):
+        """Store project data in the database, keyed by file path"""
+        try:
+            self.store.save_project(name, project_data)
+        except Exception as e:
+            print(f"Error saving project: {e}")
+    
+    @timed("data_manager.load_project")
+    def load_project(self, name):
+        """Load project data from the database, or None if unknown"""
+        try:
+            return self.store.load_project(name)
+        except Exception as e:
+            print(f"Error loading project: {e}")
+            return None
@@ -1,16 +1,19 @@
-from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QPushButton,
-                             QLabel, QFileDialog, QTableWidget, QTableWidgetItem,
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton,
+                             QLabel, QFileDialog, QTableView, QAbstractItemView,
                              QHBoxLayout, QDateEdit, QMessageBox, QLineEdit, QHeaderView, 
                              QCalendarWidget, QListWidget, QListWidgetItem, QTextEdit, QMenuBar, QMenu,
                              QProgressBar, QStatusBar, QSplitter, QDialog, QFormLayout, QCheckBox,
-                             QSpinBox, QComboBox, QDialogButtonBox)
-from PyQt6.QtCore import QDate, Qt, QSettings, QTimer
-from PyQt6.QtGui import QFont, QAction, QPalette, QKeySequence
+                             QSpinBox, QComboBox, QDialogButtonBox, QTableWidget, QTableWidgetItem)
+from PyQt6.QtCore import QDate, Qt, QSettings, QTimer, QThreadPool
+from PyQt6.QtGui import QFont, QAction, QPalette, QKeySequence, QTextCursor
 import json
-import sqlite3
 import os
-from calculator import calculate_summary
+from workers import CalculationWorker, ImportWorker, InstrumentationSignals
+from instrumentation import instrumentation, span
+from subject_model import SubjectTableModel, DayCounterDelegate, SECTION_COL, SUBJECT_COL, FIRST_DAY_COL
 from data_manager import DataManager
+from config import get_config
+from persistence import atomic_write_text
 import datetime
 import json
 
@@ -31,9 +34,6 @@ class ExtraClassApp(QMainWindow):
         # Create status bar with progress
         self.create_status_bar()
         
-        # Initialize database
-        self.init_database()
-        
         # Load recent files
         self.recent_files = self.settings.value('recent_files', [], type=list)[:5]
 
@@ -67,23 +67,36 @@ class ExtraClassApp(QMainWindow):
         table_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
         layout.addWidget(table_label)
         
-        self.table = QTableWidget(0, 10)
-        self.table.setHorizontalHeaderLabels(["Subject", "Conducted", "Weekly", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"])
+        self.model = SubjectTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        
+        # Day columns paint their +/- counters through a delegate
+        self.day_delegate = DayCounterDelegate(self.table)
+        for i in range(FIRST_DAY_COL, FIRST_DAY_COL + 7):
+            self.table.setItemDelegateForColumn(i, self.day_delegate)
+        
+        # Uniform row heights keep scrolling cheap for large tables
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(33)
         
         # Set column widths and resize modes
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)  # Subject - resizable
-        for i in range(1, 10):  # All other columns fixed width
+        header.setSectionResizeMode(SECTION_COL, QHeaderView.ResizeMode.Interactive)  # Section - resizable
+        header.setSectionResizeMode(SUBJECT_COL, QHeaderView.ResizeMode.Interactive)  # Subject - resizable
+        for i in range(SUBJECT_COL + 1, FIRST_DAY_COL + 7):  # All other columns fixed width
             header.setSectionResizeMode(i, QHeaderView.ResizeMode.Fixed)
         
         # Set specific column widths
-        self.table.setColumnWidth(0, 120)  # Subject
-        self.table.setColumnWidth(1, 80)   # Conducted
-        self.table.setColumnWidth(2, 60)   # Weekly
-        for i in range(3, 10):  # Day columns
+        self.table.setColumnWidth(SECTION_COL, 80)    # Section (BATCH)
+        self.table.setColumnWidth(SUBJECT_COL, 120)   # Subject
+        self.table.setColumnWidth(SUBJECT_COL + 1, 80)   # Conducted
+        self.table.setColumnWidth(SUBJECT_COL + 2, 60)   # Weekly
+        for i in range(FIRST_DAY_COL, FIRST_DAY_COL + 7):  # Day columns
             self.table.setColumnWidth(i, 80)
         
-        self.table.setStyleSheet("QTableWidget { gridline-color: #d0d0d0; }")
+        self.table.setStyleSheet("QTableView { gridline-color: #d0d0d0; }")
         self.table.setMinimumHeight(300)
         layout.addWidget(self.table)
         
@@ -102,9 +115,6 @@ class ExtraClassApp(QMainWindow):
         edit_note.setStyleSheet("color: #666; font-style: italic; font-size: 10px;")
         layout.addWidget(edit_note)
         
-        # Connect table changes to update weekly slots
-        self.table.itemChanged.connect(self.update_weekly_slots)
-
         # Date and holiday section
         settings_layout = QVBoxLayout()
         settings_layout.setSpacing(5)
@@ -174,6 +184,12 @@ class ExtraClassApp(QMainWindow):
         button_layout.addWidget(self.reset_btn)
         layout.addLayout(button_layout)
         
+        # Live results recalculate edited rows as you type; Calculate still saves to history
+        self.live_check = QCheckBox("Live results")
+        self.live_check.setChecked(self.settings.value('live_results', False, type=bool))
+        self.live_check.toggled.connect(self.toggle_live_results)
+        layout.addWidget(self.live_check)
+        
         # Add left widget to splitter
         main_splitter.addWidget(left_widget)
         
@@ -206,9 +222,32 @@ class ExtraClassApp(QMainWindow):
         self.setCentralWidget(main_splitter)
 
         self.subjects = {}
-        self.current_summary = ""
+        self.current_result = None
+        self.free_slots = {}  # {section: [[weekday, slot label], ...]} from the imported timetable
         self.selected_holidays = set()
         
+        # Background calculation state
+        self.thread_pool = QThreadPool.globalInstance()
+        self.calculation_worker = None
+        self.calculation_job_id = 0
+        self.import_worker = None
+        self.import_job_id = 0
+        self.import_file = None
+        self.import_row_count = 0
+        
+        # Live recalculation state: edited rows are recalculated after a short debounce
+        self.live_calculation = None
+        self.live_dirty_rows = set()
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(150)
+        self.live_timer.timeout.connect(self.refresh_live_results)
+        self.model.dataChanged.connect(self.on_model_data_changed)
+        self.model.modelReset.connect(self.schedule_live_rebuild)
+        self.model.rowsInserted.connect(self.schedule_live_rebuild)
+        self.model.rowsRemoved.connect(self.schedule_live_rebuild)
+        self.date_input.dateChanged.connect(self.schedule_live_rebuild)
+        
         # Calculate button enabled when data is available
         self.calc_btn.setEnabled(True)
         
@@ -257,6 +296,11 @@ class ExtraClassApp(QMainWindow):
         theme_action.triggered.connect(self.toggle_theme)
         view_menu.addAction(theme_action)
         
+        history_action = QAction('Calculation History...', self)
+        history_action.setShortcut('Ctrl+H')
+        history_action.triggered.connect(self.show_history)
+        view_menu.addAction(history_action)
+        
         view_menu.addSeparator()
         
         fullscreen_action = QAction('Toggle Fullscreen', self)
@@ -280,6 +324,41 @@ class ExtraClassApp(QMainWindow):
         settings_action.setShortcut('Ctrl+,')
         settings_action.triggered.connect(self.show_preferences)
         tools_menu.addAction(settings_action)
+        
+        what_if_action = QAction('What-If Scenarios...', self)
+        what_if_action.triggered.connect(self.show_what_if)
+        tools_menu.addAction(what_if_action)
+        
+        schedule_action = QAction('Schedule Extra Classes...', self)
+        schedule_action.triggered.connect(self.show_extra_class_plan)
+        tools_menu.addAction(schedule_action)
+        
+        # Profiler submenu: timing spans and one-shot profiling captures
+        profiler_menu = tools_menu.addMenu('Profiler')
+        
+        self.record_timings_action = QAction('Record Timings', self)
+        self.record_timings_action.setCheckable(True)
+        self.record_timings_action.setChecked(self.settings.value('record_timings', False, type=bool))
+        self.record_timings_action.toggled.connect(self.toggle_record_timings)
+        profiler_menu.addAction(self.record_timings_action)
+        
+        profile_action = QAction('Profile Next Operation (cProfile)', self)
+        profile_action.triggered.connect(lambda: self.capture_next_operation('cprofile'))
+        profiler_menu.addAction(profile_action)
+        
+        memory_action = QAction('Trace Memory of Next Operation (tracemalloc)', self)
+        memory_action.triggered.connect(lambda: self.capture_next_operation('tracemalloc'))
+        profiler_menu.addAction(memory_action)
+        
+        profiler_menu.addSeparator()
+        
+        dump_action = QAction('Save Timings as JSON...', self)
+        dump_action.triggered.connect(self.save_timings)
+        profiler_menu.addAction(dump_action)
+        
+        clear_action = QAction('Clear Timings', self)
+        clear_action.triggered.connect(instrumentation.clear)
+        profiler_menu.addAction(clear_action)
     
     def add_holiday(self, date):
         """Add selected date to holiday list"""
@@ -289,98 +368,18 @@ class ExtraClassApp(QMainWindow):
             item = QListWidgetItem(date.toString("dd/MM/yyyy"))
             item.setData(Qt.ItemDataRole.UserRole, date_str)
             self.holiday_list.addItem(item)
+            self.schedule_live_rebuild()
     
     def remove_holiday(self, item):
         """Remove holiday from list"""
         date_str = item.data(Qt.ItemDataRole.UserRole)
         self.selected_holidays.discard(date_str)
         self.holiday_list.takeItem(self.holiday_list.row(item))
+        self.schedule_live_rebuild()
     
-    def update_weekly_slots_for_row(self, row):
-        """Update weekly slots for a specific row"""
-        total = 0
-        
-        # Sum all day counters from widgets
-        for col in range(3, 10):  # Mon to Sun columns
-            widget = self.table.cellWidget(row, col)
-            if widget:
-                # Find the counter label in the widget
-                counter_label = widget.findChild(QLabel)
-                if counter_label:
-                    total += int(counter_label.text())
-        
-        # Update weekly slots column
-        weekly_item = self.table.item(row, 2)
-        if weekly_item:
-            weekly_item.setText(str(total))
-            self.update_weekly_background(row)
-    
-    def update_weekly_background(self, row):
-        """Update weekly column background based on current theme"""
-        weekly_item = self.table.item(row, 2)
-        if weekly_item:
-            weekly_item.setBackground(Qt.GlobalColor.transparent)
-    
-    def update_weekly_slots(self, item):
-        """Auto-update weekly slots when day counters change (for text editing)"""
-        if item and item.column() >= 3 and item.column() <= 9:  # Day columns
-            self.update_weekly_slots_for_row(item.row())
-    
-    def create_day_counter_widget(self, row, col, initial_count):
-        """Create a widget with counter and +/- buttons for day cells"""
-        widget = QWidget()
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(4, 4, 4, 4)
-        layout.setSpacing(4)
-        
-        # Minus button
-        minus_btn = QPushButton("-")
-        minus_btn.setFixedSize(20, 25)
-        minus_btn.setStyleSheet("QPushButton { font-size: 12px; font-weight: bold; }")
-        
-        # Counter label
-        counter_label = QLabel(str(initial_count))
-        counter_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        counter_label.setFixedWidth(30)
-        counter_label.setStyleSheet("QLabel { font-size: 12px; }")
-        
-        # Plus button
-        plus_btn = QPushButton("+")
-        plus_btn.setFixedSize(20, 25)
-        plus_btn.setStyleSheet("QPushButton { font-size: 12px; font-weight: bold; }")
-        
-        # Connect buttons
-        minus_btn.clicked.connect(lambda: self.adjust_counter(row, col, counter_label, -1))
-        plus_btn.clicked.connect(lambda: self.adjust_counter(row, col, counter_label, 1))
-        
-        layout.addWidget(minus_btn)
-        layout.addWidget(counter_label)
-        layout.addWidget(plus_btn)
-        
-        return widget
-    
-    def adjust_counter(self, row, col, label, change):
-        """Adjust counter value and update weekly total"""
-        current_count = int(label.text())
-        new_count = max(0, current_count + change)
-        label.setText(str(new_count))
-        
-        # Update weekly slots
-        self.update_weekly_slots_for_row(row)
-    
-    def extract_subject_name(self, cell_value):
-        """Extract subject name from timetable cell"""
-        # Remove common suffixes and extract subject code
-        cell_value = cell_value.replace('-L', '').replace('-P', '').replace(' Lab', '')
-        
-        # Split by space or hyphen and take first meaningful part
-        parts = cell_value.replace('(', ' ').replace(')', ' ').split()
-        if parts:
-            subject = parts[0].strip()
-            # Filter out common non-subject words
-            if subject.upper() not in ['FBL', 'LUNCH', 'BREAK', '']:
-                return subject.upper()
-        return None
+    def adjust_counter(self, row, col, change):
+        """Adjust a day counter value; the model updates the weekly total"""
+        self.model.adjust_day_count(row, col - FIRST_DAY_COL, change)
     
     def validate_days_schedule(self, schedule):
         """Validate days schedule format: Mon-2,Tue-1,Thu-2"""
@@ -404,163 +403,91 @@ class ExtraClassApp(QMainWindow):
                 "Excel Files (*.xlsx *.xls);;CSV Files (*.csv)"
             )
             if file:
-                import pandas as pd
-                
-                # Read Excel/CSV file
-                if file.endswith('.csv'):
-                    df = pd.read_csv(file, header=0)
-                else:
-                    df = pd.read_excel(file, header=0)
-                
-                # If columns are unnamed, try using first row as headers
-                if any('Unnamed:' in str(col) for col in df.columns):
-                    if file.endswith('.csv'):
-                        df = pd.read_csv(file, header=1)  # Try second row as header
-                    else:
-                        df = pd.read_excel(file, header=1)  # Try second row as header
-                    
-                    # If still unnamed, use first data row as column names
-                    if any('Unnamed:' in str(col) for col in df.columns):
-                        if file.endswith('.csv'):
-                            df = pd.read_csv(file, header=None)
-                        else:
-                            df = pd.read_excel(file, header=None)
-                        
-                        # Use first row as column names
-                        df.columns = df.iloc[0]
-                        df = df.drop(df.index[0]).reset_index(drop=True)
-                
-                # Find DAY column (flexible naming)
-                day_col = None
-                for col in df.columns:
-                    col_str = str(col).upper().strip()
-                    if col_str in ['DAY', 'DAYS', 'DAY OF WEEK', 'WEEKDAY'] or any(day in col_str for day in ['MON', 'TUE', 'WED']):
-                        day_col = col
-                        break
-                
-                # If no DAY column found, check if first column contains day names
-                if not day_col and len(df.columns) > 0:
-                    first_col = df.columns[0]
-                    first_col_values = df[first_col].astype(str).str.upper()
-                    if any(day in ' '.join(first_col_values.values) for day in ['MON', 'TUE', 'WED', 'THU', 'FRI']):
-                        day_col = first_col
-                
-                if not day_col:
-                    QMessageBox.warning(self, "Invalid Format", 
-                                      f"Excel file must have a DAY column or days in first column. Found columns: {list(df.columns)}\nFirst few rows: {df.head(3).to_string()}")
-                    return
-                
-                # Clear existing data
-                self.table.setRowCount(0)
-                
-                # Extract subjects from timetable
-                subjects_count = {}
+                # A new import supersedes any in-flight one
+                self.cancel_import()
                 
-                # Skip header row and process each day
-                for _, row in df.iterrows():
-                    day = str(row[day_col]).strip().upper()
-                    if day not in ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']:
-                        continue
-                    
-                    # Get time slot columns
-                    time_cols = [col for col in df.columns if col not in [day_col, 'BATCH']]
-                    
-                    # Check each time slot for subjects
-                    for col in time_cols:
-                        cell_value = str(row[col]).strip() if pd.notna(row[col]) else ''
-                        if not cell_value or cell_value == 'nan':
-                            continue
-                        
-                        subject = self.extract_subject_name(cell_value)
-                        if subject:
-                            # Check if it's a lab class
-                            lab_keywords = ['lab', 'practical', 'prac', 'laboratory', 'workshop']
-                            is_lab = any(keyword in cell_value.lower() for keyword in lab_keywords)
-                            
-                            # Check for -P suffix (Practical)
-                            has_p_suffix = '-p' in cell_value.lower()
-                            
-                            # Also check if subject name itself indicates lab
-                            subject_lab = 'lab' in subject.lower() if subject else False
-                            
-                            class_count = 2 if (is_lab or subject_lab or has_p_suffix) else 1
-                            
-                            if subject not in subjects_count:
-                                subjects_count[subject] = {}
-                            if day not in subjects_count[subject]:
-                                subjects_count[subject][day] = 0
-                            subjects_count[subject][day] += class_count
+                self.import_file = file
+                self.import_row_count = 0
                 
-                # Add subjects to table
-                for subject, day_counts in subjects_count.items():
-                    days_schedule = []
-                    weekly_total = 0
-                    
-                    for day, count in day_counts.items():
-                        days_schedule.append(f"{day.title()}-{count}")
-                        weekly_total += count
-                    
-                    if weekly_total > 0:
-                        # Convert to day_counts dictionary
-                        day_counts = {}
-                        for day_schedule in days_schedule:
-                            if '-' in day_schedule:
-                                day, count = day_schedule.split('-', 1)
-                                day_counts[day] = int(count)
-                            else:
-                                # Handle case where there's no '-' separator
-                                day_counts[day_schedule] = 1
-                        
-                        self.add_subject_to_table(subject, 0, weekly_total, day_counts)
+                self.progress_bar.setVisible(True)
+                self.progress_bar.setRange(0, 0)
+                self.status_bar.showMessage(f"Reading {os.path.basename(file)}...")
                 
-                self.file_label.setText(f"Loaded: {file.split('/')[-1]} ({len(df)} subjects)")
-                self.result_label.setText("Excel timetable loaded. Enter conducted classes and calculate.")
+                self.import_job_id += 1
+                worker = ImportWorker(self.import_job_id, file, self.data_manager.parse_cache,
+                                      self.data_manager.subject_resolver)
+                worker.signals.sheet_parsed.connect(self.on_sheet_parsed)
+                worker.signals.finished.connect(self.on_import_finished)
+                worker.signals.error.connect(self.on_import_error)
+                self.import_worker = worker
+                self.thread_pool.start(worker)
                 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load Excel file: {str(e)}")
     
+    def cancel_import(self):
+        """Cancel the in-flight timetable import, if any"""
+        if self.import_worker is not None:
+            self.import_worker.cancel()
+            self.import_worker = None
+    
+    def on_sheet_parsed(self, job_id, sheet, index, total):
+        """Append one parsed sheet to the table (stale jobs are ignored)"""
+        if job_id != self.import_job_id:
+            return
+        
+        # Sections come from the BATCH column; in multi-sheet workbooks the sheet name is included
+        sections = sheet.row_sections(qualify=total > 1)
+        if index == 0:
+            # The first sheet replaces existing data; later sheets are appended as they arrive
+            self.model.set_subject_matrix(sheet.subjects, sheet.matrix, sections)
+            self.free_slots = {}
+        else:
+            self.model.append_subject_matrix(sheet.subjects, sheet.matrix, sections)
+        self.free_slots.update(sheet.section_free_slots(qualify=total > 1))
+        self.import_row_count += sheet.row_count
+        
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(index + 1)
+        self.status_bar.showMessage(f"Read sheet {index + 1}/{total}: {sheet.name}")
+    
+    def on_import_finished(self, job_id, sheet_count):
+        if job_id != self.import_job_id:
+            return
+        self.progress_bar.setVisible(False)
+        self.import_worker = None
+        
+        sheets = f", {sheet_count} sheets" if sheet_count > 1 else ""
+        self.file_label.setText(f"Loaded: {os.path.basename(self.import_file)} ({self.import_row_count} subjects{sheets})")
+        self.result_label.setText("Excel timetable loaded. Enter conducted classes and calculate.")
+        self.status_bar.showMessage("Timetable loaded", 3000)
+    
+    def on_import_error(self, job_id, message):
+        if job_id != self.import_job_id:
+            return
+        self.progress_bar.setVisible(False)
+        self.import_worker = None
+        self.status_bar.clearMessage()
+        QMessageBox.warning(self, "Invalid Format", message)
+    
     def add_subject(self):
-        """Add new subject row"""
-        self.add_subject_to_table("New Subject", 0, 3)
+        """Add new subject row (in the selected row's section)"""
+        current_row = self.table.currentIndex().row()
+        section = self.model.sections[current_row] if current_row >= 0 else ''
+        self.add_subject_to_table("New Subject", 0, 3, section=section)
     
     def remove_subject(self):
         """Remove selected subject"""
-        current_row = self.table.currentRow()
+        current_row = self.table.currentIndex().row()
         if current_row >= 0:
-            self.table.removeRow(current_row)
+            self.model.remove_subject(current_row)
     
-    def add_subject_to_table(self, subject, conducted, weekly_slots, day_counts=None):
-        """Add subject to table with day counters"""
+    def add_subject_to_table(self, subject, conducted, weekly_slots, day_counts=None, section=''):
+        """Add subject to table with day counters (weekly slots follow the day counts)"""
         if day_counts is None:
             day_counts = {'Mon': 1, 'Wed': 1, 'Fri': 1}  # Default schedule
         
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        
-        # Subject name (editable)
-        subject_item = QTableWidgetItem(subject)
-        subject_item.setFlags(subject_item.flags() | Qt.ItemFlag.ItemIsEditable)
-        self.table.setItem(row, 0, subject_item)
-        
-        # Conducted classes (editable)
-        conducted_item = QTableWidgetItem(str(conducted))
-        conducted_item.setFlags(conducted_item.flags() | Qt.ItemFlag.ItemIsEditable)
-        self.table.setItem(row, 1, conducted_item)
-        
-        # Weekly slots (read-only, auto-calculated)
-        weekly_item = QTableWidgetItem(str(weekly_slots))
-        weekly_item.setFlags(weekly_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-        self.table.setItem(row, 2, weekly_item)
-        self.update_weekly_background(row)
-        
-        # Day counters with +/- buttons
-        days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        for i, day in enumerate(days):
-            count = day_counts.get(day, 0)
-            day_widget = self.create_day_counter_widget(row, 3 + i, count)
-            self.table.setCellWidget(row, 3 + i, day_widget)
-
-
+        self.model.add_subject(subject, conducted, day_counts, section)
 
     def validate_inputs(self):
         """Validate all user inputs"""
@@ -572,7 +499,7 @@ class ExtraClassApp(QMainWindow):
                 return False
 
             # Check if table has data
-            if self.table.rowCount() == 0:
+            if self.model.rowCount() == 0:
                 QMessageBox.warning(self, "No Data", "Please add subjects or upload Excel file first.")
                 return False
             
@@ -588,43 +515,26 @@ class ExtraClassApp(QMainWindow):
                     return False
 
             # Validate table data
-            for i in range(self.table.rowCount()):
-                subject = self.table.item(i, 0).text().strip()
-                conducted_text = self.table.item(i, 1).text().strip()
-                weekly_text = self.table.item(i, 2).text().strip()
-                # Build days schedule from day counter widgets
-                days_schedule_parts = []
-                days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-                for j, day in enumerate(days):
-                    widget = self.table.cellWidget(i, 3 + j)
-                    if widget:
-                        counter_label = widget.findChild(QLabel)
-                        if counter_label and int(counter_label.text()) > 0:
-                            days_schedule_parts.append(f"{day}-{counter_label.text()}")
-                days_schedule = ','.join(days_schedule_parts)
+            seen = set()
+            for i in range(self.model.rowCount()):
+                subject = self.model.display_name(i).strip()
                 
-                if not subject:
+                if not self.model.names[i].strip():
                     QMessageBox.warning(self, "Invalid Input", f"Subject name cannot be empty in row {i+1}.")
                     return False
                 
-                if not conducted_text.isdigit():
-                    QMessageBox.warning(self, "Invalid Input", f"Please enter a valid number for classes conducted in {subject}.")
+                if subject in seen:
+                    QMessageBox.warning(self, "Invalid Input", f"Subject {subject} appears more than once.")
                     return False
+                seen.add(subject)
                 
-                if not weekly_text.isdigit():
-                    QMessageBox.warning(self, "Invalid Input", f"Please enter a valid number for weekly slots in {subject}.")
-                    return False
-                
-                if int(conducted_text) < 0:
+                if self.model.conducted[i] < 0:
                     QMessageBox.warning(self, "Invalid Input", f"Classes conducted cannot be negative for {subject}.")
                     return False
                 
-                if int(weekly_text) <= 0:
-                    QMessageBox.warning(self, "Invalid Input", f"Weekly slots must be greater than 0 for {subject}.")
-                    return False
-                
-                # Validate that at least one day has classes
-                if not days_schedule_parts:
+                # Weekly slots are the sum of the day counters, so this also
+                # ensures at least one day has classes
+                if self.model.weekly[i] <= 0:
                     QMessageBox.warning(self, "Invalid Input", f"Subject {subject} must have at least one day with classes.")
                     return False
 
@@ -639,76 +549,144 @@ class ExtraClassApp(QMainWindow):
             if not self.validate_inputs():
                 return
 
+            sections_data = self.collect_sections_data()
+            last_date = self.date_input.date().toPyDate()
+            holidays = list(self.selected_holidays)
+
+            # A fresh calculation supersedes any in-flight one
+            self.cancel_calculation()
+
             # Show calculating state
-            self.calc_btn.setEnabled(False)
             self.result_label.setText("Calculating...")
             self.progress_bar.setVisible(True)
-            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(0)
             self.status_bar.showMessage("Calculating extra classes...")
 
-            # Use QTimer to defer calculation to avoid blocking
-            QTimer.singleShot(100, self.perform_calculation)
+            # Run calculation, rendering and history save on the thread pool
+            self.calculation_job_id += 1
+            worker = CalculationWorker(self.calculation_job_id, sections_data, last_date, holidays, self.data_manager,
+                                       get_config().semester_weeks)
+            worker.signals.progress.connect(self.on_calculation_progress)
+            worker.signals.finished.connect(self.on_calculation_finished)
+            worker.signals.error.connect(self.on_calculation_error)
+            worker.signals.saved.connect(self.on_calculation_saved)
+            self.calculation_worker = worker
+            self.thread_pool.start(worker)
             
         except Exception as e:
             QMessageBox.critical(self, "Calculation Error", f"Failed to calculate classes: {str(e)}")
-            self.calc_btn.setEnabled(True)
 
-    def perform_calculation(self):
-        """Perform the actual calculation (called after a short delay)"""
-        try:
-            print("Starting calculation...")
-            # Collect user edits
-            subjects_data = {}
-            for i in range(self.table.rowCount()):
-                subject = self.table.item(i, 0).text()
-                
-                # Build days schedule from widgets
-                days_schedule_parts = []
-                days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-                for j, day in enumerate(days):
-                    widget = self.table.cellWidget(i, 3 + j)
-                    if widget:
-                        counter_label = widget.findChild(QLabel)
-                        if counter_label and int(counter_label.text()) > 0:
-                            days_schedule_parts.append(f"{day}-{counter_label.text()}")
-                days_schedule = ','.join(days_schedule_parts)
-                
-                subjects_data[subject] = {
-                    'conducted': int(self.table.item(i, 1).text()),
-                    'weekly_slots': int(self.table.item(i, 2).text()),
-                    'days_schedule': days_schedule
-                }
+    def collect_sections_data(self):
+        """Collect subject rows from the table for calculation, grouped by section"""
+        return self.model.sections_data()
 
-            last_date = self.date_input.date().toPyDate()
-            holidays = list(self.selected_holidays)
+    def cancel_calculation(self):
+        """Cancel the in-flight calculation, if any"""
+        if self.calculation_worker is not None:
+            self.calculation_worker.cancel()
+            self.calculation_worker = None
 
-            summary = calculate_summary(subjects_data, last_date, holidays)
-            self.current_summary = summary
-            
-            # Display results as plain text
-            self.result_label.setText(summary)
-            self.export_btn.setEnabled(True)
-            self.calc_btn.setEnabled(True)
-            self.progress_bar.setVisible(False)
-            self.status_bar.showMessage("Calculation completed", 3000)
-            
-            # Save calculation
-            try:
-                conducted_dict = {subject: data['conducted'] for subject, data in subjects_data.items()}
-                self.data_manager.save_calculation(
-                    {subject: data['weekly_slots'] for subject, data in subjects_data.items()}, 
-                    conducted_dict, last_date, holidays, summary
-                )
-            except Exception as e:
-                print(f"Warning: Could not save calculation: {e}")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Calculation Error", f"Failed to calculate classes: {str(e)}")
-            self.calc_btn.setEnabled(True)
+    def on_calculation_progress(self, job_id, percent, message):
+        if job_id != self.calculation_job_id:
+            return
+        self.progress_bar.setValue(percent)
+        self.status_bar.showMessage(message)
+
+    def on_calculation_finished(self, job_id, result, summary):
+        """Show results delivered by the worker (stale jobs are ignored)"""
+        if job_id != self.calculation_job_id:
+            return
+        self.current_result = result
+        
+        # Display results as plain text; live patches must start from a fresh render
+        self.live_calculation = None
+        self.result_label.setText(summary)
+        self.export_btn.setEnabled(True)
+        self.status_bar.showMessage("Calculation completed", 3000)
+
+    def on_calculation_saved(self, job_id):
+        if job_id != self.calculation_job_id:
+            return
+        self.progress_bar.setValue(100)
+        self.progress_bar.setVisible(False)
+        self.calculation_worker = None
+
+    def on_calculation_error(self, job_id, message):
+        if job_id != self.calculation_job_id:
+            return
+        self.progress_bar.setVisible(False)
+        self.calculation_worker = None
+        self.result_label.setText(f"Error: {message}")
+        QMessageBox.critical(self, "Calculation Error", f"Failed to calculate classes: {message}")
 
+    def toggle_live_results(self, enabled):
+        self.settings.setValue('live_results', enabled)
+        self.schedule_live_rebuild()
+    
+    def on_model_data_changed(self, top_left, bottom_right, roles=()):
+        """Queue the edited rows for live recalculation"""
+        if not self.live_check.isChecked():
+            return
+        self.live_dirty_rows.update(range(top_left.row(), bottom_right.row() + 1))
+        self.live_timer.start()
+    
+    def schedule_live_rebuild(self, *args):
+        """Recalculate every row on the next live refresh (rows, date or holidays changed)"""
+        self.live_calculation = None
+        self.live_dirty_rows.clear()
+        if self.live_check.isChecked():
+            self.live_timer.start()
+    
+    def refresh_live_results(self):
+        """Recalculate changed rows only and show the results without saving history"""
+        if not self.live_check.isChecked() or self.model.rowCount() == 0:
+            return
+        
+        with span("live_refresh", rows=len(self.live_dirty_rows) if self.live_calculation else self.model.rowCount()):
+            self._refresh_live_results()
+    
+    def _refresh_live_results(self):
+        from calculator import LiveCalculation
+        
+        try:
+            if self.live_calculation is None:
+                self.live_calculation = LiveCalculation(self.date_input.date().toPyDate(), self.selected_holidays,
+                                                        get_config().semester_weeks)
+                self.live_calculation.rebuild(
+                    [self.model.row_values(row) for row in range(self.model.rowCount())]
+                )
+                self.result_label.setText(self.live_calculation.render())
+            else:
+                for row in self.live_dirty_rows:
+                    self.live_calculation.update_row(row, *self.model.row_values(row))
+                # Patch only the changed lines; replacing the whole document dominates on large tables
+                self.patch_result_lines(self.live_calculation.line_patches())
+            self.live_dirty_rows.clear()
+        except ValueError as e:
+            self.live_calculation = None
+            self.result_label.setText(f"Error: {e}")
+            return
+        
+        self.current_result = self.live_calculation.result
+        self.export_btn.setEnabled(True)
+    
+    def patch_result_lines(self, patches):
+        """Replace lines of the results text in place, given (first_line, text) pairs"""
+        document = self.result_label.document()
+        for first_line, text in patches:
+            start = document.findBlockByNumber(first_line)
+            end = document.findBlockByNumber(first_line + text.count("\n"))
+            if not start.isValid() or not end.isValid():
+                self.result_label.setText(self.live_calculation.render())
+                return
+            cursor = QTextCursor(start)
+            cursor.setPosition(end.position() + end.length() - 1, QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(text)
+    
     def export_results(self):
         try:
-            if not self.current_summary:
+            if self.current_result is None:
                 QMessageBox.warning(self, "No Data", "Please calculate classes first.")
                 return
                 
@@ -720,18 +698,53 @@ class ExtraClassApp(QMainWindow):
             )
             
             if file:
-                with open(file, 'w') as f:
+                with span("export", subjects=len(self.current_result)), open(file, 'w') as f:
                     f.write(f"Extra Class Counter Summary\n")
                     f.write(f"Generated on: {datetime.datetime.now()}\n")
                     f.write(f"Semester End Date: {self.date_input.date().toString()}\n")
                     f.write(f"Holidays: {', '.join(self.selected_holidays)}\n\n")
-                    f.write(self.current_summary)
+                    f.write(self.current_result.render())
                 
                 QMessageBox.information(self, "Success", f"Results exported to {file}")
                 
         except Exception as e:
             QMessageBox.critical(self, "Export Error", f"Failed to export results: {str(e)}")
     
+    def toggle_record_timings(self, enabled):
+        instrumentation.enabled = enabled
+        self.settings.setValue('record_timings', enabled)
+        if not enabled:
+            self.timing_label.setText("")
+    
+    def capture_next_operation(self, kind):
+        """Profile the next import, calculation, live refresh or export into the exports directory"""
+        export_dir = self.data_manager.config.get("paths.export_dir", "exports")
+        instrumentation.capture_next(kind, export_dir)
+        self.status_bar.showMessage(f"The next operation will be profiled ({kind})", 5000)
+    
+    def on_span_recorded(self, recorded):
+        capture = recorded.details.get("capture")
+        if capture:
+            self.status_bar.showMessage(f"Profile of {recorded.name} saved to {capture}", 10000)
+        if instrumentation.enabled:
+            self.timing_label.setText(f"{recorded.name}: {recorded.duration * 1000:.1f} ms")
+    
+    def save_timings(self):
+        """Dump the recorded timing spans as JSON"""
+        try:
+            export_dir = self.data_manager.config.get("paths.export_dir", "exports")
+            file, _ = QFileDialog.getSaveFileName(
+                self,
+                "Save Timings",
+                os.path.join(export_dir, f"timings_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"),
+                "JSON Files (*.json);;All Files (*)"
+            )
+            if file:
+                instrumentation.dump(file)
+                self.status_bar.showMessage(f"Timings saved to {file}", 5000)
+        except Exception as e:
+            QMessageBox.critical(self, "Save Error", f"Failed to save timings: {str(e)}")
+    
     def reset_all(self):
         """Reset all data and clear the interface"""
         reply = QMessageBox.question(self, "Reset All", 
@@ -739,8 +752,16 @@ class ExtraClassApp(QMainWindow):
                                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         
         if reply == QMessageBox.StandardButton.Yes:
+            # Drop any in-flight calculation
+            self.cancel_calculation()
+            self.calculation_job_id += 1
+            self.cancel_import()
+            self.import_job_id += 1
+            self.progress_bar.setVisible(False)
+            
             # Clear table
-            self.table.setRowCount(0)
+            self.model.clear()
+            self.free_slots = {}
             
             # Clear holidays
             self.holiday_list.clear()
@@ -751,7 +772,7 @@ class ExtraClassApp(QMainWindow):
             
             # Clear results
             self.result_label.setText("Upload Excel file or manually add subjects to start calculating extra classes needed.")
-            self.current_summary = ""
+            self.current_result = None
             
             # Reset file label
             self.file_label.setText("No file selected")
@@ -778,28 +799,16 @@ class ExtraClassApp(QMainWindow):
                 }
                 
                 # Save table data
-                for row in range(self.table.rowCount()):
-                    subject_data = {
-                        'name': self.table.item(row, 0).text(),
-                        'conducted': int(self.table.item(row, 1).text()),
-                        'weekly': int(self.table.item(row, 2).text()),
-                        'days': {}
-                    }
-                    
-                    # Get day counts from widgets
-                    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-                    for i, day in enumerate(days):
-                        widget = self.table.cellWidget(row, 3 + i)
-                        if widget:
-                            counter_label = widget.findChild(QLabel)
-                            if counter_label:
-                                subject_data['days'][day] = int(counter_label.text())
-                    
-                    project_data['subjects'].append(subject_data)
+                project_data['subjects'] = self.model.project_subjects()
+                if self.free_slots:
+                    project_data['free_slots'] = self.free_slots
                 
-                # Save to file
-                with open(file, 'w') as f:
-                    json.dump(project_data, f, indent=2)
+                # Save to file; a crash mid-save leaves the previous file intact
+                atomic_write_text(file, json.dumps(project_data, indent=2))
+                
+                # Keep a copy in the database; Recent Files falls back to it if the file goes missing
+                self.data_manager.save_project(file, project_data)
+                self.add_recent_file(file)
                 
                 QMessageBox.information(self, "Success", f"Project saved to {file}")
                 
@@ -821,7 +830,6 @@ class ExtraClassApp(QMainWindow):
                     project_data = json.load(f)
                 
                 # Clear existing data
-                self.table.setRowCount(0)
                 self.holiday_list.clear()
                 self.selected_holidays.clear()
                 
@@ -838,13 +846,12 @@ class ExtraClassApp(QMainWindow):
                     self.holiday_list.addItem(item)
                 
                 # Load subjects
-                for subject_data in project_data['subjects']:
-                    self.add_subject_to_table(
-                        subject_data['name'],
-                        subject_data['conducted'],
-                        subject_data['weekly'],
-                        subject_data['days']
-                    )
+                self.model.set_subjects([
+                    (subject_data['name'], subject_data['conducted'], subject_data['days'], subject_data.get('section', ''))
+                    for subject_data in project_data['subjects']
+                ])
+                self.free_slots = project_data.get('free_slots', {})
+                self.add_recent_file(file)
                 
                 self.file_label.setText(f"Loaded: {file.split('/')[-1]}")
                 QMessageBox.information(self, "Success", f"Project loaded from {file}")
@@ -870,9 +877,9 @@ class ExtraClassApp(QMainWindow):
             self.setStyleSheet("""
                 QMainWindow { background-color: #2b2b2b; color: white; }
                 QWidget { background-color: #2b2b2b; color: white; }
-                QTableWidget { background-color: #3c3c3c; color: white; gridline-color: #555; }
-                QTableWidget::item { background-color: #3c3c3c; }
-                QTableWidget::item:selected { background-color: #4a4a4a; }
+                QTableView { background-color: #3c3c3c; color: white; gridline-color: #555; }
+                QTableView::item { background-color: #3c3c3c; }
+                QTableView::item:selected { background-color: #4a4a4a; }
                 QPushButton { background-color: #4a4a4a; color: white; border: 1px solid #666; padding: 5px; }
                 QPushButton:hover { background-color: #5a5a5a; }
                 QLabel { color: white; }
@@ -904,30 +911,25 @@ class ExtraClassApp(QMainWindow):
         self.progress_bar.setMaximumWidth(200)
         self.status_bar.addPermanentWidget(self.progress_bar)
         
+        # Last recorded timing span
+        self.timing_label = QLabel("")
+        self.timing_label.setStyleSheet("color: gray;")
+        self.status_bar.addPermanentWidget(self.timing_label)
+        
+        # Spans are recorded on worker threads; the signal delivers them on the GUI thread
+        self.instrumentation_signals = InstrumentationSignals()
+        self.instrumentation_signals.span_recorded.connect(self.on_span_recorded)
+        instrumentation.add_listener(self.instrumentation_signals.span_recorded.emit)
+        instrumentation.enabled = self.settings.value('record_timings', False, type=bool)
+        
         # Status label
         self.status_label = QLabel("Ready")
         self.status_bar.addWidget(self.status_label)
     
-    def init_database(self):
-        """Initialize SQLite database for better data storage"""
-        db_path = os.path.join(os.path.expanduser('~'), '.extraclasscounter', 'data.db')
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        
-        self.db_conn = sqlite3.connect(db_path)
-        cursor = self.db_conn.cursor()
-        
-        # Create tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS projects (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                data TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        self.db_conn.commit()
+    @property
+    def db_conn(self):
+        """The DataManager's SQLite connection, opened on first use"""
+        return self.data_manager.store.conn
     
     def setup_shortcuts(self):
         """Setup keyboard shortcuts"""
@@ -951,6 +953,12 @@ class ExtraClassApp(QMainWindow):
         """Make panels resizable"""
         self.result_label.setMaximumHeight(16777215)
     
+    def closeEvent(self, event):
+        """Let running calculations and queued history saves finish before the window closes"""
+        self.thread_pool.waitForDone(5000)
+        self.data_manager.flush(5)
+        super().closeEvent(event)
+    
     def toggle_fullscreen(self):
         """Toggle fullscreen mode"""
         if self.isFullScreen():
@@ -961,6 +969,39 @@ class ExtraClassApp(QMainWindow):
     def show_preferences(self):
         """Show preferences dialog"""
         dialog = PreferencesDialog(self)
+        if dialog.exec():
+            # Semester weeks may have changed
+            self.schedule_live_rebuild()
+    
+    def show_what_if(self):
+        """Show extra classes needed across alternative end dates and holiday sets"""
+        if self.model.rowCount() == 0:
+            QMessageBox.warning(self, "No Data", "Please add subjects or upload Excel file first.")
+            return
+        dialog = WhatIfDialog(self.model.sections_data(), self.date_input.date().toPyDate(),
+                              sorted(self.selected_holidays), get_config().semester_weeks, self)
+        dialog.exec()
+    
+    def show_extra_class_plan(self):
+        """Propose dated extra classes in the timetable's free slots"""
+        if self.model.rowCount() == 0:
+            QMessageBox.warning(self, "No Data", "Please add subjects or upload Excel file first.")
+            return
+        if not self.free_slots:
+            QMessageBox.warning(self, "No Free Slots",
+                                "Free slots come from the timetable; please upload an Excel timetable first.")
+            return
+        try:
+            dialog = ExtraClassDialog(self.model.sections_data(), self.free_slots,
+                                      self.date_input.date().toPyDate(), sorted(self.selected_holidays), self)
+        except ValueError as e:
+            QMessageBox.warning(self, "Input Error", str(e))
+            return
+        dialog.exec()
+    
+    def show_history(self):
+        """Show the calculation history browser"""
+        dialog = HistoryDialog(self.data_manager, self)
         dialog.exec()
     
     def add_recent_file(self, file_path):
@@ -973,18 +1014,23 @@ class ExtraClassApp(QMainWindow):
             self.settings.setValue('recent_files', self.recent_files)
     
     def open_recent_file(self, file_path):
-        """Open a recent file"""
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    project_data = json.load(f)
-                self.load_project_data(project_data)
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to open recent file: {str(e)}")
+        """Open a recent file, or its database copy if the file is gone"""
+        try:
+            if os.path.exists(file_path):
+                # Unchanged files are served from the parsed copy in the cache
+                project_data = self.data_manager.parse_cache.load_json(file_path)
+            else:
+                project_data = self.data_manager.load_project(file_path)
+                if project_data is None:
+                    QMessageBox.warning(self, "File Not Found", f"{file_path} no longer exists.")
+                    return
+                self.status_bar.showMessage(f"{os.path.basename(file_path)} is missing; restored the saved copy", 5000)
+            self.load_project_data(project_data)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to open recent file: {str(e)}")
     
     def load_project_data(self, project_data):
         """Load project data"""
-        self.table.setRowCount(0)
         self.holiday_list.clear()
         self.selected_holidays.clear()
         
@@ -998,13 +1044,11 @@ class ExtraClassApp(QMainWindow):
             item.setData(Qt.ItemDataRole.UserRole, holiday)
             self.holiday_list.addItem(item)
         
-        for subject_data in project_data['subjects']:
-            self.add_subject_to_table(
-                subject_data['name'],
-                subject_data['conducted'],
-                subject_data['weekly'],
-                subject_data['days']
-            )
+        self.model.set_subjects([
+            (subject_data['name'], subject_data['conducted'], subject_data['days'], subject_data.get('section', ''))
+            for subject_data in project_data['subjects']
+        ])
+        self.free_slots = project_data.get('free_slots', {})
 
 class PreferencesDialog(QDialog):
     def __init__(self, parent=None):
@@ -1020,14 +1064,382 @@ class PreferencesDialog(QDialog):
         
         self.weeks_spin = QSpinBox()
         self.weeks_spin.setRange(10, 30)
-        self.weeks_spin.setValue(15)
+        self.weeks_spin.setValue(get_config().semester_weeks)
         layout.addRow("Default weeks:", self.weeks_spin)
         
         buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
-        buttons.accepted.connect(self.accept)
+        buttons.accepted.connect(self.save_and_accept)
         buttons.rejected.connect(self.reject)
         layout.addRow(buttons)
         
         self.setLayout(layout)
+    
+    def save_and_accept(self):
+        """Store the preferences in the shared config (written to disk after a short delay)"""
+        get_config().set("app.semester_weeks", self.weeks_spin.value())
+        self.accept()
+
+class HistoryDialog(QDialog):
+    """Browse saved calculations a page at a time, filtered by date, subject and semester end"""
+    
+    PAGE_SIZE = 50
+    
+    def __init__(self, data_manager, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.entries = []
+        self.cursor = None
+        self.setWindowTitle("Calculation History")
+        self.resize(800, 600)
+        
+        layout = QVBoxLayout()
+        
+        # Filters: each date filter only applies while its box is ticked
+        filters = QHBoxLayout()
+        self.subject_input = QLineEdit()
+        self.subject_input.setPlaceholderText("Subject (ADA, or ADA [CSE A] for one section)")
+        self.subject_input.returnPressed.connect(self.apply_filters)
+        filters.addWidget(self.subject_input)
+        
+        today = QDate.currentDate()
+        self.from_check, self.from_date = self.add_date_filter(filters, "From", today.addMonths(-1))
+        self.to_check, self.to_date = self.add_date_filter(filters, "To", today)
+        self.semester_check, self.semester_date = self.add_date_filter(filters, "Semester end", today)
+        
+        search_btn = QPushButton("Search")
+        search_btn.clicked.connect(self.apply_filters)
+        filters.addWidget(search_btn)
+        layout.addLayout(filters)
+        
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Saved", "Semester End", "Subjects", "Conducted", "Extra Needed"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.currentCellChanged.connect(self.show_details)
+        layout.addWidget(self.table)
+        
+        self.details = QTextEdit()
+        self.details.setReadOnly(True)
+        self.details.setMaximumHeight(160)
+        layout.addWidget(self.details)
+        
+        footer = QHBoxLayout()
+        self.count_label = QLabel()
+        footer.addWidget(self.count_label)
+        footer.addStretch()
+        self.more_btn = QPushButton("Load More")
+        self.more_btn.clicked.connect(self.load_page)
+        footer.addWidget(self.more_btn)
+        export_btn = QPushButton("Export...")
+        export_btn.clicked.connect(self.export_history)
+        footer.addWidget(export_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        footer.addWidget(close_btn)
+        layout.addLayout(footer)
+        
+        self.setLayout(layout)
+        self.apply_filters()
+    
+    def add_date_filter(self, layout, label, initial):
+        check = QCheckBox(label)
+        date_edit = QDateEdit(initial)
+        date_edit.setCalendarPopup(True)
+        date_edit.setDisplayFormat("dd/MM/yyyy")
+        date_edit.setEnabled(False)
+        check.toggled.connect(date_edit.setEnabled)
+        layout.addWidget(check)
+        layout.addWidget(date_edit)
+        return check, date_edit
+    
+    def filters(self):
+        def checked_date(check, date_edit):
+            return date_edit.date().toPyDate() if check.isChecked() else None
+        
+        return {
+            "start_date": checked_date(self.from_check, self.from_date),
+            "end_date": checked_date(self.to_check, self.to_date),
+            "subject": self.subject_input.text().strip() or None,
+            "last_date": checked_date(self.semester_check, self.semester_date),
+        }
+    
+    def apply_filters(self):
+        """Start again from the newest matching calculation"""
+        self.entries = []
+        self.cursor = None
+        self.table.setRowCount(0)
+        self.details.clear()
+        self.load_page()
+    
+    def load_page(self):
+        """Append the next page of matching calculations"""
+        entries, self.cursor = self.data_manager.query_history(
+            cursor=self.cursor, limit=self.PAGE_SIZE, **self.filters()
+        )
+        
+        row = self.table.rowCount()
+        self.table.setRowCount(row + len(entries))
+        for entry in entries:
+            metadata = entry.get("metadata", {})
+            values = [
+                entry["timestamp"][:19].replace('T', ' '),
+                entry["last_date"],
+                metadata.get("total_subjects", len(entry["subjects"])),
+                metadata.get("total_conducted"),
+                metadata.get("total_extra_needed"),
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem("" if value is None else str(value)))
+            row += 1
+        self.entries.extend(entries)
+        
+        self.more_btn.setEnabled(self.cursor is not None)
+        more = "" if self.cursor is None else "+"
+        self.count_label.setText(f"{len(self.entries)}{more} calculations")
+    
+    def export_history(self):
+        """Export every calculation matching the filters, not just the loaded pages"""
+        file, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Export History",
+            f"calculation_history_{datetime.date.today()}.csv",
+            "CSV Files (*.csv);;JSON Lines (*.jsonl);;Parquet (*.parquet);;Compressed CSV (*.csv.gz)"
+        )
+        if not file:
+            return
+        
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            with span("export", file=os.path.basename(file)):
+                exported = self.data_manager.export_history(file, **self.filters())
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        if exported is None:
+            QMessageBox.critical(self, "Export Error", "Failed to export history.")
+            return
+        path, rows = exported
+        note = "" if path == file else "\n\npyarrow is not installed, so a compressed CSV was written instead of Parquet."
+        QMessageBox.information(self, "Success", f"Exported {rows} rows to {path}{note}")
+    
+    def show_details(self, row, *args):
+        if not 0 <= row < len(self.entries):
+            self.details.clear()
+            return
+        entry = self.entries[row]
+        results = {r["subject"]: r for r in entry.get("results", [])}
+        lines = [f"Holidays: {', '.join(entry['holidays']) or 'none'}", ""]
+        for subject, weekly in entry["subjects"].items():
+            if subject in results:
+                lines.append(f"{subject} ({weekly}/week): {self.data_manager.format_subject_result(results[subject])}")
+            else:
+                lines.append(f"{subject} ({weekly}/week), conducted {entry['conducted'].get(subject, 0)}")
+        if entry.get("summary") and not results:
+            lines += ["", entry["summary"]]
+        self.details.setPlainText("\n".join(lines))
+
 
+class WhatIfDialog(QDialog):
+    """Sweep the semester end date under a few holiday sets and chart extra classes needed
 
+    ``semester_weeks`` should be the value Calculate uses, so the curves pass
+    through the main result at the current end date.
+    """
+    
+    def __init__(self, sections_data, last_date, holidays, semester_weeks, parent=None):
+        from scenarios import ScenarioEngine
+        from sweep_chart import SweepChart
+        
+        super().__init__(parent)
+        self.engine = ScenarioEngine.from_sections(sections_data, semester_weeks)
+        self.last_date = last_date
+        self.holidays = holidays
+        self.result = None
+        self.setWindowTitle("What-If Scenarios")
+        self.resize(820, 560)
+        
+        layout = QVBoxLayout()
+        
+        # End date range around the current semester end
+        controls = QHBoxLayout()
+        tomorrow = QDate.currentDate().addDays(1)
+        current_end = QDate(last_date.year, last_date.month, last_date.day)
+        self.first_date = QDateEdit(max(tomorrow, current_end.addDays(-28)))
+        self.last_date_input = QDateEdit(max(tomorrow, current_end).addDays(28))
+        for label, date_edit in (("End from", self.first_date), ("to", self.last_date_input)):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd/MM/yyyy")
+            date_edit.setMinimumDate(tomorrow)
+            date_edit.dateChanged.connect(self.evaluate)
+            controls.addWidget(QLabel(label))
+            controls.addWidget(date_edit)
+        
+        self.step_spin = QSpinBox()
+        self.step_spin.setRange(1, 30)
+        self.step_spin.setValue(1)
+        self.step_spin.setSuffix(" day step")
+        self.step_spin.valueChanged.connect(self.evaluate)
+        controls.addWidget(self.step_spin)
+        
+        self.subject_combo = QComboBox()
+        self.subject_combo.addItem("All subjects")
+        self.subject_combo.addItems(self.engine.names)
+        self.subject_combo.currentIndexChanged.connect(self.update_chart)
+        controls.addWidget(self.subject_combo, 1)
+        layout.addLayout(controls)
+        
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        
+        # Holidays ticked here are cancelled in the "Cancel ticked holidays" scenario
+        self.holiday_list = QListWidget()
+        for holiday in holidays:
+            item = QListWidgetItem(holiday)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.holiday_list.addItem(item)
+        self.holiday_list.itemChanged.connect(self.evaluate)
+        holiday_panel = QWidget()
+        holiday_layout = QVBoxLayout(holiday_panel)
+        holiday_layout.setContentsMargins(0, 0, 0, 0)
+        holiday_layout.addWidget(QLabel("Tick holidays to cancel:"))
+        holiday_layout.addWidget(self.holiday_list)
+        splitter.addWidget(holiday_panel)
+        
+        self.chart = SweepChart()
+        splitter.addWidget(self.chart)
+        splitter.setSizes([180, 640])
+        layout.addWidget(splitter, 1)
+        
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        
+        self.setLayout(layout)
+        self.evaluate()
+    
+    def scenarios(self):
+        """Return (names, holiday sets) for the scenarios to compare"""
+        cancelled = {
+            self.holiday_list.item(i).text() for i in range(self.holiday_list.count())
+            if self.holiday_list.item(i).checkState() == Qt.CheckState.Checked
+        }
+        names, holiday_sets = ["Current holidays"], [self.holidays]
+        if cancelled:
+            names.append(f"Cancel {len(cancelled)} ticked")
+            holiday_sets.append([holiday for holiday in self.holidays if holiday not in cancelled])
+        if self.holidays:
+            names.append("No holidays")
+            holiday_sets.append([])
+        return names, holiday_sets
+    
+    def evaluate(self, *args):
+        """Re-run the sweep for the current range and holiday scenarios"""
+        from scenarios import end_date_range
+        
+        first = self.first_date.date().toPyDate()
+        last = self.last_date_input.date().toPyDate()
+        if last < first:
+            first, last = last, first
+        end_dates = end_date_range(first, last, self.step_spin.value())
+        if end_dates[-1] != last:
+            end_dates.append(last)
+        
+        names, holiday_sets = self.scenarios()
+        try:
+            with span("what_if", scenarios=len(end_dates) * len(holiday_sets)):
+                self.result = self.engine.sweep(end_dates, holiday_sets, names)
+        except ValueError as e:
+            self.result = None
+            self.summary_label.setText(f"Error: {e}")
+            self.chart.set_series([], [])
+            return
+        self.update_chart()
+    
+    def update_chart(self, *args):
+        if self.result is None:
+            return
+        result = self.result
+        subject_row = self.subject_combo.currentIndex() - 1
+        series = []
+        for scenario, name in enumerate(result.scenario_names):
+            figures = result.extra_needed[scenario]
+            values = figures.sum(axis=1) if subject_row < 0 else figures[:, subject_row]
+            series.append((name, values.tolist()))
+        self.chart.set_series(result.end_dates, series, marker=self.last_date)
+        
+        # Summarise the first end date at which each scenario needs no extra classes
+        lines = []
+        for name, values in series:
+            done = next((date for date, value in zip(result.end_dates, values) if value == 0), None)
+            when = f"none needed from {done.strftime('%d/%m/%Y')}" if done else "extra classes needed throughout"
+            lines.append(f"{name}: {values[0]} → {values[-1]} extra classes; {when}")
+        self.summary_label.setText("\n".join(lines))
+
+
+class ExtraClassDialog(QDialog):
+    """Extra classes needed, placed into dated free timetable slots"""
+    
+    def __init__(self, sections_data, free_slots, last_date, holidays, parent=None):
+        from calculator import calculate_sections_summary
+        from scheduler import needs_from_result, plan_extra_classes
+        
+        super().__init__(parent)
+        with span("schedule", sections=len(sections_data)):
+            result = calculate_sections_summary(sections_data, last_date, holidays, get_config().semester_weeks)
+            needs = needs_from_result(result)
+            self.plan = plan_extra_classes(needs, free_slots, last_date, holidays)
+        self.setWindowTitle("Extra Class Plan")
+        self.resize(720, 560)
+        
+        layout = QVBoxLayout()
+        
+        summary = self.plan.render()
+        missing = [section or "(none)" for section in needs if section not in free_slots]
+        if missing:
+            summary += f"\nNo free slots known for: {', '.join(missing)}"
+        self.summary_label = QLabel(summary)
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+        
+        self.table = QTableWidget(len(self.plan), 5)
+        self.table.setHorizontalHeaderLabels(["Date", "Day", "Slot", "Section", "Subject"])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        for row, session in enumerate(self.plan):
+            values = session.to_dict()
+            values["date"] = session.date.strftime("%d/%m/%Y")
+            for column, key in enumerate(("date", "day", "slot", "section", "subject")):
+                self.table.setItem(row, column, QTableWidgetItem(values[key]))
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table, 1)
+        
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        export_btn = buttons.addButton("Export...", QDialogButtonBox.ButtonRole.ActionRole)
+        export_btn.setEnabled(len(self.plan) > 0)
+        export_btn.clicked.connect(self.export_plan)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        
+        self.setLayout(layout)
+    
+    def export_plan(self):
+        try:
+            file, _ = QFileDialog.getSaveFileName(
+                self,
+                "Export Extra Class Plan",
+                f"extra_class_plan_{datetime.date.today()}.csv",
+                "CSV Files (*.csv);;JSON Files (*.json);;All Files (*)"
+            )
+            if file:
+                with span("export", sessions=len(self.plan)):
+                    self.plan.export(file)
+                QMessageBox.information(self, "Success", f"Plan exported to {file}")
+        except Exception as e:
+            QMessageBox.critical(self, "Export Error", f"Failed to export plan: {str(e)}")
@@ -0,0 +1,116 @@
+import csv
+import gzip
+import json
+
+# Columns of SQLiteStore.iter_result_rows(), in export order
+EXPORT_COLUMNS = (
+    'calculation_id', 'timestamp', 'last_date', 'holidays', 'subject', 'weekly_slots', 'conducted',
+    'required', 'remaining_regular', 'missed_in_holidays', 'extra_needed', 'summary'
+)
+
+INTEGER_COLUMNS = {
+    'calculation_id', 'conducted', 'required', 'remaining_regular', 'missed_in_holidays', 'extra_needed'
+}
+
+FORMATS = ('csv', 'jsonl', 'parquet', 'csv.gz')
+
+
+def format_for_path(path):
+    """Guess the export format from a file name (CSV when unknown)"""
+    name = str(path).lower()
+    for fmt in ('csv.gz', 'jsonl', 'parquet'):
+        if name.endswith('.' + fmt):
+            return fmt
+    return 'csv'
+
+
+def select_columns(columns=None):
+    """Validate a column selection; None means every column"""
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    return list(columns)
+
+
+def _flat(value):
+    return ', '.join(value) if isinstance(value, list) else value
+
+
+def write_csv(chunks, path, columns, compress=False):
+    """Write row chunks as CSV (gzip-compressed when ``compress``); returns the row count"""
+    rows = 0
+    opener = gzip.open if compress else open
+    with opener(path, 'wt', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows([_flat(row[column]) for column in columns] for row in chunk)
+            rows += len(chunk)
+    return rows
+
+
+def write_jsonl(chunks, path, columns):
+    """Write row chunks as JSON Lines, one object per row; returns the row count"""
+    rows = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.writelines(
+                json.dumps({column: row[column] for column in columns}, ensure_ascii=False) + '\n'
+                for row in chunk
+            )
+            rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks, path, columns):
+    """Write row chunks as Parquet, one row group per chunk; returns the row count
+
+    Raises ImportError when pyarrow is not installed.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        column: pa.int64() if column in INTEGER_COLUMNS
+        else pa.float64() if column == 'weekly_slots'
+        else pa.list_(pa.string()) if column == 'holidays'
+        else pa.string()
+        for column in columns
+    }
+    schema = pa.schema([(column, types[column]) for column in columns])
+
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression='snappy') as writer:
+        for chunk in chunks:
+            arrays = [pa.array([row[column] for row in chunk], type=types[column]) for column in columns]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows += len(chunk)
+    return rows
+
+
+def export_rows(chunks, path, fmt=None, columns=None):
+    """Stream row chunks to ``path`` in CSV, JSON Lines, Parquet or gzipped CSV
+
+    Without pyarrow a Parquet export falls back to a gzipped CSV next to the
+    requested path. Returns (path written, row count).
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    columns = select_columns(columns)
+
+    if fmt == 'parquet':
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            path = str(path)
+            path = (path[:-len('.parquet')] if path.lower().endswith('.parquet') else path) + '.csv.gz'
+            fmt = 'csv.gz'
+        else:
+            return path, write_parquet(chunks, path, columns)
+
+    if fmt == 'jsonl':
+        return path, write_jsonl(chunks, path, columns)
+    return path, write_csv(chunks, path, columns, compress=(fmt == 'csv.gz'))
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import wraps
+
+
+class Span:
+    """One timed operation"""
+    __slots__ = ('name', 'started', 'duration', 'thread', 'details', 'error')
+
+    def __init__(self, name, started, duration, thread, details, error=None):
+        self.name = name
+        self.started = started
+        self.duration = duration
+        self.thread = thread
+        self.details = details
+        self.error = error
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec='milliseconds'),
+            "duration_ms": round(self.duration * 1000, 3),
+            "thread": self.thread,
+            "details": self.details,
+            "error": self.error
+        }
+
+
+class _NullSpan:
+    """Shared do-nothing context used while instrumentation is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ('recorder', 'name', 'details', 'started', 'wall_started', 'capture')
+
+    def __init__(self, recorder, name, details):
+        self.recorder = recorder
+        self.name = name
+        self.details = details
+
+    def __enter__(self):
+        self.capture = self.recorder._start_capture(self.name)
+        self.wall_started = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        error = f"{exc_type.__name__}: {exc}" if exc_type else None
+        span = Span(self.name, self.wall_started, duration, threading.current_thread().name, self.details, error)
+        if self.capture is not None:
+            self.recorder._finish_capture(self.capture, span)
+        self.recorder._record(span)
+        return False
+
+
+class Instrumentation:
+    """Timing spans for hot paths, kept in an in-memory ring buffer
+
+    ``span(name, **details)`` is a context manager; while disabled it returns
+    a shared no-op object, so instrumented code costs one attribute check.
+    ``capture_next(kind, directory)`` profiles the next captured operation
+    with cProfile or tracemalloc and writes the result to ``directory``.
+    """
+
+    # Spans that start a profiling capture when one is armed
+    CAPTURE_SPANS = ('import', 'calculation', 'live_refresh', 'export')
+
+    def __init__(self, capacity=500, enabled=False):
+        self.enabled = enabled
+        self.spans = deque(maxlen=capacity)
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._armed = None       # (kind, directory) waiting for the next operation
+        self._capturing = False
+
+    def span(self, name, **details):
+        if not self.enabled and self._armed is None:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, details)
+
+    def timed(self, name):
+        """Decorator form of span()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _record(self, span):
+        if self.enabled:
+            with self._lock:
+                self.spans.append(span)
+        elif "capture" not in span.details:
+            return
+        for listener in list(self.listeners):
+            try:
+                listener(span)
+            except Exception as e:
+                print(f"Error in instrumentation listener: {e}")
+
+    def add_listener(self, listener):
+        """Call ``listener(span)`` for every recorded span (from the recording thread)"""
+        self.listeners.append(listener)
+
+    def recent(self, limit=None):
+        with self._lock:
+            spans = list(self.spans)
+        return spans[-limit:] if limit else spans
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+    def to_json(self):
+        return json.dumps([span.to_dict() for span in self.recent()], indent=2)
+
+    def dump(self, path):
+        """Write the buffered spans to a JSON file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+        return path
+
+    # Profiling captures
+
+    def capture_next(self, kind, directory):
+        """Profile the next import, calculation, live refresh or export ("cprofile" or "tracemalloc")"""
+        if kind not in ('cprofile', 'tracemalloc'):
+            raise ValueError(f"Unknown capture kind: {kind}")
+        with self._lock:
+            self._armed = (kind, directory)
+
+    @property
+    def capture_armed(self):
+        return self._armed is not None
+
+    def _start_capture(self, name):
+        if self._armed is None or name not in self.CAPTURE_SPANS:
+            return None
+        with self._lock:
+            if self._armed is None or self._capturing:
+                return None
+            kind, directory = self._armed
+            self._armed = None
+            self._capturing = True
+
+        if kind == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            import tracemalloc
+            profiler = None
+            tracemalloc.start()
+        return kind, directory, profiler
+
+    def _finish_capture(self, capture, span):
+        kind, directory, profiler = capture
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if kind == 'cprofile':
+                profiler.disable()
+                path = os.path.join(directory, f"profile_{span.name}_{stamp}.prof")
+                profiler.dump_stats(path)
+            else:
+                import tracemalloc
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                path = os.path.join(directory, f"memory_{span.name}_{stamp}.txt")
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(f"{span.name}: {span.duration * 1000:.1f} ms, peak {peak / 1024:.1f} KiB\n\n")
+                    for stat in snapshot.statistics('lineno')[:50]:
+                        f.write(f"{stat}\n")
+            span.details = dict(span.details, capture=path)
+        except Exception as e:
+            print(f"Error saving profile capture: {e}")
+        finally:
+            with self._lock:
+                self._capturing = False
+
+
+# Process-wide recorder used by the parser, calculator workers and DataManager
+instrumentation = Instrumentation()
+span = instrumentation.span
+timed = instrumentation.timed
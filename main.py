@@ -1,32 +1,73 @@
-from PyQt6.QtWidgets import QApplication, QMessageBox
+import argparse
 import sys
 import os
-from gui import ExtraClassApp
 
 def create_directories():
     """Create necessary directories"""
     directories = ["exports", "data"]
-    
+
     for dir_name in directories:
         if not os.path.exists(dir_name):
             os.makedirs(dir_name)
 
+def parse_args(argv):
+    """Parse our own options; anything else is passed through to Qt"""
+    parser = argparse.ArgumentParser(description="Extra Class Counter")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Report an import and initialization breakdown after the first paint, then exit")
+    parser.add_argument('--startup-budget', type=float, default=1.0,
+                        help="With --profile-startup, exit with status 1 if startup exceeds this many seconds")
+    return parser.parse_known_args(argv[1:])
+
 def main():
+    args, qt_args = parse_args(sys.argv)
+
+    profiler = None
+    if args.profile_startup:
+        from startup_profile import StartupProfiler
+        profiler = StartupProfiler()
+        profiler.track_imports()
+
+    # Heavy modules are imported here so --profile-startup can time them
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+    if profiler:
+        profiler.mark("import PyQt6")
+
+    from gui import ExtraClassApp
+    if profiler:
+        profiler.mark("import gui")
+
     # Create necessary directories
     create_directories()
-    
-    app = QApplication(sys.argv)
+
+    app = QApplication([sys.argv[0]] + qt_args)
     app.setApplicationName("Extra Class Counter")
     app.setApplicationVersion("1.0.0")
     app.setStyle('Fusion')
-    
+    if profiler:
+        profiler.mark("QApplication")
+
     try:
         window = ExtraClassApp()
+        # Queued history saves are written before the event loop shuts down
+        app.aboutToQuit.connect(window.data_manager.flush)
+        if profiler:
+            profiler.mark("main window")
         window.show()
+
+        if profiler:
+            # Process the pending show/paint events, report and exit
+            app.processEvents()
+            profiler.mark("first paint")
+            profiler.stop_tracking_imports()
+            within_budget = profiler.report(budget=args.startup_budget)
+            window.close()
+            sys.exit(0 if within_budget else 1)
+
         sys.exit(app.exec())
     except Exception as e:
         QMessageBox.critical(None, "Error", f"Failed to start application: {str(e)}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
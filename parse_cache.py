@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from timetable_parser import PARSER_VERSION, SheetCounts
+
+MAGIC = b'ECC1'
+ENTRY_SUFFIX = '.bin'
+INDEX_FILE = 'index.json'
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the SHA-1 hex digest of a file's content"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Content-addressed cache of parsed timetables with size-based LRU eviction
+
+    Entries are keyed by the file's content hash, mtime and PARSER_VERSION and
+    store each sheet's subject x weekday matrix as packed int32. A small index
+    remembers (mtime, size) -> content hash per path, so re-opening an
+    unchanged file costs one stat instead of hashing it again. The index
+    keeps the ``max_index_paths`` most recently used paths, and evict() also
+    drops paths whose file is gone or whose entry was evicted.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, max_documents=32, max_index_paths=1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_documents = max_documents
+        self.max_index_paths = max_index_paths
+
+        self._lock = threading.Lock()
+        self._index = None
+        self._documents = OrderedDict()  # content key -> parsed JSON document
+
+    # Keys
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self.directory / INDEX_FILE, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        tmp = self.directory / (INDEX_FILE + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self.directory / INDEX_FILE)
+
+    def _trim_index(self):
+        """Drop the least recently used paths beyond max_index_paths"""
+        index = self._index
+        for path in list(index)[:max(0, len(index) - self.max_index_paths)]:
+            del index[path]
+
+    @staticmethod
+    def _key(digest, mtime_ns):
+        return hashlib.sha1(f"{digest}:{mtime_ns}:{PARSER_VERSION}".encode()).hexdigest()
+
+    def content_key(self, path):
+        """Return the cache key for a file: hash of (content digest, mtime, parser version)"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+
+        with self._lock:
+            index = self._load_index()
+            known = index.pop(path, None)  # re-inserted last, so the index stays in use order
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                digest = known[2]
+                index[path] = known
+            else:
+                digest = hash_file(path)
+                index[path] = [stat.st_mtime_ns, stat.st_size, digest]
+                self._trim_index()
+                self._save_index()
+
+        return self._key(digest, stat.st_mtime_ns)
+
+    # Timetables
+
+    def _entry_path(self, key):
+        return self.directory / (key + ENTRY_SUFFIX)
+
+    def load_sheets(self, path):
+        """Return the cached list of SheetCounts for a file, or None on a miss"""
+        entry = self._entry_path(self.content_key(path))
+        try:
+            with open(entry, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            if data[:4] != MAGIC:
+                raise ValueError("bad magic")
+            (header_size,) = struct.unpack_from('<I', data, 4)
+            header = json.loads(data[8:8 + header_size].decode('utf-8'))
+            counts = np.frombuffer(data, dtype='<i4', offset=8 + header_size).astype(np.int64)
+        except (ValueError, struct.error):
+            # Unreadable entry: drop it and parse again
+            self._discard(entry)
+            return None
+
+        sheets = []
+        offset = 0
+        for sheet in header['sheets']:
+            size = len(sheet['subjects']) * 7
+            matrix = counts[offset:offset + size].reshape(len(sheet['subjects']), 7)
+            sheets.append(SheetCounts(sheet['name'], sheet['subjects'], matrix, sheet['row_count'],
+                                      sheet.get('sections'), sheet.get('free_slots')))
+            offset += size
+
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return sheets
+
+    def store_sheets(self, path, sheets):
+        """Store parsed sheets for a file, then evict least recently used entries"""
+        header = json.dumps({
+            'sheets': [
+                {'name': sheet.name, 'subjects': list(sheet.subjects), 'row_count': sheet.row_count,
+                 'sections': sheet.sections, 'free_slots': sheet.free_slots}
+                for sheet in sheets
+            ]
+        }).encode('utf-8')
+        counts = [np.asarray(sheet.matrix, dtype='<i4').reshape(-1) for sheet in sheets]
+        body = np.concatenate(counts).tobytes() if counts else b''
+
+        entry = self._entry_path(self.content_key(path))
+        tmp = entry.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(body)
+        os.replace(tmp, entry)
+
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes, then prune the index"""
+        with self._lock:
+            entries = []
+            for entry in self.directory.glob('*' + ENTRY_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._discard(entry)
+                total -= size
+
+            self._prune_index()
+
+    def _prune_index(self):
+        """Forget paths that no longer exist or whose key has neither an entry nor a cached document"""
+        index = self._load_index()
+        live = {entry.stem for entry in self.directory.glob('*' + ENTRY_SUFFIX)}
+        live.update(self._documents)
+        stale = [
+            path for path, (mtime_ns, _, digest) in index.items()
+            if not os.path.exists(path) or self._key(digest, mtime_ns) not in live
+        ]
+        for path in stale:
+            del index[path]
+        size = len(index)
+        self._trim_index()
+        if stale or len(index) != size:
+            self._save_index()
+
+    def _discard(self, entry):
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+
+    # Project files
+
+    def load_json(self, path):
+        """Load a JSON document, reusing the parsed copy while the file is unchanged"""
+        key = self.content_key(path)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+                return document
+
+        with open(path, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+
+        with self._lock:
+            self._documents[key] = document
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        return document
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import threading
+
+
+def atomic_write_text(path, text, encoding='utf-8'):
+    """Replace ``path`` with ``text`` so readers see the old or the new file, never a partial one
+
+    The text goes to a temp file in the same directory, is fsynced, then
+    renamed over the target.
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or '.'
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        os.chmod(tmp_path, mode)  # mkstemp creates 0600 files
+        with os.fdopen(fd, 'w', encoding=encoding, newline='') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class WriteBehindQueue:
+    """Hand writes to one background thread that applies them in batches
+
+    ``write_batch`` receives every item queued since the last batch, so a
+    burst of saves becomes one write. ``delay`` seconds are allowed for a
+    burst to gather. Callbacks passed to put() run on the writer thread once
+    their item is written (or failed to write).
+    """
+
+    def __init__(self, write_batch, delay=0.2, name="write-behind"):
+        self.write_batch = write_batch
+        self.delay = delay
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending = []
+        self._writing = False
+        self._flushing = 0
+        self._closed = False
+        self._thread = None
+
+    def put(self, item, callback=None):
+        """Queue an item; returns immediately"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} queue is closed")
+            self._pending.append((item, callback))
+            if self._thread is None:
+                # Started on first use so an idle queue costs nothing
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def pending(self):
+        with self._cond:
+            return len(self._pending) + (1 if self._writing else 0)
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is written; returns False on timeout"""
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=None):
+        """Write what is queued and stop the writer thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                # Let a burst gather unless someone is waiting on a flush or close
+                self._cond.wait_for(lambda: self._flushing or self._closed, self.delay)
+                batch, self._pending = self._pending, []
+                self._writing = True
+
+            try:
+                self.write_batch([item for item, _ in batch])
+            except Exception as e:
+                print(f"Error writing {self.name} batch: {e}")
+            finally:
+                for _, callback in batch:
+                    if callback is not None:
+                        try:
+                            callback()
+                        except Exception as e:
+                            print(f"Error in {self.name} callback: {e}")
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
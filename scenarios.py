@@ -0,0 +1,136 @@
+import datetime
+
+import numpy as np
+
+from batch_calculator import build_schedule_matrix
+from utils import get_holiday_index, qualified_name
+
+
+def end_date_range(first, last, step_days=7):
+    """Return end dates from ``first`` to ``last`` inclusive, ``step_days`` apart"""
+    if step_days <= 0:
+        raise ValueError("Step must be at least one day")
+    count = (last - first).days // step_days + 1
+    return [first + datetime.timedelta(days=i * step_days) for i in range(max(0, count))]
+
+
+class SweepResult:
+    """Figures for every (holiday set, end date, subject) scenario
+
+    Arrays have shape (holiday sets, end dates, subjects); ``required`` and
+    ``conducted`` do not depend on the scenario and have shape (subjects,).
+    """
+
+    def __init__(self, names, end_dates, scenario_names, required, conducted,
+                 remaining_regular, missed_in_holidays, extra_needed):
+        self.names = names
+        self.end_dates = end_dates
+        self.scenario_names = scenario_names
+        self.required = required
+        self.conducted = conducted
+        self.remaining_regular = remaining_regular
+        self.missed_in_holidays = missed_in_holidays
+        self.extra_needed = extra_needed
+
+    def curve(self, subject, scenario=0):
+        """Return [(end_date, extra_needed)] for one subject under one holiday set"""
+        row = self.names.index(subject)
+        return list(zip(self.end_dates, self.extra_needed[scenario, :, row].tolist()))
+
+    def total_curve(self, scenario=0):
+        """Return [(end_date, total extra_needed)] under one holiday set"""
+        return list(zip(self.end_dates, self.extra_needed[scenario].sum(axis=1).tolist()))
+
+    def to_dict(self):
+        return {
+            "end_dates": [end.isoformat() for end in self.end_dates],
+            "scenarios": [
+                {
+                    "name": scenario_name,
+                    "total_extra_needed": self.extra_needed[i].sum(axis=1).tolist(),
+                    "subjects": {
+                        name: self.extra_needed[i, :, row].tolist() for row, name in enumerate(self.names)
+                    }
+                }
+                for i, scenario_name in enumerate(self.scenario_names)
+            ]
+        }
+
+
+class ScenarioEngine:
+    """Evaluate extra classes needed over many semester end dates and holiday sets in one pass
+
+    Class days per weekday are read from prefix sums over the calendar from
+    tomorrow to the latest end date, and each holiday set only adds prefix
+    sums of its own dates, so a scenario costs a lookup rather than a day
+    count. Figures match calculate_batch() with the same ``semester_weeks``
+    for every scenario.
+    """
+
+    def __init__(self, names, schedule, conducted, weekly, semester_weeks=15, today=None):
+        self.names = list(names)
+        self.schedule = np.asarray(schedule, dtype=np.int64).reshape(len(self.names), 7)
+        self.conducted = np.asarray(conducted, dtype=np.int64)
+        self.required = np.asarray(weekly, dtype=np.int64) * semester_weeks
+        self.today = today or datetime.date.today()
+
+    @classmethod
+    def from_subjects(cls, subjects_data, semester_weeks=15, today=None):
+        """Build an engine from a calculator subjects_data dict"""
+        names, schedule, conducted, weekly = build_schedule_matrix(subjects_data)
+        return cls(names, schedule, conducted, weekly, semester_weeks, today)
+
+    @classmethod
+    def from_sections(cls, sections_data, semester_weeks=15, today=None):
+        """Build an engine from {section: subjects_data}; subjects are named "subject [section]" """
+        subjects_data = {
+            qualified_name(section, subject): data
+            for section, section_subjects in sections_data.items()
+            for subject, data in section_subjects.items()
+        }
+        return cls.from_subjects(subjects_data, semester_weeks, today)
+
+    def weekday_prefix(self, days):
+        """Return a (days + 1) x 7 array: [i, w] counts weekday-w dates in (today, today + i]"""
+        offsets = np.arange(1, days + 1)
+        marks = np.zeros((days + 1, 7), dtype=np.int64)
+        marks[offsets, (self.today.weekday() + offsets) % 7] = 1
+        return np.cumsum(marks, axis=0)
+
+    def holiday_prefix(self, holiday_sets, days):
+        """Return a (sets, days + 1, 7) array of per-weekday holiday prefix sums"""
+        marks = np.zeros((len(holiday_sets), days + 1, 7), dtype=np.int64)
+        for i, holidays in enumerate(holiday_sets):
+            for holiday in get_holiday_index(holidays).dates:
+                offset = (holiday - self.today).days
+                if 0 < offset <= days:
+                    marks[i, offset, holiday.weekday()] = 1
+        return np.cumsum(marks, axis=1)
+
+    def sweep(self, end_dates, holiday_sets, scenario_names=None):
+        """Evaluate every end date under every holiday set
+
+        ``holiday_sets`` is a list of holiday lists (ISO strings or dates).
+        Raises ValueError if an end date is not in the future.
+        """
+        end_dates = sorted(set(end_dates))
+        if not end_dates:
+            raise ValueError("No end dates to evaluate")
+        if end_dates[0] <= self.today:
+            raise ValueError("Last date must be in the future")
+        holiday_sets = [list(holidays) for holidays in holiday_sets]
+        if scenario_names is None:
+            scenario_names = [f"Scenario {i + 1}" for i in range(len(holiday_sets))]
+
+        offsets = np.array([(end - self.today).days for end in end_dates])
+        days = int(offsets[-1])
+        possible = self.weekday_prefix(days)[offsets]                      # (ends, 7)
+        missed_days = self.holiday_prefix(holiday_sets, days)[:, offsets]   # (sets, ends, 7)
+        remaining_days = possible[np.newaxis] - missed_days
+
+        remaining_regular = remaining_days @ self.schedule.T                # (sets, ends, subjects)
+        missed_in_holidays = missed_days @ self.schedule.T
+        extra_needed = np.maximum(0, self.required - self.conducted - remaining_regular)
+
+        return SweepResult(self.names, end_dates, list(scenario_names), self.required, self.conducted,
+                           remaining_regular, missed_in_holidays, extra_needed)
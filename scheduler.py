@@ -0,0 +1,189 @@
+import csv
+import datetime
+import heapq
+import json
+from collections import Counter, defaultdict
+
+from utils import get_holiday_index, qualified_name
+
+DAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+PLAN_COLUMNS = ['date', 'day', 'slot', 'section', 'subject']
+
+
+class ExtraSession:
+    """One proposed extra class: a section's free slot on a concrete date"""
+    __slots__ = ('date', 'slot', 'section', 'subject', 'order')
+
+    def __init__(self, date, slot, section, subject, order=0):
+        self.date = date
+        self.slot = slot
+        self.section = section
+        self.subject = subject
+        self.order = order  # Position of the slot in the timetable's columns
+
+    def to_dict(self):
+        return {
+            "date": self.date.isoformat(),
+            "day": DAY_NAMES[self.date.weekday()],
+            "slot": self.slot,
+            "section": self.section,
+            "subject": self.subject
+        }
+
+
+class ExtraClassPlan:
+    """Dated extra sessions for every section, plus what did not fit
+
+    ``unplaced`` maps qualified subject names to the classes that found no
+    free slot before the last date.
+    """
+
+    def __init__(self, sessions, unplaced, last_date, generated=None):
+        self.sessions = sorted(sessions, key=lambda s: (s.date, s.section, s.order))
+        self.unplaced = unplaced
+        self.last_date = last_date
+        self.generated = generated or datetime.datetime.now()
+
+    def __iter__(self):
+        return iter(self.sessions)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def week_loads(self):
+        """Return [(week Monday, sessions)] in date order"""
+        loads = Counter(s.date - datetime.timedelta(days=s.date.weekday()) for s in self.sessions)
+        return sorted(loads.items())
+
+    def render(self):
+        """Return a plain-text summary of the plan"""
+        lines = [f"🗓️ EXTRA CLASS PLAN (until {self.last_date.strftime('%d/%m/%Y')})",
+                 f"Sessions placed: {len(self.sessions)}"]
+        loads = self.week_loads()
+        if loads:
+            counts = [count for _, count in loads]
+            lines.append(f"Weeks used: {len(loads)} (min {min(counts)}, max {max(counts)} sessions per week)")
+        if self.unplaced:
+            lines.append(f"⚠️ Not enough free slots for {sum(self.unplaced.values())} classes:")
+            lines.extend(f"   {name}: {count}" for name, count in sorted(self.unplaced.items()))
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "generated": self.generated.isoformat(),
+            "last_date": self.last_date.isoformat(),
+            "sessions": [s.to_dict() for s in self.sessions],
+            "unplaced": self.unplaced
+        }
+
+    def export(self, filepath):
+        """Write the plan to CSV, or JSON when the path ends in .json"""
+        if filepath.lower().endswith('.json'):
+            with open(filepath, 'w') as f:
+                json.dump(self.to_dict(), f, indent=2)
+            return filepath
+
+        with open(filepath, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=PLAN_COLUMNS)
+            writer.writeheader()
+            writer.writerows(s.to_dict() for s in self.sessions)
+        return filepath
+
+
+def needs_from_result(result):
+    """Return {section: {subject: extra_needed}} from a CalculationResult or SectionedResult"""
+    needs = {}
+    for subject_result in result:
+        if subject_result.extra_needed > 0:
+            needs.setdefault(subject_result.section or '', {})[subject_result.subject] = subject_result.extra_needed
+    return needs
+
+
+def dated_slots(free_slots, last_date, holidays, today):
+    """Return {week: [(date, order, slot)]} for the free slots from tomorrow to last_date, skipping holidays"""
+    by_weekday = defaultdict(list)
+    for order, (weekday, slot) in enumerate(free_slots):
+        by_weekday[weekday].append((order, slot))
+
+    holiday_index = get_holiday_index(holidays)
+    first = today + datetime.timedelta(days=1)
+    first_monday = first - datetime.timedelta(days=first.weekday())
+    weeks = defaultdict(list)
+    for offset in range((last_date - today).days):
+        day = first + datetime.timedelta(days=offset)
+        if day.weekday() not in by_weekday or day in holiday_index:
+            continue
+        week = (day - first_monday).days // 7
+        weeks[week].extend((day, order, slot) for order, slot in by_weekday[day.weekday()])
+    return weeks
+
+
+def assign_sessions(demand, weeks):
+    """Place {subject: classes} into {week: [(date, order, slot)]} cells
+
+    Subjects take turns, the one with the smallest share of its classes
+    placed first, so scarce slots are shared in proportion to need. Each turn
+    goes to the least-loaded week that still has a cell on a day the subject
+    has no extra class yet, and every cell is used at most once. Returns the
+    (subject, date, order, slot) assignments and {subject: classes left over}.
+    """
+    week_heap = [(0, week) for week in weeks if weeks[week]]
+    heapq.heapify(week_heap)
+    subject_heap = [(0.0, -count, name) for name, count in demand.items() if count > 0]
+    heapq.heapify(subject_heap)
+    placed = Counter()
+    booked_days = defaultdict(set)
+    assignments, unplaced = [], {}
+
+    while subject_heap:
+        _, need, name = heapq.heappop(subject_heap)
+        skipped, cell = [], None
+        while week_heap and cell is None:
+            load, week = heapq.heappop(week_heap)
+            cells = weeks[week]
+            for i, candidate in enumerate(cells):
+                if candidate[0] not in booked_days[name]:
+                    cell = cells.pop(i)
+                    if cells:
+                        heapq.heappush(week_heap, (load + 1, week))
+                    break
+            else:
+                skipped.append((load, week))
+        for entry in skipped:
+            heapq.heappush(week_heap, entry)
+
+        if cell is None:
+            # No week has a usable cell left for this subject
+            unplaced[name] = -need - placed[name]
+            continue
+        booked_days[name].add(cell[0])
+        assignments.append((name,) + cell)
+        placed[name] += 1
+        if placed[name] < -need:
+            heapq.heappush(subject_heap, (placed[name] / -need, need, name))
+
+    return assignments, unplaced
+
+
+def plan_extra_classes(needs, free_slots, last_date, holidays, today=None):
+    """Propose dated extra sessions for {section: {subject: extra_needed}}
+
+    ``free_slots`` maps each section to its blank [weekday, slot label]
+    timetable cells. A section is only booked in its own free slots, once
+    per slot, so sections never clash with their regular classes or with
+    each other's extra classes. Raises ValueError if last_date is not in the
+    future.
+    """
+    today = today or datetime.date.today()
+    if last_date <= today:
+        raise ValueError("Last date must be in the future")
+
+    sessions, unplaced = [], {}
+    for section, demand in needs.items():
+        weeks = dated_slots(free_slots.get(section, ()), last_date, holidays, today)
+        assignments, left_over = assign_sessions(demand, weeks)
+        sessions.extend(ExtraSession(day, slot, section, subject, order)
+                        for subject, day, order, slot in assignments)
+        unplaced.update((qualified_name(section, subject), count) for subject, count in left_over.items())
+
+    return ExtraClassPlan(sessions, unplaced, last_date)
@@ -0,0 +1,78 @@
+import builtins
+import sys
+import time
+
+
+class StartupProfiler:
+    """Record startup phases and per-module import times
+
+    ``mark(label)`` closes a phase that started at the previous mark.
+    While imports are tracked, every first-time import is timed; a
+    module's self time excludes the modules it imports in turn.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = []    # (label, seconds)
+        self.imports = {}   # module name -> self seconds
+        self._original_import = None
+        self._stack = []
+
+    def mark(self, label):
+        now = time.perf_counter()
+        self.phases.append((label, now - self._last))
+        self._last = now
+
+    @property
+    def total(self):
+        return self._last - self.started
+
+    def track_imports(self):
+        """Time first imports until stop_tracking_imports() is called"""
+        self._original_import = builtins.__import__
+        original_import = self._original_import
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+
+            self._stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - started
+                children = self._stack.pop()
+                self.imports[name] = self.imports.get(name, 0.0) + elapsed - children
+                if self._stack:
+                    self._stack[-1] += elapsed
+
+        builtins.__import__ = timed_import
+
+    def stop_tracking_imports(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def report(self, budget=None, top=15, file=None):
+        """Print the phase and import breakdown; returns False when over budget"""
+        file = file or sys.stderr
+        print("Startup profile", file=file)
+        print("---------------", file=file)
+        for label, seconds in self.phases:
+            print(f"{seconds * 1000:9.1f} ms  {label}", file=file)
+        print(f"{self.total * 1000:9.1f} ms  total", file=file)
+
+        if self.imports:
+            print(f"\nSlowest imports (self time, top {top})", file=file)
+            slowest = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)[:top]
+            for name, seconds in slowest:
+                print(f"{seconds * 1000:9.1f} ms  {name}", file=file)
+
+        if budget is None:
+            return True
+        within = self.total <= budget
+        verdict = "within" if within else "OVER"
+        print(f"\nStartup {self.total:.3f}s is {verdict} the {budget:.3f}s budget", file=file)
+        return within
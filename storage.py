@@ -0,0 +1,482 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from utils import split_qualified_name
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS calculations (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        last_date TEXT NOT NULL,
+        holidays TEXT NOT NULL,
+        summary TEXT,
+        total_subjects INTEGER,
+        total_conducted INTEGER,
+        total_required INTEGER,
+        total_extra_needed INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_calculations_timestamp ON calculations(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_calculations_last_date ON calculations(last_date);
+
+    CREATE TABLE IF NOT EXISTS calculation_results (
+        calculation_id INTEGER NOT NULL REFERENCES calculations(id) ON DELETE CASCADE,
+        subject TEXT NOT NULL,
+        subject_name TEXT,
+        weekly_slots INTEGER,
+        conducted INTEGER,
+        required INTEGER,
+        remaining_regular INTEGER,
+        missed_in_holidays INTEGER,
+        extra_needed INTEGER,
+        PRIMARY KEY (calculation_id, subject)
+    );
+
+    CREATE TABLE IF NOT EXISTS subjects (
+        name TEXT PRIMARY KEY,
+        count INTEGER NOT NULL,
+        first_seen TEXT,
+        last_seen TEXT,
+        avg_weekly_slots REAL,
+        weekly_slots_total REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_subjects_count ON subjects(count DESC);
+    CREATE INDEX IF NOT EXISTS idx_subjects_last_seen ON subjects(last_seen DESC);
+
+    CREATE TABLE IF NOT EXISTS projects (
+        id INTEGER PRIMARY KEY,
+        name TEXT,
+        data TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_projects_name ON projects(name);
+'''
+
+SUBJECT_COLUMNS = {'weekly_slots_total': 'REAL'}
+RESULT_COLUMNS = {'subject_name': 'TEXT'}  # subject without its " [section]" qualifier
+
+RESULT_FIELDS = ('required', 'remaining_regular', 'missed_in_holidays', 'extra_needed')
+
+
+class SQLiteStore:
+    """SQLite persistence for calculations, per-subject results, subjects and projects"""
+
+    def __init__(self, db_path, max_entries=100, max_age_days=0):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One shared connection; the lock serialises access from worker threads
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._upgrade_schema()
+        self.conn.commit()
+
+        # Materialized subject_statistics() answer, dropped whenever subjects change
+        self._statistics = None
+
+    def _upgrade_schema(self):
+        """Add columns introduced after a database was created"""
+        existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(subjects)")}
+        for column, column_type in SUBJECT_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE subjects ADD COLUMN {column} {column_type}")
+        if 'weekly_slots_total' not in existing:
+            # Best reconstruction of the exact sum from the old rounded average
+            self.conn.execute("UPDATE subjects SET weekly_slots_total = COALESCE(avg_weekly_slots, 0) * count")
+
+        existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(calculation_results)")}
+        for column, column_type in RESULT_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE calculation_results ADD COLUMN {column} {column_type}")
+        if 'subject_name' not in existing:
+            rows = self.conn.execute("SELECT rowid, subject FROM calculation_results").fetchall()
+            self.conn.executemany(
+                "UPDATE calculation_results SET subject_name = ? WHERE rowid = ?",
+                [(split_qualified_name(row["subject"])[1], row["rowid"]) for row in rows]
+            )
+        # Created here rather than in SCHEMA so older databases have the column first. It
+        # replaces the index on qualified names, so each saved result updates one index
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_subject_name "
+                          "ON calculation_results(subject_name COLLATE NOCASE, calculation_id)")
+        self.conn.execute("DROP INDEX IF EXISTS idx_results_subject")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # Calculations
+
+    def add_calculations(self, entries, today=None):
+        """Insert a batch of (calculation, subject_usage) entries in a single transaction
+
+        ``subject_usage`` ({name: weekly_slots}, or None for the calculation's
+        own subjects) is counted in the subjects table, e.g. with canonicalized
+        names. Usage of the same subject across the batch is coalesced into
+        one upsert.
+        """
+        counts, totals = {}, {}
+        with self._lock, self.conn:
+            for calculation, subject_usage in entries:
+                self._insert_calculation(calculation)
+                usage = calculation.get("subjects", {}) if subject_usage is None else subject_usage
+                for subject, weekly_slots in usage.items():
+                    counts[subject] = counts.get(subject, 0) + 1
+                    totals[subject] = totals.get(subject, 0) + weekly_slots
+            if today is not None and counts:
+                self._upsert_subjects(totals, counts, today)
+            self._apply_retention()
+
+    def _insert_calculation(self, calculation):
+        metadata = calculation.get("metadata", {})
+        cursor = self.conn.execute(
+            '''INSERT INTO calculations (timestamp, last_date, holidays, summary, total_subjects,
+                                         total_conducted, total_required, total_extra_needed)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            (
+                calculation["timestamp"],
+                calculation["last_date"],
+                json.dumps(calculation.get("holidays", [])),
+                calculation.get("summary"),
+                metadata.get("total_subjects"),
+                metadata.get("total_conducted"),
+                metadata.get("total_required"),
+                metadata.get("total_extra_needed")
+            )
+        )
+        calculation_id = cursor.lastrowid
+
+        results = {r["subject"]: r for r in calculation.get("results", [])}
+        conducted = calculation.get("conducted", {})
+        self.conn.executemany(
+            '''INSERT OR REPLACE INTO calculation_results
+               (calculation_id, subject, subject_name, weekly_slots, conducted, required,
+                remaining_regular, missed_in_holidays, extra_needed)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            [
+                (calculation_id, subject, split_qualified_name(subject)[1], weekly, conducted.get(subject, 0))
+                + tuple(results.get(subject, {}).get(field) for field in RESULT_FIELDS)
+                for subject, weekly in calculation.get("subjects", {}).items()
+            ]
+        )
+        return calculation_id
+
+    def _apply_retention(self):
+        if self.max_entries:
+            self.conn.execute(
+                '''DELETE FROM calculations WHERE id <= (
+                       SELECT id FROM calculations ORDER BY id DESC LIMIT 1 OFFSET ?)''',
+                (self.max_entries,)
+            )
+        if self.max_age_days:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            self.conn.execute("DELETE FROM calculations WHERE timestamp < ?", (cutoff,))
+
+    def recent_calculations(self, limit=10):
+        """Return the last ``limit`` history entries, oldest first"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM calculations ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+            return self._to_entries(reversed(rows))
+
+    def query_calculations(self, since=None, until=None, subject=None, last_date=None, cursor=None, limit=50):
+        """Return one page of history entries, newest first, and the cursor for the next page
+
+        ``since``/``until`` bound the timestamp (ISO strings, ``until``
+        exclusive), ``subject`` keeps calculations that include that subject
+        and ``last_date`` matches the semester end date. ``cursor`` is the
+        value returned with the previous page; it is None after the last page.
+        A plain ``subject`` ("ADA") matches it in any section, ignoring case;
+        a qualified one ("ADA [CSE A]") matches that section's subject only.
+        A subject filter walks the results indexes, the other filters use the
+        calculations indexes, so only matching rows are read.
+        """
+        with self._lock:
+            rows = self._select_calculations(since, until, subject, last_date, cursor, limit + 1)
+            page = rows[:limit]
+            next_cursor = page[-1]["id"] if len(rows) > limit else None
+            return self._to_entries(page), next_cursor
+
+    def _select_calculations(self, since, until, subject, last_date, cursor, limit, newest_first=True):
+        """Fetch calculation rows matching the history filters, keyset-paged on id past ``cursor``"""
+        if subject is not None:
+            # A plain name can match several sections of one calculation; GROUP BY keeps each once
+            section, subject_name = split_qualified_name(subject)
+            query = ('SELECT c.* FROM calculation_results r JOIN calculations c ON c.id = r.calculation_id '
+                     'WHERE r.subject_name = ? COLLATE NOCASE')
+            params = [subject_name]
+            if section:
+                query += ' AND r.subject = ?'
+                params.append(subject)
+            id_column = 'r.calculation_id'
+            group = f' GROUP BY {id_column}'
+        else:
+            query = 'SELECT c.* FROM calculations c WHERE 1'
+            params = []
+            id_column = 'c.id'
+            group = ''
+
+        if cursor is not None:
+            query += f' AND {id_column} {"<" if newest_first else ">"} ?'
+            params.append(cursor)
+        if since is not None:
+            query += ' AND c.timestamp >= ?'
+            params.append(since)
+        if until is not None:
+            query += ' AND c.timestamp < ?'
+            params.append(until)
+        if last_date is not None:
+            query += ' AND c.last_date = ?'
+            params.append(last_date)
+
+        query += f'{group} ORDER BY {id_column} {"DESC" if newest_first else "ASC"} LIMIT ?'
+        params.append(limit)
+        return self.conn.execute(query, params).fetchall()
+
+    def iter_result_rows(self, since=None, until=None, subject=None, last_date=None, chunk_size=200):
+        """Yield lists of flat per-subject export rows, oldest calculation first
+
+        Takes the same filters as query_calculations(). ``chunk_size``
+        calculations are read per chunk and the lock is released between
+        chunks, so a full export holds one chunk in memory at a time. A legacy
+        entry without per-subject results carries its summary on its first
+        row only.
+        """
+        cursor = None
+        while True:
+            with self._lock:
+                calculations = self._select_calculations(
+                    since, until, subject, last_date, cursor, chunk_size, newest_first=False
+                )
+                if not calculations:
+                    return
+                ids = [row["id"] for row in calculations]
+                placeholders = ','.join('?' * len(ids))
+                results = self.conn.execute(
+                    f"SELECT * FROM calculation_results WHERE calculation_id IN ({placeholders}) "
+                    f"ORDER BY calculation_id, rowid",
+                    ids
+                ).fetchall()
+
+            by_id = {row["id"]: row for row in calculations}
+            chunk = []
+            previous_id = None
+            for result in results:
+                calculation = by_id[result["calculation_id"]]
+                first = result["calculation_id"] != previous_id
+                previous_id = result["calculation_id"]
+                chunk.append({
+                    "calculation_id": calculation["id"],
+                    "timestamp": calculation["timestamp"],
+                    "last_date": calculation["last_date"],
+                    "holidays": json.loads(calculation["holidays"]),
+                    "subject": result["subject"],
+                    "weekly_slots": result["weekly_slots"],
+                    "conducted": result["conducted"],
+                    **{field: result[field] for field in RESULT_FIELDS},
+                    "summary": calculation["summary"] if first and result["required"] is None else None,
+                })
+            if chunk:
+                yield chunk
+            cursor = calculations[-1]["id"]
+
+    def _to_entries(self, rows):
+        """Rebuild history dicts (the JSON history format) from calculation rows"""
+        rows = list(rows)
+        if not rows:
+            return []
+
+        ids = [row["id"] for row in rows]
+        results_by_id = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for result in self.conn.execute(
+                f"SELECT * FROM calculation_results WHERE calculation_id IN ({placeholders}) ORDER BY rowid",
+                chunk
+            ):
+                results_by_id.setdefault(result["calculation_id"], []).append(result)
+
+        entries = []
+        for row in rows:
+            results = results_by_id.get(row["id"], [])
+            entry = {
+                "timestamp": row["timestamp"],
+                "subjects": {r["subject"]: r["weekly_slots"] for r in results},
+                "conducted": {r["subject"]: r["conducted"] for r in results},
+                "last_date": row["last_date"],
+                "holidays": json.loads(row["holidays"]),
+                "results": [
+                    {"subject": r["subject"], "conducted": r["conducted"],
+                     **{field: r[field] for field in RESULT_FIELDS}}
+                    for r in results if r["required"] is not None
+                ],
+                "metadata": {
+                    "total_subjects": row["total_subjects"],
+                    "total_conducted": row["total_conducted"],
+                    "total_required": row["total_required"],
+                    "total_extra_needed": row["total_extra_needed"]
+                }
+            }
+            if row["summary"] is not None:
+                entry["summary"] = row["summary"]
+            entries.append(entry)
+        return entries
+
+    # Subjects
+
+    def _upsert_subjects(self, totals, counts, today):
+        # ``totals`` maps names to weekly-slot sums over ``counts`` uses.
+        # The mean is kept as sum / count so it never accumulates rounding error
+        self.conn.executemany(
+            '''INSERT INTO subjects (name, count, first_seen, last_seen, avg_weekly_slots, weekly_slots_total)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(name) DO UPDATE SET
+                   count = count + excluded.count,
+                   last_seen = excluded.last_seen,
+                   weekly_slots_total = weekly_slots_total + excluded.weekly_slots_total,
+                   avg_weekly_slots = (weekly_slots_total + excluded.weekly_slots_total) / (count + excluded.count)''',
+            [
+                (subject, counts[subject], today, today, weekly_slots / counts[subject], weekly_slots)
+                for subject, weekly_slots in totals.items()
+            ]
+        )
+        self._statistics = None
+
+    def known_subjects(self, min_count=1, names=None):
+        """Return subject names seen at least ``min_count`` times, most used first
+
+        ``names`` restricts the lookup to those subjects, e.g. the ones just saved.
+        """
+        query = "SELECT name FROM subjects WHERE count >= ?"
+        params = [min_count]
+        if names is not None:
+            names = list(names)
+            if not names:
+                return []
+            query += f" AND name IN ({','.join('?' * len(names))})"
+            params += names
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY count DESC, rowid", params).fetchall()
+        return [row["name"] for row in rows]
+
+    def all_subjects(self):
+        with self._lock:
+            return [dict(row) for row in self.conn.execute("SELECT * FROM subjects ORDER BY rowid")]
+
+    def clean_subjects(self, merges, drops, key="subjects_canonicalized"):
+        """Fold alias rows into their canonical subject and delete noise rows in one transaction
+
+        ``merges`` maps alias -> canonical name; counts and weekly-slot sums
+        add up and the seen dates widen.
+        """
+        with self._lock, self.conn:
+            for alias, canonical in merges.items():
+                row = self.conn.execute(
+                    "SELECT count, first_seen, last_seen, weekly_slots_total FROM subjects WHERE name = ?", (alias,)
+                ).fetchone()
+                if row is None:
+                    continue
+                self.conn.execute(
+                    '''UPDATE subjects SET
+                           avg_weekly_slots = (weekly_slots_total + ?) / (count + ?),
+                           weekly_slots_total = weekly_slots_total + ?,
+                           count = count + ?,
+                           first_seen = MIN(first_seen, COALESCE(?, first_seen)),
+                           last_seen = MAX(last_seen, COALESCE(?, last_seen))
+                       WHERE name = ?''',
+                    (row["weekly_slots_total"] or 0, row["count"], row["weekly_slots_total"] or 0, row["count"],
+                     row["first_seen"], row["last_seen"], canonical)
+                )
+            names = list(merges) + list(drops)
+            self.conn.executemany("DELETE FROM subjects WHERE name = ?", [(name,) for name in names])
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, datetime.now().isoformat())
+            )
+            self._statistics = None
+
+    def subject_statistics(self):
+        """Return the subject count, top 10 by use and 5 most recently seen
+
+        Both lists are read in index order (idx_subjects_count and
+        idx_subjects_last_seen), and the answer is kept until the subjects
+        table next changes.
+        """
+        with self._lock:
+            if self._statistics is None:
+                total = self.conn.execute("SELECT COUNT(*) FROM subjects").fetchone()[0]
+                most_common = self.conn.execute(
+                    "SELECT name, count FROM subjects ORDER BY count DESC, rowid LIMIT 10"
+                ).fetchall()
+                recently_added = self.conn.execute(
+                    "SELECT name FROM subjects ORDER BY last_seen DESC, rowid LIMIT 5"
+                ).fetchall()
+                self._statistics = {
+                    "total_subjects": total,
+                    "most_common": [(row["name"], row["count"]) for row in most_common],
+                    "recently_added": [row["name"] for row in recently_added]
+                }
+            statistics = self._statistics
+
+        return {key: list(value) if isinstance(value, list) else value for key, value in statistics.items()}
+
+    # Projects
+
+    def save_project(self, name, data):
+        with self._lock, self.conn:
+            self.conn.execute(
+                '''INSERT INTO projects (name, data) VALUES (?, ?)
+                   ON CONFLICT(name) DO UPDATE SET data = excluded.data, updated_at = CURRENT_TIMESTAMP''',
+                (name, json.dumps(data))
+            )
+
+    def load_project(self, name):
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM projects WHERE name = ?", (name,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    # Migration
+
+    def is_migrated(self, key):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def migrate_json(self, history_entries, subjects_db, key="json_migrated"):
+        """One-time import of the JSON history and subjects database in one transaction"""
+        with self._lock, self.conn:
+            for calculation in history_entries:
+                self._insert_calculation(calculation)
+
+            self.conn.executemany(
+                '''INSERT OR REPLACE INTO subjects
+                   (name, count, first_seen, last_seen, avg_weekly_slots, weekly_slots_total)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                [
+                    (name, data.get("count", 1), data.get("first_seen"), data.get("last_seen"),
+                     data.get("avg_weekly_slots", 0), data.get("avg_weekly_slots", 0) * data.get("count", 1))
+                    for name, data in subjects_db.items()
+                ]
+            )
+            self._statistics = None
+            self._apply_retention()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, datetime.now().isoformat())
+            )
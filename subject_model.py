@@ -0,0 +1,282 @@
+from array import array
+
+from PyQt6.QtCore import QAbstractTableModel, QEvent, QModelIndex, QRect, Qt
+from PyQt6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+from utils import qualified_name
+
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+HEADERS = ["Section", "Subject", "Conducted", "Weekly"] + DAYS
+
+SECTION_COL, SUBJECT_COL, CONDUCTED_COL, WEEKLY_COL, FIRST_DAY_COL = 0, 1, 2, 3, 4
+
+
+class SubjectTableModel(QAbstractTableModel):
+    """Subjects table backed by compact integer arrays (subjects x 7 day counts)
+
+    Each row is one (section, subject) pair; the section is "" for
+    single-class timetables.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []
+        self.sections = []
+        self.conducted = array('i')
+        self.weekly = array('i')
+        self.counts = array('i')  # row-major, 7 entries per subject
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                return HEADERS[section]
+            return str(section + 1)
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row, col = index.row(), index.column()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if col == SECTION_COL:
+                return self.sections[row]
+            if col == SUBJECT_COL:
+                return self.names[row]
+            if col == CONDUCTED_COL:
+                return self.conducted[row] if role == Qt.ItemDataRole.EditRole else str(self.conducted[row])
+            if col == WEEKLY_COL:
+                return str(self.weekly[row])
+            return self.counts[row * 7 + col - FIRST_DAY_COL]
+
+        if role == Qt.ItemDataRole.TextAlignmentRole and col not in (SECTION_COL, SUBJECT_COL):
+            return Qt.AlignmentFlag.AlignCenter
+
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() in (SECTION_COL, SUBJECT_COL, CONDUCTED_COL):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+
+        row, col = index.row(), index.column()
+        if col == SECTION_COL:
+            self.sections[row] = str(value).strip()
+        elif col == SUBJECT_COL:
+            self.names[row] = str(value)
+        elif col == CONDUCTED_COL:
+            try:
+                conducted = int(str(value).strip())
+            except ValueError:
+                return False
+            if conducted < 0:
+                return False
+            self.conducted[row] = conducted
+        elif col >= FIRST_DAY_COL:
+            self.set_day_count(row, col - FIRST_DAY_COL, int(value))
+            return True
+        else:
+            return False
+
+        self.dataChanged.emit(index, index)
+        return True
+
+    # Editing helpers
+
+    def set_day_count(self, row, day_index, count):
+        """Set one day counter (clamped at 0) and refresh the weekly total"""
+        offset = row * 7 + day_index
+        count = max(0, count)
+        if self.counts[offset] == count:
+            return
+
+        self.weekly[row] += count - self.counts[offset]
+        self.counts[offset] = count
+
+        self.dataChanged.emit(self.index(row, FIRST_DAY_COL + day_index), self.index(row, FIRST_DAY_COL + day_index))
+        self.dataChanged.emit(self.index(row, WEEKLY_COL), self.index(row, WEEKLY_COL))
+
+    def adjust_day_count(self, row, day_index, change):
+        self.set_day_count(row, day_index, self.counts[row * 7 + day_index] + change)
+
+    def add_subject(self, name, conducted=0, day_counts=None, section=''):
+        """Append one subject; day_counts maps 'Mon'.. to classes per day"""
+        row = len(self.names)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._append(name, conducted, day_counts, section)
+        self.endInsertRows()
+        return row
+
+    def set_subjects(self, subjects):
+        """Replace all rows with (name, conducted, day_counts[, section]) tuples in one reset"""
+        self.beginResetModel()
+        self._clear_arrays()
+        for subject in subjects:
+            self._append(*subject)
+        self.endResetModel()
+
+    def set_subject_matrix(self, names, matrix, sections=None):
+        """Replace all rows from a subjects x 7 count matrix (conducted starts at 0)"""
+        rows = [list(map(int, row)) for row in matrix]
+        self.beginResetModel()
+        self.names = list(names)
+        self.sections = list(sections) if sections is not None else [''] * len(rows)
+        self.conducted = array('i', [0] * len(rows))
+        self.weekly = array('i', [sum(row) for row in rows])
+        self.counts = array('i', [count for row in rows for count in row])
+        self.endResetModel()
+
+    def append_subject_matrix(self, names, matrix, sections=None):
+        """Append rows from a subjects x 7 count matrix in one insert (conducted starts at 0)"""
+        rows = [list(map(int, row)) for row in matrix]
+        if not rows:
+            return
+        first = len(self.names)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.names.extend(names)
+        self.sections.extend(sections if sections is not None else [''] * len(rows))
+        self.conducted.extend([0] * len(rows))
+        self.weekly.extend(sum(row) for row in rows)
+        self.counts.extend(count for row in rows for count in row)
+        self.endInsertRows()
+
+    def remove_subject(self, row):
+        if 0 <= row < len(self.names):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.names[row]
+            del self.sections[row]
+            del self.conducted[row]
+            del self.weekly[row]
+            del self.counts[row * 7:(row + 1) * 7]
+            self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._clear_arrays()
+        self.endResetModel()
+
+    def _append(self, name, conducted, day_counts, section=''):
+        day_counts = day_counts or {}
+        row_counts = [max(0, int(day_counts.get(day, 0))) for day in DAYS]
+        self.names.append(name)
+        self.sections.append(section or '')
+        self.conducted.append(int(conducted))
+        self.weekly.append(sum(row_counts))
+        self.counts.extend(row_counts)
+
+    def _clear_arrays(self):
+        self.names = []
+        self.sections = []
+        self.conducted = array('i')
+        self.weekly = array('i')
+        self.counts = array('i')
+
+    # Readers
+
+    def day_counts(self, row):
+        """Return the 7 day counts for a row (Mon..Sun)"""
+        return self.counts[row * 7:(row + 1) * 7].tolist()
+
+    def days_schedule(self, row):
+        """Return the row's schedule as "Mon-2,Tue-1,Thu-2" """
+        return ','.join(f"{day}-{count}" for day, count in zip(DAYS, self.day_counts(row)) if count > 0)
+
+    def display_name(self, row):
+        return qualified_name(self.sections[row], self.names[row])
+
+    def row_values(self, row):
+        """Return (qualified name, day_counts, conducted, weekly) for one row"""
+        return self.display_name(row), self.day_counts(row), self.conducted[row], self.weekly[row]
+
+    def subject_data(self, row):
+        return {
+            'conducted': self.conducted[row],
+            'weekly_slots': self.weekly[row],
+            'days_schedule': self.days_schedule(row)
+        }
+
+    def subjects_data(self):
+        """Return {qualified name: {'conducted', 'weekly_slots', 'days_schedule'}} for calculation"""
+        return {self.display_name(row): self.subject_data(row) for row in range(len(self.names))}
+
+    def sections_data(self):
+        """Return {section: {subject: subject_data}} with sections in order of first appearance"""
+        sections = {}
+        for row in range(len(self.names)):
+            sections.setdefault(self.sections[row], {})[self.names[row]] = self.subject_data(row)
+        return sections
+
+    def project_subjects(self):
+        """Return the subjects list stored in project files"""
+        return [
+            {
+                'name': self.names[row],
+                **({'section': self.sections[row]} if self.sections[row] else {}),
+                'conducted': self.conducted[row],
+                'weekly': self.weekly[row],
+                'days': dict(zip(DAYS, self.day_counts(row)))
+            }
+            for row in range(len(self.names))
+        ]
+
+
+class DayCounterDelegate(QStyledItemDelegate):
+    """Paints a day count with -/+ buttons and handles clicks on them"""
+
+    BUTTON_WIDTH = 20
+
+    def _button_rects(self, rect):
+        height = min(rect.height() - 6, 25)
+        top = rect.top() + (rect.height() - height) // 2
+        minus_rect = QRect(rect.left() + 4, top, self.BUTTON_WIDTH, height)
+        plus_rect = QRect(rect.right() - 4 - self.BUTTON_WIDTH + 1, top, self.BUTTON_WIDTH, height)
+        return minus_rect, plus_rect
+
+    def paint(self, painter, option, index):
+        style = option.widget.style() if option.widget else QApplication.style()
+
+        # Background and selection without the count text
+        self.initStyleOption(option, index)
+        option.text = ""
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+
+        minus_rect, plus_rect = self._button_rects(option.rect)
+        for rect, label in ((minus_rect, "-"), (plus_rect, "+")):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = label
+            button.state = QStyle.StateFlag.State_Enabled
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+        text_rect = QRect(minus_rect.right() + 1, option.rect.top(),
+                          plus_rect.left() - minus_rect.right() - 1, option.rect.height())
+        painter.save()
+        painter.setPen(option.palette.color(option.palette.ColorRole.Text))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, str(index.data()))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            minus_rect, plus_rect = self._button_rects(option.rect)
+            position = event.position().toPoint()
+            day_index = index.column() - FIRST_DAY_COL
+            if minus_rect.contains(position):
+                model.adjust_day_count(index.row(), day_index, -1)
+                return True
+            if plus_rect.contains(position):
+                model.adjust_day_count(index.row(), day_index, 1)
+                return True
+        return super().editorEvent(event, model, option, index)
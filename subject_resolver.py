@@ -0,0 +1,148 @@
+import re
+import threading
+from collections import Counter
+
+NGRAM = 3
+DEFAULT_THRESHOLD = 0.8
+
+# Names longer than this are OCR run-ons, not subjects
+MAX_NAME_WORDS = 3
+MAX_WORD_LENGTH = 16
+
+
+def normalize_name(name):
+    """Uppercase a name and drop everything except letters and digits"""
+    return re.sub(r'[^A-Z0-9]', '', str(name).upper())
+
+
+def name_code(key):
+    """Return the digit groups of a normalized name: CS101 and CS102 are different courses"""
+    return tuple(re.findall(r'[0-9]+', key))
+
+
+def name_ngrams(key, n=NGRAM):
+    """Return the padded character n-grams of a normalized name"""
+    padded = '$' * (n - 1) + key + '$'
+    return Counter(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+def is_plausible_subject(name):
+    """Return False for names that look like OCR noise rather than a subject"""
+    words = str(name).split()
+    return (0 < len(words) <= MAX_NAME_WORDS
+            and all(len(word) <= MAX_WORD_LENGTH for word in words)
+            and bool(normalize_name(name)))
+
+
+class SubjectResolver:
+    """Map raw subject names to known canonical subjects via an n-gram inverted index
+
+    Candidates are only the subjects sharing at least one n-gram with the
+    query and carrying the same digits (course code), scored by the Dice
+    coefficient of their n-gram multisets; the best candidate at or above
+    ``threshold`` wins. Resolutions are cached.
+    """
+
+    def __init__(self, subjects=(), threshold=DEFAULT_THRESHOLD, n=NGRAM):
+        self.threshold = threshold
+        self.n = n
+
+        self._lock = threading.Lock()
+        self.names = []
+        self._keys = {}        # normalized key -> subject id
+        self._sizes = []       # n-gram count per subject id
+        self._codes = []       # digit groups per subject id
+        self._postings = {}    # n-gram -> [(subject id, occurrences)]
+        self._cache = {}       # raw name -> canonical name or None
+
+        for name in subjects:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._keys
+
+    def set_threshold(self, threshold):
+        with self._lock:
+            self.threshold = threshold
+            self._cache.clear()
+
+    def add(self, name):
+        """Register a canonical subject name (ignored if already known)"""
+        key = normalize_name(name)
+        if not key:
+            return
+        with self._lock:
+            if key in self._keys:
+                return
+            subject_id = len(self.names)
+            self.names.append(name)
+            self._keys[key] = subject_id
+
+            grams = name_ngrams(key, self.n)
+            self._sizes.append(sum(grams.values()))
+            self._codes.append(name_code(key))
+            for gram, occurrences in grams.items():
+                self._postings.setdefault(gram, []).append((subject_id, occurrences))
+
+            # New subjects can change earlier misses
+            self._cache.clear()
+
+    def match(self, name):
+        """Return the canonical subject for a raw name, or None when nothing is similar enough"""
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+
+        key = normalize_name(name)
+        canonical = None
+        if key:
+            subject_id = self._keys.get(key)
+            if subject_id is None:
+                subject_id = self._best_candidate(key)
+            if subject_id is not None:
+                canonical = self.names[subject_id]
+
+        self._cache[name] = canonical
+        return canonical
+
+    def resolve(self, name):
+        """Return the canonical subject for a raw name, or the name itself if unknown"""
+        return self.match(name) or name
+
+    def _best_candidate(self, key):
+        grams = name_ngrams(key, self.n)
+        size = sum(grams.values())
+        code = name_code(key)
+
+        shared = Counter()
+        for gram, occurrences in grams.items():
+            for subject_id, subject_occurrences in self._postings.get(gram, ()):
+                shared[subject_id] += min(occurrences, subject_occurrences)
+
+        best_id, best_score = None, self.threshold
+        for subject_id, common in shared.items():
+            if self._codes[subject_id] != code:
+                continue
+            score = 2.0 * common / (size + self._sizes[subject_id])
+            if score >= best_score and (best_id is None or score > best_score):
+                best_id, best_score = subject_id, score
+        return best_id
+
+    def canonicalize_counts(self, names, matrix, sections=None):
+        """Rename rows to their canonical subjects without ever merging rows
+
+        A row is only renamed when no other row of its section resolves to
+        the same subject, so subjects the sheet lists separately stay
+        separate. With ``sections`` (one per row) rows are compared within
+        their section. Returns (names, matrix, sections); the matrix is
+        unchanged.
+        """
+        resolved = [self.resolve(name) for name in names]
+        keys = resolved if sections is None else list(zip(sections, resolved))
+        claims = Counter(keys)
+        names = [canonical if claims[key] == 1 else name for name, canonical, key in zip(names, resolved, keys)]
+        return names, matrix, sections
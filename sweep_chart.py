@@ -0,0 +1,97 @@
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QColor, QPainter, QPainterPath, QPen
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+COLORS = ['#2a82da', '#e4572e', '#29a35a', '#9b59b6', '#f1a208', '#17becf']
+
+
+class SweepChart(QWidget):
+    """Line chart of extra classes needed against the semester end date
+
+    ``set_series(dates, series)`` takes the x dates and a list of
+    (label, values) pairs, one line each; ``marker`` draws a vertical line
+    at a date (the current semester end).
+    """
+
+    MARGIN_LEFT, MARGIN_RIGHT, MARGIN_TOP, MARGIN_BOTTOM = 48, 28, 28, 36
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.dates = []
+        self.series = []
+        self.marker = None
+        self.setMinimumSize(480, 260)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+
+    def set_series(self, dates, series, marker=None):
+        self.dates = list(dates)
+        self.series = [(label, list(values)) for label, values in series]
+        self.marker = marker
+        self.update()
+
+    def plot_rect(self):
+        return QRectF(self.MARGIN_LEFT, self.MARGIN_TOP,
+                      max(1, self.width() - self.MARGIN_LEFT - self.MARGIN_RIGHT),
+                      max(1, self.height() - self.MARGIN_TOP - self.MARGIN_BOTTOM))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        text_color = self.palette().color(self.palette().ColorRole.Text)
+        rect = self.plot_rect()
+
+        if not self.dates or not self.series:
+            painter.setPen(text_color)
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No scenarios evaluated")
+            return
+
+        first, last = self.dates[0], self.dates[-1]
+        span_days = max(1, (last - first).days)
+        top = max(1, max(max(values) for _, values in self.series))
+
+        def point(date, value):
+            x = rect.left() + rect.width() * (date - first).days / span_days
+            y = rect.bottom() - rect.height() * value / top
+            return QPointF(x, y)
+
+        # Axes, horizontal grid and labels
+        grid_pen = QPen(QColor(128, 128, 128, 70))
+        for step in range(5):
+            value = top * step / 4
+            y = rect.bottom() - rect.height() * step / 4
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+            painter.setPen(text_color)
+            painter.drawText(QRectF(0, y - 8, self.MARGIN_LEFT - 6, 16),
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, f"{value:.0f}")
+
+        painter.setPen(text_color)
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+        painter.drawLine(rect.bottomLeft(), rect.topLeft())
+        ticks = min(len(self.dates), 6)
+        for i in range(ticks):
+            date = self.dates[round(i * (len(self.dates) - 1) / max(1, ticks - 1))]
+            x = point(date, 0).x()
+            painter.drawText(QRectF(x - 40, rect.bottom() + 4, 80, 16), Qt.AlignmentFlag.AlignCenter,
+                             date.strftime('%d/%m'))
+
+        if self.marker is not None and first <= self.marker <= last:
+            painter.setPen(QPen(QColor(128, 128, 128), 1, Qt.PenStyle.DashLine))
+            x = point(self.marker, 0).x()
+            painter.drawLine(QPointF(x, rect.top()), QPointF(x, rect.bottom()))
+
+        # One line per series, with a legend across the top
+        legend_x = rect.left()
+        for index, (label, values) in enumerate(self.series):
+            color = QColor(COLORS[index % len(COLORS)])
+            path = QPainterPath(point(self.dates[0], values[0]))
+            for date, value in zip(self.dates[1:], values[1:]):
+                path.lineTo(point(date, value))
+            painter.setPen(QPen(color, 2))
+            painter.drawPath(path)
+
+            painter.fillRect(QRectF(legend_x, 8, 12, 12), color)
+            painter.setPen(text_color)
+            width = painter.fontMetrics().horizontalAdvance(label)
+            painter.drawText(QRectF(legend_x + 16, 4, width + 4, 20), Qt.AlignmentFlag.AlignVCenter, label)
+            legend_x += width + 32
@@ -0,0 +1,119 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from parse_cache import INDEX_FILE, ParseCache
+from timetable_parser import SheetCounts
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(tmp_path / "cache")
+
+
+def make_timetable(path, text="DAY,BATCH,9:15-10:10\nMON,5CSE,ADA\n"):
+    path.write_text(text)
+    return path
+
+
+def sheets():
+    return [
+        SheetCounts("Sheet1", ["ADA", "BS", "EN"],
+                    np.array([[2, 0, 1, 0, 1, 0, 0], [0, 1, 0, 1, 0, 0, 0], [1, 1, 1, 1, 1, 1, 0]]), 6,
+                    sections=["5CSE", "5CSE", "6CSE"],
+                    free_slots={"5CSE": [[0, "12:15-1:10"], [3, "9:15-10:10"]], "6CSE": [[4, "Slot 3"]]}),
+        SheetCounts("Empty", [], np.zeros((0, 7), dtype=np.int64), 0),
+        SheetCounts("Labs", ["DBMS"], np.array([[0, 0, 2**30, 0, 0, 0, 0]]), 1),
+    ]
+
+
+def entry_files(cache):
+    return sorted(cache.directory.glob("*.bin"))
+
+
+def index_paths(cache):
+    with open(cache.directory / INDEX_FILE, encoding="utf-8") as f:
+        return list(json.load(f))
+
+
+def test_round_trip(tmp_path, cache):
+    path = make_timetable(tmp_path / "t.csv")
+    stored = sheets()
+    cache.store_sheets(path, stored)
+
+    # A fresh instance reads the binary entry from disk
+    loaded = ParseCache(cache.directory).load_sheets(path)
+
+    assert len(loaded) == len(stored)
+    for got, want in zip(loaded, stored):
+        assert (got.name, got.subjects, got.row_count, got.sections) == \
+               (want.name, want.subjects, want.row_count, want.sections)
+        assert got.free_slots == want.free_slots
+        assert got.matrix.shape == (len(want.subjects), 7)
+        assert got.matrix.dtype == np.int64
+        np.testing.assert_array_equal(got.matrix, want.matrix)
+
+
+def test_changed_file_misses(tmp_path, cache):
+    path = make_timetable(tmp_path / "t.csv")
+    cache.store_sheets(path, sheets())
+
+    make_timetable(path, "DAY,BATCH,9:15-10:10\nTUE,5CSE,BS\n")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+
+    assert cache.load_sheets(path) is None
+
+
+def test_corrupt_entry_is_dropped(tmp_path, cache):
+    path = make_timetable(tmp_path / "t.csv")
+    cache.store_sheets(path, sheets())
+    (entry,) = entry_files(cache)
+    entry.write_bytes(b"not a cache entry")
+
+    assert cache.load_sheets(path) is None
+    assert not entry.exists()
+
+
+def test_evict_prunes_index_of_evicted_and_missing_files(tmp_path, cache):
+    paths = [make_timetable(tmp_path / f"t{i}.csv", f"DAY\nMON,{i}\n") for i in range(3)]
+    for path in paths:
+        cache.store_sheets(path, sheets())
+    entries = {path: cache._entry_path(cache.content_key(path)) for path in paths}
+    os.utime(entries[paths[0]], ns=(0, 0))  # least recently used
+
+    cache.max_bytes = sum(entry.stat().st_size for entry in entries.values()) - 1
+    cache.evict()
+
+    assert not entries[paths[0]].exists()
+    assert str(paths[0]) not in index_paths(cache)
+
+    os.remove(paths[1])
+    cache.evict()
+
+    assert index_paths(cache) == [str(paths[2])]
+    assert cache.load_sheets(paths[2]) is not None
+
+
+def test_index_keeps_project_documents_in_use(tmp_path, cache):
+    project = tmp_path / "project.json"
+    project.write_text(json.dumps({"subjects": {"ADA": {}}}))
+    timetable = make_timetable(tmp_path / "t.csv")
+
+    document = cache.load_json(project)
+    cache.store_sheets(timetable, sheets())  # evicts, and prunes the index
+
+    assert str(project) in index_paths(cache)
+    assert cache.load_json(project) is document
+
+
+def test_index_is_capped_to_most_recently_used_paths(tmp_path):
+    cache = ParseCache(tmp_path / "cache", max_index_paths=3)
+    paths = [make_timetable(tmp_path / f"t{i}.csv", f"DAY\nMON,{i}\n") for i in range(5)]
+    for path in paths:
+        cache.content_key(path)
+    cache.content_key(paths[2])  # a hit moves the path to the end
+    cache.content_key(make_timetable(tmp_path / "t5.csv", "DAY\nMON,5\n"))
+
+    assert index_paths(cache) == [str(paths[4]), str(paths[2]), str(tmp_path / "t5.csv")]
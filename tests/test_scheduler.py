@@ -0,0 +1,93 @@
+import datetime
+import random
+from collections import Counter
+
+import pytest
+
+from scheduler import assign_sessions, dated_slots, plan_extra_classes
+
+TODAY = datetime.date(2026, 10, 19)  # a Monday
+SLOTS = ['9:15-10:10', '10:15-11:10', '11:15-12:10', '12:15-1:10', '2:00-2:55']
+
+
+def random_case(rng):
+    free_slots = sorted({(rng.randrange(6), rng.choice(SLOTS)) for _ in range(rng.randint(1, 12))})
+    demand = {f"S{i}": rng.randint(0, 30) for i in range(rng.randint(1, 6))}
+    last_date = TODAY + datetime.timedelta(days=rng.randint(1, 90))
+    holidays = sorted({(TODAY + datetime.timedelta(days=rng.randint(1, 90))).isoformat() for _ in range(5)})
+    return free_slots, demand, last_date, holidays
+
+
+def copy_weeks(weeks):
+    return {week: list(cells) for week, cells in weeks.items()}
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_assign_sessions_invariants(seed):
+    free_slots, demand, last_date, holidays = random_case(random.Random(seed))
+    weeks = dated_slots(free_slots, last_date, holidays, TODAY)
+    cells = [cell for week_cells in weeks.values() for cell in week_cells]
+
+    assignments, unplaced = assign_sessions(demand, copy_weeks(weeks))
+
+    placed = Counter(name for name, *_ in assignments)
+    # Every class is either placed or reported unplaced, and nothing extra is invented
+    for name, need in demand.items():
+        assert placed[name] + unplaced.get(name, 0) == need
+    assert all(count > 0 for count in unplaced.values())
+    # Only real free cells are used, each at most once
+    used = [tuple(cell) for _, *cell in assignments]
+    assert len(used) == len(set(used))
+    assert set(used) <= set(cells)
+    # At most one extra class of a subject per day
+    days = Counter((name, day) for name, day, _, _ in assignments)
+    assert max(days.values(), default=1) == 1
+    # A subject is only left short when every day that still has a free cell already has its class
+    free_days = {day for day, _, _ in set(cells) - set(used)}
+    for name in unplaced:
+        assert free_days <= {day for subject, day, _, _ in assignments if subject == name}
+
+
+def test_scarce_cells_are_shared_in_proportion_to_need():
+    weeks = dated_slots([(0, SLOTS[0]), (2, SLOTS[1])], TODAY + datetime.timedelta(days=42), [], TODAY)
+
+    assignments, unplaced = assign_sessions({"ADA": 20, "BS": 10, "EN": 5}, copy_weeks(weeks))
+
+    placed = Counter(name for name, *_ in assignments)
+    assert sum(placed.values()) == 12
+    shares = [placed[name] / need for name, need in {"ADA": 20, "BS": 10, "EN": 5}.items()]
+    assert max(shares) - min(shares) <= 0.2
+    assert sum(unplaced.values()) == 35 - 12
+
+
+def test_sessions_are_spread_evenly_across_weeks():
+    free_slots = [(day, slot) for day in range(5) for slot in SLOTS]
+    weeks = dated_slots(free_slots, TODAY + datetime.timedelta(days=70), [], TODAY)
+
+    assignments, unplaced = assign_sessions({"ADA": 7, "BS": 5, "EN": 8}, copy_weeks(weeks))
+
+    loads = Counter((day - TODAY).days // 7 for _, day, _, _ in assignments)
+    assert not unplaced
+    assert len(loads) == len(weeks)
+    assert max(loads.values()) - min(loads.values()) <= 1
+
+
+def test_plan_respects_sections_holidays_and_dates():
+    holiday = TODAY + datetime.timedelta(days=7)  # the next Monday
+    last_date = TODAY + datetime.timedelta(days=28)
+    free_slots = {"CSE A": [(0, SLOTS[0]), (3, SLOTS[2])], "CSE B": [(1, SLOTS[4])]}
+
+    plan = plan_extra_classes({"CSE A": {"ADA": 3, "BS": 2}, "CSE B": {"ADA": 9}}, free_slots, last_date,
+                              [holiday.isoformat()], today=TODAY)
+
+    for session in plan:
+        assert TODAY < session.date <= last_date
+        assert session.date != holiday
+        assert (session.date.weekday(), session.slot) in free_slots[session.section]
+    assert plan.unplaced == {"ADA [CSE B]": 9 - 4}
+    assert len(plan) == 3 + 2 + 4
+
+
+def test_plan_needs_a_future_last_date():
+    with pytest.raises(ValueError):
+        plan_extra_classes({"": {"ADA": 1}}, {"": [(0, SLOTS[0])]}, TODAY, [], today=TODAY)
@@ -0,0 +1,191 @@
+import json
+import sqlite3
+
+import pytest
+
+from config import Config
+from data_manager import DataManager
+from storage import SCHEMA, SQLiteStore
+
+
+def calculation(timestamp, subjects, last_date="2027-01-15"):
+    return {
+        "timestamp": timestamp,
+        "subjects": subjects,
+        "conducted": {name: 10 for name in subjects},
+        "last_date": last_date,
+        "holidays": ["2026-12-25"],
+        "results": [
+            {"subject": name, "required": weekly * 15, "conducted": 10, "remaining_regular": weekly * 8,
+             "missed_in_holidays": 1, "extra_needed": 2}
+            for name, weekly in subjects.items()
+        ],
+        "metadata": {"total_subjects": len(subjects), "total_conducted": 10 * len(subjects),
+                     "total_required": sum(subjects.values()) * 15, "total_extra_needed": 2 * len(subjects)}
+    }
+
+
+@pytest.fixture
+def data_manager_factory(tmp_path):
+    """Build DataManagers over one scratch data directory and database"""
+    managers = []
+
+    def build():
+        config = Config(tmp_path / "config.json")
+        config.set("paths.data_dir", str(tmp_path / "data"), save=False)
+        config.set("paths.database", str(tmp_path / "data" / "data.db"), save=False)
+        config.set("history.max_entries", 0, save=False)
+        manager = DataManager(config)
+        managers.append(manager)
+        return manager
+
+    (tmp_path / "data").mkdir()
+    yield build
+    for manager in managers:
+        manager.flush()
+        if manager._store is not None:
+            manager.store.close()
+
+
+def write_jsonl(path, entries, torn=False):
+    with open(path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        if torn:
+            f.write('{"timestamp": "2026-10-')
+
+
+# Migration
+
+def test_migrates_legacy_json_history_and_subjects(tmp_path, data_manager_factory):
+    history = [calculation(f"2026-09-0{i}T10:00:00", {"ADA": 4, "BS": 3}) for i in range(1, 4)]
+    history[0].pop("results")  # the oldest format had only a rendered summary
+    history[0]["summary"] = "ADA: 2 extra"
+    (tmp_path / "data" / "calculations_history.json").write_text(json.dumps(history))
+    (tmp_path / "data" / "subjects_database.json").write_text(json.dumps({
+        "ADA": {"count": 3, "first_seen": "2026-09-01", "last_seen": "2026-09-03", "avg_weekly_slots": 4},
+        "BS": {"count": 2, "first_seen": "2026-09-01", "last_seen": "2026-09-02", "avg_weekly_slots": 3.5},
+    }))
+
+    manager = data_manager_factory()
+    entries = manager.store.recent_calculations(10)
+
+    assert [e["timestamp"] for e in entries] == [e["timestamp"] for e in history]
+    assert entries[0]["summary"] == "ADA: 2 extra"
+    assert entries[0]["results"] == []
+    assert entries[1]["results"] == history[1]["results"] and entries[1]["conducted"] == history[1]["conducted"]
+    assert entries[2]["metadata"] == history[2]["metadata"]
+    subjects = {row["name"]: row for row in manager.store.all_subjects()}
+    assert subjects["BS"]["count"] == 2 and subjects["BS"]["weekly_slots_total"] == 7
+    assert manager.store.is_migrated("json_migrated")
+
+
+def test_migrates_jsonl_log_and_skips_torn_lines(tmp_path, data_manager_factory):
+    log = [calculation(f"2026-10-{i:02d}T09:00:00", {"ADA [CSE A]": 4, "ADA [CSE B]": 4}) for i in range(1, 6)]
+    write_jsonl(tmp_path / "data" / "calculations_history.jsonl", log, torn=True)
+    # The JSON array was already imported into the log when the log was created
+    (tmp_path / "data" / "calculations_history.json").write_text(json.dumps(log[:2]))
+
+    manager = data_manager_factory()
+
+    entries = manager.store.recent_calculations(10)
+    assert [e["timestamp"] for e in entries] == [e["timestamp"] for e in log]
+    assert entries[-1]["subjects"] == {"ADA [CSE A]": 4, "ADA [CSE B]": 4}
+
+
+def test_migration_runs_once(tmp_path, data_manager_factory):
+    write_jsonl(tmp_path / "data" / "calculations_history.jsonl",
+                [calculation("2026-10-01T09:00:00", {"ADA": 4})])
+
+    first = data_manager_factory()
+    assert len(first.store.recent_calculations(10)) == 1
+    first.store.close()
+
+    second = data_manager_factory()
+    assert len(second.store.recent_calculations(10)) == 1
+
+
+# Schema upgrade
+
+def test_upgrade_backfills_subject_name_and_drops_old_index(tmp_path):
+    db_path = tmp_path / "old.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(SCHEMA.replace("subject_name TEXT,", "") + '''
+        CREATE INDEX idx_results_subject ON calculation_results(subject, calculation_id);
+        INSERT INTO calculations (id, timestamp, last_date, holidays) VALUES (1, '2026-10-01', '2027-01-15', '[]');
+        INSERT INTO calculation_results (calculation_id, subject, weekly_slots, conducted)
+            VALUES (1, 'ADA [CSE A]', 4, 10), (1, 'BS', 3, 9);
+    ''')
+    conn.commit()
+    conn.close()
+
+    store = SQLiteStore(db_path, max_entries=0)
+    try:
+        indexes = {row["name"] for row in store.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_results_subject" not in indexes
+        assert "idx_results_subject_name" in indexes
+        names = dict(store.conn.execute("SELECT subject, subject_name FROM calculation_results").fetchall())
+        assert names == {"ADA [CSE A]": "ADA", "BS": "BS"}
+        assert len(store.query_calculations(subject="ada")[0]) == 1
+        assert len(store.query_calculations(subject="ADA [CSE A]")[0]) == 1
+        assert store.query_calculations(subject="ADA [CSE B]")[0] == []
+    finally:
+        store.close()
+
+    # Opening an upgraded database again changes nothing
+    store = SQLiteStore(db_path, max_entries=0)
+    try:
+        assert len(store.query_calculations(subject="ADA")[0]) == 1
+    finally:
+        store.close()
+
+
+# Pagination
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(tmp_path / "history.db", max_entries=0)
+    entries = []
+    for i in range(23):
+        # Two sections of ADA in most calculations, so a plain filter matches two rows of each
+        subjects = {"ADA [CSE A]": 4, "ADA [CSE B]": 4, "BS [CSE A]": 3} if i % 3 else {"EN": 2}
+        entries.append((calculation(f"2026-10-01T09:{i:02d}:00", subjects), None))
+    store.add_calculations(entries, today="2026-10-18")
+    yield store
+    store.close()
+
+
+def all_pages(store, limit, **filters):
+    timestamps, cursor = [], None
+    while True:
+        page, cursor = store.query_calculations(cursor=cursor, limit=limit, **filters)
+        timestamps.extend(entry["timestamp"] for entry in page)
+        if cursor is None:
+            return timestamps
+
+
+@pytest.mark.parametrize("limit", [1, 4, 5, 23, 50])
+def test_pages_without_filter_return_each_entry_once(store, limit):
+    timestamps = all_pages(store, limit)
+
+    assert len(timestamps) == 23
+    assert timestamps == sorted(set(timestamps), reverse=True)
+
+
+@pytest.mark.parametrize("subject, expected", [("ADA", 15), ("ada", 15), ("ADA [CSE B]", 15), ("EN", 8),
+                                               ("ADA [CSE C]", 0)])
+@pytest.mark.parametrize("limit", [1, 4, 7, 50])
+def test_pages_with_subject_filter_return_each_entry_once(store, subject, expected, limit):
+    timestamps = all_pages(store, limit, subject=subject)
+
+    assert len(timestamps) == expected
+    assert timestamps == sorted(set(timestamps), reverse=True)
+
+
+def test_export_rows_cover_each_matching_calculation_once(store):
+    rows = [row for chunk in store.iter_result_rows(subject="ADA", chunk_size=4) for row in chunk]
+
+    ids = [row["calculation_id"] for row in rows]
+    assert len(set(ids)) == 15
+    assert len(rows) == 15 * 3  # every result row of a matching calculation is exported
+    assert ids == sorted(ids)
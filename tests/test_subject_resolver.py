@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from subject_resolver import SubjectResolver
+
+
+@pytest.fixture
+def resolver():
+    return SubjectResolver(["DATABASE SYSTEMS", "OPERATING SYSTEMS", "CS101", "CS201", "ADA"])
+
+
+@pytest.mark.parametrize("raw, canonical", [
+    ("DATABASE SYSTEM", "DATABASE SYSTEMS"),
+    ("Operating System", "OPERATING SYSTEMS"),
+    ("cs-101", "CS101"),
+    ("CS 101", "CS101"),
+    ("ada", "ADA"),
+])
+def test_matches_noisy_names(resolver, raw, canonical):
+    assert resolver.match(raw) == canonical
+
+
+@pytest.mark.parametrize("raw", ["CS102", "CS1011", "CS", "XYZ", ""])
+def test_never_matches_a_different_course_code(resolver, raw):
+    assert resolver.match(raw) is None
+    assert resolver.resolve(raw) == raw
+
+
+def test_course_code_guard_holds_at_a_low_threshold():
+    resolver = SubjectResolver(["CS101", "PHYSICS LAB 1"], threshold=0.3)
+
+    assert resolver.match("CS102") is None
+    assert resolver.match("PHYSICS LAB 2") is None
+    assert resolver.match("PHYSICS LAB") is None
+    assert resolver.match("PHYSICS LABS 1") == "PHYSICS LAB 1"
+
+
+def test_threshold_change_clears_cached_answers(resolver):
+    assert resolver.match("DATABASE SYSTEM") == "DATABASE SYSTEMS"
+
+    resolver.set_threshold(0.99)
+
+    assert resolver.match("DATABASE SYSTEM") is None
+
+
+def test_canonicalize_counts_renames_a_lone_variant(resolver):
+    matrix = np.array([[1, 0, 0, 0, 0, 0, 0], [0, 2, 0, 0, 0, 0, 0]])
+
+    names, counts, sections = resolver.canonicalize_counts(["Database System", "XYZ"], matrix)
+
+    assert names == ["DATABASE SYSTEMS", "XYZ"]
+    assert counts is matrix
+    assert sections is None
+
+
+def test_canonicalize_counts_never_merges_rows_listed_separately(resolver):
+    matrix = np.array([[1, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0], [0, 0, 1, 0, 0, 0, 0]])
+    raw = ["DATABASE SYSTEM", "Database Systems", "CS102"]
+
+    names, counts, _ = resolver.canonicalize_counts(raw, matrix.copy())
+
+    # Both rows resolve to one subject, so neither is renamed; CS102 is not CS101
+    assert names == raw
+    np.testing.assert_array_equal(counts, matrix)
+
+
+def test_canonicalize_counts_compares_rows_within_their_section(resolver):
+    matrix = np.ones((4, 7), dtype=np.int64)
+    raw = ["Database System", "Database System", "Database Systems", "cs 101"]
+    sections = ["CSE A", "CSE B", "CSE B", "CSE B"]
+
+    names, counts, returned_sections = resolver.canonicalize_counts(raw, matrix, sections)
+
+    assert names == ["DATABASE SYSTEMS", "Database System", "Database Systems", "CS101"]
+    assert counts.shape == (4, 7)
+    assert returned_sections == sections
@@ -0,0 +1,436 @@
+import os
+from itertools import chain
+
+import numpy as np
+
+from instrumentation import span
+
+DAY_NAMES = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+DAYS = [day.title() for day in DAY_NAMES]
+DAY_COLUMN_NAMES = ['DAY', 'DAYS', 'DAY OF WEEK', 'WEEKDAY']
+BATCH_COLUMN_NAMES = ['BATCH', 'SECTION']
+LAB_KEYWORDS = ['lab', 'practical', 'prac', 'laboratory', 'workshop']
+NON_SUBJECT_WORDS = ['FBL', 'LUNCH', 'BREAK', '']
+
+# Bump whenever parsing rules change so cached parses are invalidated
+PARSER_VERSION = 3
+
+
+def extract_subject_name(cell_value):
+    """Extract subject name from timetable cell"""
+    # Remove common suffixes and extract subject code
+    cell_value = cell_value.replace('-L', '').replace('-P', '').replace(' Lab', '')
+
+    # Split by space or hyphen and take first meaningful part
+    parts = cell_value.replace('(', ' ').replace(')', ' ').split()
+    if parts:
+        subject = parts[0].strip()
+        # Filter out common non-subject words
+        if subject.upper() not in NON_SUBJECT_WORDS:
+            return subject.upper()
+    return None
+
+
+def class_count_for_cell(cell_value, subject):
+    """Return 2 for lab/practical cells, 1 otherwise"""
+    # Check if it's a lab class
+    is_lab = any(keyword in cell_value.lower() for keyword in LAB_KEYWORDS)
+
+    # Check for -P suffix (Practical)
+    has_p_suffix = '-p' in cell_value.lower()
+
+    # Also check if subject name itself indicates lab
+    subject_lab = 'lab' in subject.lower() if subject else False
+
+    return 2 if (is_lab or subject_lab or has_p_suffix) else 1
+
+
+def read_raw(file):
+    """Read every cell of an Excel/CSV timetable once, without interpreting a header"""
+    import pandas as pd
+
+    if file.endswith('.csv'):
+        return pd.read_csv(file, header=None)
+    return pd.read_excel(file, header=None)
+
+
+def locate_header(raw):
+    """Return the index of the header row: the first of rows 0-1 with no blank cells, else 0"""
+    for header_row in (0, 1):
+        if header_row < len(raw) and raw.iloc[header_row].notna().all():
+            return header_row
+    return 0
+
+
+def read_timetable(file):
+    """Read an Excel/CSV timetable once and locate the header row in memory"""
+    raw = read_raw(file)
+    header_row = locate_header(raw)
+
+    df = raw.iloc[header_row + 1:].reset_index(drop=True)
+    df.columns = list(raw.iloc[header_row]) if len(raw) else raw.columns
+    return df
+
+
+def is_day_column_name(col):
+    """Return True if a header value names the DAY column"""
+    col_str = str(col).upper().strip()
+    return col_str in DAY_COLUMN_NAMES or any(day in col_str for day in ['MON', 'TUE', 'WED'])
+
+
+def is_batch_column_name(col):
+    """Return True if a header value names the BATCH (section) column"""
+    return str(col).upper().strip() in BATCH_COLUMN_NAMES
+
+
+def section_label(value):
+    """Return a BATCH cell as a section name ("" for blanks; 2.0 -> "2")"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def find_day_column(df):
+    """Find the DAY column (flexible naming), or None"""
+    for col in df.columns:
+        if is_day_column_name(col):
+            return col
+
+    # If no DAY column found, check if first column contains day names
+    if len(df.columns) > 0:
+        first_col_values = df.iloc[:, 0].astype(str).str.upper()
+        if any(day in ' '.join(first_col_values.values) for day in ['MON', 'TUE', 'WED', 'THU', 'FRI']):
+            return df.columns[0]
+
+    return None
+
+
+def count_matrix_with_free_slots(df, day_col):
+    """Count classes per subject per weekday for all cells at once, and find the free slots
+
+    Returns (subjects, matrix, sections, free_slots) where matrix is a
+    len(subjects) x 7 int array (Mon..Sun) and rows are in order of first
+    appearance. With a BATCH column each row is one (section, subject) pair
+    and ``sections`` names the row's section; a blank BATCH cell continues
+    the section above. Without one, ``sections`` is None.
+
+    ``free_slots`` is {section: [[weekday, slot label], ...]}: a slot is free
+    on a weekday when its cell is blank in every row of that section and
+    day; the section is "" without a BATCH column.
+    """
+    import pandas as pd
+
+    columns = list(df.columns)
+    day_position = columns.index(day_col)
+    batch_position = next((i for i, col in enumerate(columns) if i != day_position and is_batch_column_name(col)), None)
+    time_positions = [i for i, col in enumerate(columns) if i not in (day_position, batch_position)]
+
+    # Keep only rows whose DAY cell is a weekday name
+    days = df.iloc[:, day_position].astype(str).str.strip().str.upper()
+    day_index = days.map({day: i for i, day in enumerate(DAY_NAMES)})
+    day_rows = day_index.notna().to_numpy()
+
+    empty = ([], np.zeros((0, 7), dtype=np.int64), None if batch_position is None else [], {})
+    if not day_rows.any() or not time_positions:
+        return empty
+
+    # Flatten the time-slot block row-major so cells keep their reading order
+    block = df.iloc[day_rows, time_positions].to_numpy(dtype=object)
+    cells = pd.Series(block.ravel())
+    row_days = day_index[day_rows].to_numpy(dtype=np.int64)
+    cell_days = np.repeat(row_days, len(time_positions))
+    if batch_position is not None:
+        batches = df.iloc[:, batch_position].ffill().map(section_label)
+        batch_codes, batch_names = pd.factorize(batches[day_rows], sort=False)
+        cell_batches = np.repeat(batch_codes, len(time_positions))
+        row_sections = [batch_names[code] for code in batch_codes]
+    else:
+        row_sections = [''] * len(row_days)
+
+    blank = (~cells.notna() | (cells.astype(str).str.strip() == '')).to_numpy().reshape(block.shape)
+    free_slots = collect_free_slots(row_sections, row_days, blank, [columns[i] for i in time_positions])
+
+    present = cells.notna().to_numpy()
+    cell_days = cell_days[present]
+    if batch_position is not None:
+        cell_batches = cell_batches[present]
+
+    # Timetables repeat the same few cell values, so classify each distinct value once
+    cell_codes, unique_cells = pd.factorize(cells[present], sort=False)
+    values = pd.Series(unique_cells, dtype=object).astype(str).str.strip()
+
+    # Same rules as extract_subject_name, applied to every distinct value in bulk
+    cleaned = (values.str.replace('-L', '', regex=False)
+                     .str.replace('-P', '', regex=False)
+                     .str.replace(' Lab', '', regex=False)
+                     .str.replace('(', ' ', regex=False)
+                     .str.replace(')', ' ', regex=False))
+    value_subjects = cleaned.str.split(n=1).str[0].str.upper()
+    value_valid = ((values != '') & (values != 'nan')
+                   & value_subjects.notna() & ~value_subjects.isin(NON_SUBJECT_WORDS))
+
+    # Same rules as class_count_for_cell
+    lowered = values.str.lower()
+    value_is_lab = (lowered.str.contains('|'.join(LAB_KEYWORDS), regex=True)
+                    | lowered.str.contains('-p', regex=False)
+                    | value_subjects.fillna('').str.lower().str.contains('lab', regex=False))
+    value_counts = np.where(value_is_lab.to_numpy(), 2, 1)
+
+    valid = value_valid.to_numpy()[cell_codes]
+    cell_codes = cell_codes[valid]
+    cell_days = cell_days[valid]
+    if not len(cell_codes):
+        return empty[:3] + (free_slots,)
+
+    class_counts = value_counts[cell_codes]
+    subject_codes, subject_names = pd.factorize(value_subjects.to_numpy(dtype=object)[cell_codes], sort=False)
+    if batch_position is None:
+        codes, names, sections = subject_codes, list(subject_names), None
+    else:
+        # Rows are (section, subject) pairs, numbered in order of first appearance
+        pair_codes = cell_batches[valid] * len(subject_names) + subject_codes
+        codes, pairs = pd.factorize(pair_codes, sort=False)
+        names = [subject_names[pair % len(subject_names)] for pair in pairs]
+        sections = [batch_names[pair // len(subject_names)] for pair in pairs]
+
+    matrix = np.zeros((len(names), 7), dtype=np.int64)
+    np.add.at(matrix, (codes, cell_days), class_counts)
+    return names, matrix, sections, free_slots
+
+
+def collect_free_slots(row_sections, row_days, blank, slot_labels):
+    """Return {section: [[weekday, slot label], ...]} for slots blank in every row of a section's day"""
+    free = {}
+    for section, day, row_blank in zip(row_sections, row_days, blank):
+        day_free = free.setdefault(section, {})
+        if day in day_free:
+            day_free[day] &= row_blank
+        else:
+            day_free[day] = np.array(row_blank, dtype=bool)
+
+    labels = [str(label).strip() if label is not None else f"Slot {i + 1}" for i, label in enumerate(slot_labels)]
+    return {
+        section: [
+            [int(day), labels[i]]
+            for day in sorted(day_free)
+            for i in np.flatnonzero(day_free[day])
+        ]
+        for section, day_free in free.items()
+    }
+
+
+def merge_sections(subjects, matrix):
+    """Add up rows of the same subject from different sections"""
+    import pandas as pd
+
+    codes, names = pd.factorize(np.asarray(subjects, dtype=object), sort=False)
+    if len(names) == len(subjects):
+        return list(subjects), matrix
+    merged = np.zeros((len(names), 7), dtype=np.int64)
+    np.add.at(merged, codes, matrix)
+    return list(names), merged
+
+
+def matrix_to_counts(subjects, matrix):
+    """Convert a count matrix into {subject: {'Mon': 2, ...}}"""
+    return {
+        subject: {DAYS[i]: int(count) for i, count in enumerate(row) if count}
+        for subject, row in zip(subjects, matrix.tolist())
+    }
+
+
+def parse_timetable_sheet(file):
+    """Parse a timetable file into a SheetCounts (per section when it has a BATCH column)
+
+    Raises ValueError when no DAY column can be found.
+    """
+    with span("parse", file=os.path.basename(file)):
+        df = read_timetable(file)
+
+        day_col = find_day_column(df)
+        if day_col is None:
+            raise ValueError(
+                f"Excel file must have a DAY column or days in first column. Found columns: {list(df.columns)}\n"
+                f"First few rows: {df.head(3).to_string()}"
+            )
+
+        subjects, matrix, sections, free_slots = count_matrix_with_free_slots(df, day_col)
+        return SheetCounts(os.path.basename(file), subjects, matrix, len(df), sections, free_slots)
+
+
+def parse_timetable_matrix(file):
+    """Parse a timetable file into (subjects, subjects x 7 count matrix, row_count)
+
+    Sections are merged, so each subject appears once. Raises ValueError
+    when no DAY column can be found.
+    """
+    sheet = parse_timetable_sheet(file)
+    subjects, matrix = merge_sections(sheet.subjects, sheet.matrix)
+    return subjects, matrix, sheet.row_count
+
+
+def parse_timetable(file):
+    """Parse a timetable file into (subjects_count, row_count)
+
+    Raises ValueError when no DAY column can be found.
+    """
+    subjects, matrix, row_count = parse_timetable_matrix(file)
+    return matrix_to_counts(subjects, matrix), row_count
+
+
+class SheetCounts:
+    """Subject x weekday counts parsed from one worksheet
+
+    ``sections`` gives each row's BATCH value, or is None when the sheet
+    has no BATCH column. ``free_slots`` maps each section to its blank
+    [weekday, slot label] cells.
+    """
+    __slots__ = ('name', 'subjects', 'matrix', 'row_count', 'sections', 'free_slots')
+
+    def __init__(self, name, subjects, matrix, row_count, sections=None, free_slots=None):
+        self.name = name
+        self.subjects = subjects
+        self.matrix = matrix
+        self.row_count = row_count
+        self.sections = sections
+        self.free_slots = free_slots or {}
+
+    def qualify_section(self, section, qualify=False):
+        """Return the section name used in the subjects table for a raw BATCH value"""
+        if qualify:
+            return f"{self.name} {section}".strip()
+        return section
+
+    def row_sections(self, qualify=False):
+        """Return the section of every row; ``qualify`` adds the sheet name (multi-sheet workbooks)"""
+        sections = self.sections if self.sections is not None else [''] * len(self.subjects)
+        return [self.qualify_section(section, qualify) for section in sections]
+
+    def section_free_slots(self, qualify=False):
+        """Return the free slots keyed by the same section names as row_sections()"""
+        return {self.qualify_section(section, qualify): slots for section, slots in self.free_slots.items()}
+
+
+class WorkbookStream:
+    """Lazily parse every sheet of an .xlsx workbook with openpyxl read-only mode
+
+    Iterating yields one SheetCounts per sheet as soon as that sheet has
+    been read; rows are streamed, so memory stays flat regardless of the
+    workbook size. Sheets without a DAY column yield no subjects.
+    """
+
+    def __init__(self, file):
+        from openpyxl import load_workbook
+
+        self.file = file
+        self.workbook = load_workbook(file, read_only=True, data_only=True)
+        self.sheet_names = list(self.workbook.sheetnames)
+        # Distinct cell value -> (subject, class count), shared across sheets
+        self._cell_cache = {}
+
+    def __len__(self):
+        return len(self.sheet_names)
+
+    def __iter__(self):
+        try:
+            for name in self.sheet_names:
+                with span("parse_sheet", sheet=name):
+                    sheet = self.parse_sheet(self.workbook[name], name)
+                yield sheet
+        finally:
+            self.close()
+
+    def close(self):
+        self.workbook.close()
+
+    def classify(self, value):
+        """Return (subject, class_count) for a cell value, or (None, 0)"""
+        cached = self._cell_cache.get(value)
+        if cached is None:
+            cell_value = str(value).strip()
+            subject = extract_subject_name(cell_value) if cell_value and cell_value != 'nan' else None
+            cached = (subject, class_count_for_cell(cell_value, subject)) if subject else (None, 0)
+            self._cell_cache[value] = cached
+        return cached
+
+    def parse_sheet(self, worksheet, name):
+        rows = worksheet.iter_rows(values_only=True)
+
+        # Header is the first of the first two rows with no blank cells, else the first row
+        leading = []
+        header = None
+        for row in rows:
+            leading.append(row)
+            if all(value is not None for value in row):
+                header = row
+                break
+            if len(leading) == 2:
+                break
+        if header is None:
+            if not leading:
+                return SheetCounts(name, [], np.zeros((0, 7), dtype=np.int64), 0)
+            header = leading[0]
+            pending = leading[1:]
+        else:
+            pending = []
+
+        # Named DAY column, else assume days are in the first column
+        day_position = next((i for i, col in enumerate(header) if col is not None and is_day_column_name(col)), 0)
+        batch_position = next((i for i, col in enumerate(header)
+                               if i != day_position and col is not None and is_batch_column_name(col)), None)
+        time_positions = [i for i, col in enumerate(header) if i not in (day_position, batch_position)]
+        day_lookup = {day: i for i, day in enumerate(DAY_NAMES)}
+
+        # Keyed by (section, subject); a blank BATCH cell continues the section above
+        counts = {}
+        section = ''
+        row_count = 0
+        row_sections, row_days, blank = [], [], []
+        for row in chain(pending, rows):
+            row_count += 1
+            if batch_position is not None and batch_position < len(row) and row[batch_position] is not None:
+                section = section_label(row[batch_position]) or section
+            if day_position >= len(row) or row[day_position] is None:
+                continue
+            day = day_lookup.get(str(row[day_position]).strip().upper())
+            if day is None:
+                continue
+
+            row_sections.append(section)
+            row_days.append(day)
+            blank.append([i >= len(row) or row[i] is None or not str(row[i]).strip() for i in time_positions])
+            for i in time_positions:
+                if i >= len(row) or row[i] is None:
+                    continue
+                subject, class_count = self.classify(row[i])
+                if subject:
+                    key = (section, subject)
+                    if key not in counts:
+                        counts[key] = [0] * 7
+                    counts[key][day] += class_count
+
+        matrix = np.array(list(counts.values()), dtype=np.int64).reshape(len(counts), 7)
+        sections = None if batch_position is None else [key[0] for key in counts]
+        free_slots = collect_free_slots(row_sections, row_days, blank, [header[i] for i in time_positions])
+        return SheetCounts(name, [key[1] for key in counts], matrix, row_count, sections, free_slots)
+
+
+def iter_timetable_sheets(file):
+    """Yield SheetCounts per sheet: streamed for .xlsx, a single sheet for .csv/.xls
+
+    Raises ValueError when no sheet has a DAY column.
+    """
+    if not file.lower().endswith('.xlsx'):
+        yield parse_timetable_sheet(file)
+        return
+
+    found = False
+    for sheet in WorkbookStream(file):
+        if sheet.subjects:
+            found = True
+        yield sheet
+
+    if not found:
+        raise ValueError("No sheet in the workbook has a DAY column with weekday rows.")
@@ -1,29 +1,99 @@
 import datetime
+import re
+from bisect import bisect_left, bisect_right
 from datetime import date, timedelta
+from functools import lru_cache
+
+DAY_MAPPING = {
+    'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6
+}
+
+
+class HolidayIndex:
+    """Pre-parsed, sorted holiday dates bucketed by weekday for bisect lookups"""
+    __slots__ = ('dates', 'by_weekday')
+
+    def __init__(self, holidays):
+        holiday_dates = set()
+
+        # Convert holiday strings to date objects, skipping invalid entries
+        for holiday in holidays:
+            if isinstance(holiday, date):
+                holiday_dates.add(holiday)
+                continue
+            try:
+                holiday_dates.add(datetime.date.fromisoformat(holiday.strip()))
+            except ValueError:
+                continue
+
+        self.dates = sorted(holiday_dates)
+        self.by_weekday = [[] for _ in range(7)]
+        for holiday_date in self.dates:
+            self.by_weekday[holiday_date.weekday()].append(holiday_date)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def count(self, start, end, weekday):
+        """Count holidays on the given weekday in the range (start, end]"""
+        bucket = self.by_weekday[weekday]
+        if not bucket:
+            return 0
+        return max(0, bisect_right(bucket, end) - bisect_right(bucket, start))
+
+    def __contains__(self, value):
+        i = bisect_left(self.dates, value)
+        return i < len(self.dates) and self.dates[i] == value
+
+
+@lru_cache(maxsize=64)
+def _cached_holiday_index(holidays):
+    return HolidayIndex(holidays)
+
+
+def get_holiday_index(holidays):
+    """Return a (cached) HolidayIndex for a list of ISO holiday strings"""
+    if isinstance(holidays, HolidayIndex):
+        return holidays
+    try:
+        return _cached_holiday_index(tuple(holidays))
+    except TypeError:
+        # Unhashable entries; build an uncached index
+        return HolidayIndex(holidays)
+
+
+def count_weekdays(start, end, weekday):
+    """Count dates in (start, end] falling on weekday (0=Mon) without iterating"""
+    first = start + timedelta(days=1)  # Start from tomorrow
+    if first > end:
+        return 0
+
+    first_match = first + timedelta(days=(weekday - first.weekday()) % 7)
+    if first_match > end:
+        return 0
+
+    return (end - first_match).days // 7 + 1
+
 
 def count_specific_days(start, end, day_name, holidays):
     """Count specific days (Mon, Tue, etc.) between dates excluding holidays"""
-    day_mapping = {
-        'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6
-    }
-    
-    target_weekday = day_mapping[day_name]
-    holiday_dates = set()
-    
-    # Convert holiday strings to date objects
-    for holiday in holidays:
-        try:
-            holiday_date = datetime.date.fromisoformat(holiday.strip())
-            holiday_dates.add(holiday_date)
-        except ValueError:
-            continue
-    
-    count = 0
-    current = start + timedelta(days=1)  # Start from tomorrow
-    
-    while current <= end:
-        if current.weekday() == target_weekday and current not in holiday_dates:
-            count += 1
-        current += timedelta(days=1)
-    
-    return count
\ No newline at end of file
+    target_weekday = DAY_MAPPING[day_name]
+    total = count_weekdays(start, end, target_weekday)
+    if not total or not holidays:
+        return total
+
+    return total - get_holiday_index(holidays).count(start, end, target_weekday)
+
+
+QUALIFIED_NAME = re.compile(r'^(.*) \[([^\[\]]+)\]$')
+
+
+def qualified_name(section, subject):
+    """Name a subject uniquely across sections: "ADA [CSE A]" (just "ADA" without a section)"""
+    return f"{subject} [{section}]" if section else subject
+
+
+def split_qualified_name(name):
+    """Return (section, subject) for a qualified name; the section is "" for a plain name"""
+    match = QUALIFIED_NAME.match(name)
+    return (match.group(2), match.group(1)) if match else ('', name)
@@ -0,0 +1,182 @@
+import os
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from instrumentation import span
+
+
+class CalculationSignals(QObject):
+    """Signals emitted by CalculationWorker; every signal carries the job id"""
+    progress = pyqtSignal(int, int, str)      # job_id, percent, message
+    finished = pyqtSignal(int, object, str)   # job_id, CalculationResult or SectionedResult, rendered summary
+    error = pyqtSignal(int, str)              # job_id, message
+    saved = pyqtSignal(int)                   # job_id
+
+
+class CalculationWorker(QRunnable):
+    """Run a calculation, render its summary and queue it for history off the GUI thread
+
+    ``sections_data`` maps each section ("" for a single class) to its
+    subjects_data; all sections are calculated in one pass.
+    """
+
+    def __init__(self, job_id, sections_data, last_date, holidays, data_manager, semester_weeks=15):
+        super().__init__()
+        self.job_id = job_id
+        self.sections_data = sections_data
+        self.last_date = last_date
+        self.holidays = holidays
+        self.data_manager = data_manager
+        self.semester_weeks = semester_weeks
+        self.signals = CalculationSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Request cancellation; takes effect at the next checkpoint"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        subjects = sum(len(subjects_data) for subjects_data in self.sections_data.values())
+        with span("calculation", subjects=subjects, sections=len(self.sections_data)):
+            self._run()
+
+    def _run(self):
+        from calculator import calculate_sections_summary
+        from utils import qualified_name
+
+        try:
+            if self.cancelled:
+                return
+            self.signals.progress.emit(self.job_id, 10, "Calculating extra classes...")
+            with span("calculate_summary"):
+                result = calculate_sections_summary(self.sections_data, self.last_date, self.holidays,
+                                                    self.semester_weeks)
+
+            if self.cancelled:
+                return
+            self.signals.progress.emit(self.job_id, 60, "Rendering summary...")
+            with span("render_summary"):
+                summary = result.render()
+
+            if self.cancelled:
+                return
+            self.signals.finished.emit(self.job_id, result, summary)
+
+            # Persist after delivering results; the write-behind queue does the disk I/O
+            if self.cancelled:
+                return
+            self.signals.progress.emit(self.job_id, 80, "Saving to history...")
+            # History keys subjects by their section-qualified names
+            rows = [
+                (qualified_name(section, subject), data)
+                for section, subjects_data in self.sections_data.items()
+                for subject, data in subjects_data.items()
+            ]
+            self.data_manager.save_calculation(
+                {key: data['weekly_slots'] for key, data in rows},
+                {key: data['conducted'] for key, data in rows},
+                self.last_date, self.holidays, result,
+                on_saved=lambda job_id=self.job_id, signals=self.signals: signals.saved.emit(job_id)
+            )
+
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(self.job_id, str(e))
+
+
+class ImportSignals(QObject):
+    """Signals emitted by ImportWorker; every signal carries the job id"""
+    sheet_parsed = pyqtSignal(int, object, int, int)   # job_id, SheetCounts, index, total
+    finished = pyqtSignal(int, int)                    # job_id, sheets parsed
+    error = pyqtSignal(int, str)                       # job_id, message
+
+
+class ImportWorker(QRunnable):
+    """Parse a timetable sheet by sheet off the GUI thread, delivering each sheet as it is read
+
+    With a ParseCache, a previously seen file is served from the cache
+    without importing pandas, and fresh parses are stored for next time.
+    With a SubjectResolver, subject names are mapped to canonical subjects
+    before each sheet is delivered.
+    """
+
+    def __init__(self, job_id, file, cache=None, resolver=None):
+        super().__init__()
+        self.job_id = job_id
+        self.file = file
+        self.cache = cache
+        self.resolver = resolver
+        self.signals = ImportSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Request cancellation; takes effect before the next sheet is delivered"""
+        self._cancelled.set()
+
+    def canonicalize(self, sheet):
+        """Return the sheet with canonical subject names (the cache keeps raw names)"""
+        if self.resolver is None or not sheet.subjects:
+            return sheet
+        from timetable_parser import SheetCounts
+
+        names, matrix, sections = self.resolver.canonicalize_counts(sheet.subjects, sheet.matrix, sheet.sections)
+        return SheetCounts(sheet.name, names, matrix, sheet.row_count, sections, sheet.free_slots)
+
+    def run(self):
+        with span("import", file=os.path.basename(self.file)):
+            self._run()
+
+    def _run(self):
+        from timetable_parser import WorkbookStream, iter_timetable_sheets
+
+        try:
+            if self.cache is not None:
+                with span("parse_cache.load"):
+                    cached = self.cache.load_sheets(self.file)
+                if cached is not None:
+                    for index, sheet in enumerate(cached):
+                        self.signals.sheet_parsed.emit(self.job_id, self.canonicalize(sheet), index, len(cached))
+                    self.signals.finished.emit(self.job_id, len(cached))
+                    return
+
+            total = 1
+            if self.file.lower().endswith('.xlsx'):
+                stream = WorkbookStream(self.file)
+                total = len(stream)
+                sheets = iter(stream)
+            else:
+                sheets = iter_timetable_sheets(self.file)
+
+            parsed = []
+            for index, sheet in enumerate(sheets):
+                if self._cancelled.is_set():
+                    sheets.close()
+                    return
+                parsed.append(sheet)
+                self.signals.sheet_parsed.emit(self.job_id, self.canonicalize(sheet), index, total)
+
+            if not any(sheet.subjects for sheet in parsed):
+                raise ValueError("No sheet in the workbook has a DAY column with weekday rows.")
+
+            self.signals.finished.emit(self.job_id, len(parsed))
+
+            if self.cache is not None:
+                try:
+                    with span("parse_cache.store"):
+                        self.cache.store_sheets(self.file, parsed)
+                except Exception as e:
+                    print(f"Error caching parsed timetable: {e}")
+
+        except Exception as e:
+            if not self._cancelled.is_set():
+                self.signals.error.emit(self.job_id, str(e))
+
+
+class InstrumentationSignals(QObject):
+    """Carries recorded spans from any thread to the GUI thread"""
+    span_recorded = pyqtSignal(object)   # instrumentation.Span